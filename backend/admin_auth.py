@@ -0,0 +1,32 @@
+import os
+import secrets
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+
+class AdminAuth:
+    """API key check for the /api/admin routes, used as a FastAPI dependency.
+
+    Requests must send the key from ADMIN_API_KEY in an X-Admin-Key header.
+    Without a configured key the admin routes answer 404, so a deploy that
+    forgets to set one doesn't expose contact messages.
+    """
+
+    def __init__(self, api_key: Optional[str]):
+        self.api_key = api_key
+
+    @classmethod
+    def from_env(cls) -> "AdminAuth":
+        return cls(os.environ.get("ADMIN_API_KEY") or None)
+
+    @property
+    def enabled(self) -> bool:
+        return self.api_key is not None
+
+    async def __call__(self, x_admin_key: Optional[str] = Header(None, alias="X-Admin-Key")):
+        if self.api_key is None:
+            raise HTTPException(status_code=404, detail="Not Found")
+        # Constant-time comparison, so response timing doesn't leak the key
+        if x_admin_key is None or not secrets.compare_digest(x_admin_key.encode(), self.api_key.encode()):
+            raise HTTPException(status_code=401, detail="Invalid or missing X-Admin-Key header")
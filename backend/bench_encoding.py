@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Response encoding benchmark for the Portfolio API
+
+Builds each read endpoint's ApiResponse envelope from synthetic content and
+times three ways of turning it into bytes:
+
+    fastapi  - what FastAPI does for `response_model=ApiResponse`
+               (dump, re-validate, serialize, then JSONResponse.render)
+    stdlib   - responses.encode_api_response with orjson disabled
+    fast     - responses.encode_api_response (orjson when installed)
+
+Every encoder's output is checked against the fastapi bytes first. Needs no
+database.
+
+    python bench_encoding.py --projects 50 --seconds 1
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime
+from typing import Callable, Dict
+
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from starlette.responses import JSONResponse
+
+import responses
+from bench_hydration import synthetic_projects
+from hydration import hydrate
+from models import *
+
+
+def synthetic_payloads(project_count: int) -> Dict[str, ApiResponse]:
+    now = datetime(2024, 5, 1, 12, 30, 15, 250000)
+    personal_info = PersonalInfo(
+        name="Soumya Ranjan", title="Senior Software Engineer", currentCompany="Acme",
+        location="Pune, India", email="hello@example.com", phone="+91 00000 00000",
+        socialLinks=SocialLinks(linkedin="https://linkedin.com/in/x", github="https://github.com/x",
+                                twitter="https://twitter.com/x"),
+        resumeUrl="https://example.com/resume.pdf", createdAt=now, updatedAt=now,
+    )
+    about = About(summary="Backend engineer — APIs, data pipelines and cloud. " * 4,
+                  highlights=[f"Highlight {i}" for i in range(6)],
+                  personalInterests=["Cricket", "Photography", "Open source"], createdAt=now, updatedAt=now)
+    skills = [
+        Skills(category=f"Category {c}", createdAt=now, updatedAt=now,
+               items=[SkillItem(name=f"Skill {c}.{i}", proficiency=70 + i, years=0.5 + i) for i in range(8)])
+        for c in range(5)
+    ]
+    projects = hydrate(Project, synthetic_projects(project_count), "construct")
+    experience = [
+        Experience(company=f"Company {i}", position="Engineer", location="Pune", startDate=f"Jan {2016 + i}",
+                   endDate="Present" if i == 4 else f"Dec {2016 + i}", description="Built things. " * 10,
+                   achievements=[f"Achievement {n}" for n in range(5)], technologies=["Python", "Mongo"],
+                   createdAt=now, updatedAt=now)
+        for i in range(5)
+    ]
+    education = [
+        Education(institution=f"University {i}", degree="B.Tech", location="Odisha", startDate="2012",
+                  endDate="2016", description="Computer science", relevantCourses=["DSA", "DBMS", "OS"],
+                  createdAt=now, updatedAt=now)
+        for i in range(2)
+    ]
+    certifications = [
+        Certification(name=f"Certification {i}", issuer="Cloud Vendor", issueDate="March 2023",
+                      expiryDate="March 2026", credentialId=f"ID-{i}", description="Associate level",
+                      badgeUrl="https://example.com/badge.png", createdAt=now, updatedAt=now)
+        for i in range(6)
+    ]
+    messages = [
+        ContactMessage(name=f"Visitor {i}", email=f"v{i}@example.com", company="Co", subject="Hello",
+                       message="I'd like to talk about a role. " * 5, createdAt=now, updatedAt=now)
+        for i in range(50)
+    ]
+
+    def envelope(data, message="Retrieved successfully"):
+        return ApiResponse(success=True, data=data, message=message)
+
+    return {
+        "/api/personal-info": envelope(personal_info.model_dump()),
+        "/api/about": envelope(about.model_dump()),
+        "/api/skills": envelope([skill.model_dump() for skill in skills]),
+        "/api/projects": envelope([project.model_dump() for project in projects]),
+        "/api/experience": envelope([exp.model_dump() for exp in experience]),
+        "/api/education": envelope([edu.model_dump() for edu in education]),
+        "/api/certifications": envelope([cert.model_dump() for cert in certifications]),
+        "/api/portfolio": envelope({
+            "personalInfo": personal_info.model_dump(), "about": about.model_dump(),
+            "skills": [skill.model_dump() for skill in skills], "projects": [project.model_dump() for project in projects],
+            "experience": [exp.model_dump() for exp in experience], "education": [edu.model_dump() for edu in education],
+            "certifications": [cert.model_dump() for cert in certifications],
+        }),
+        "/api/admin/messages": envelope({"items": [m.model_dump() for m in messages], "next": "eyJjIjoiY29udGFjdF9tZXNzYWdlcyJ9"}),
+    }
+
+
+_FIELD = create_model_field("Response_bench", ApiResponse, mode="serialization")
+
+
+def fastapi_encode(payload: ApiResponse) -> bytes:
+    # serialize_response never suspends for async endpoints, so drive it
+    # directly rather than paying for an event loop round-trip per call
+    coro = serialize_response(field=_FIELD, response_content=payload, is_coroutine=True)
+    try:
+        coro.send(None)
+    except StopIteration as done:
+        return JSONResponse(done.value).body
+    raise RuntimeError("serialize_response suspended")
+
+
+def stdlib_encode(payload: ApiResponse) -> bytes:
+    saved, responses.orjson = responses.orjson, None
+    try:
+        return responses.encode_api_response(payload)
+    finally:
+        responses.orjson = saved
+
+
+ENCODERS: Dict[str, Callable[[ApiResponse], bytes]] = {
+    "fastapi": fastapi_encode,
+    "stdlib": stdlib_encode,
+    "fast": responses.encode_api_response,
+}
+
+
+def throughput(encode: Callable[[ApiResponse], bytes], payload: ApiResponse, seconds: float) -> float:
+    runs, start = 0, time.perf_counter()
+    deadline = start + seconds
+    while True:
+        encode(payload)
+        runs += 1
+        now = time.perf_counter()
+        if now >= deadline:
+            return runs / (now - start)
+
+
+def run(project_count: int, seconds: float) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for route, payload in synthetic_payloads(project_count).items():
+        expected = fastapi_encode(payload)
+        for name, encode in ENCODERS.items():
+            if encode(payload) != expected:
+                raise AssertionError(f"{name} output differs from FastAPI's for {route}")
+        row = {"bytes": len(expected)}
+        for name, encode in ENCODERS.items():
+            row[name] = round(throughput(encode, payload, seconds), 1)
+        row["speedup"] = round(row["fast"] / row["fastapi"], 2)
+        results[route] = row
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ApiResponse encoding per endpoint")
+    parser.add_argument("--projects", type=int, default=50, help="synthetic projects in /api/projects and /api/portfolio")
+    parser.add_argument("--seconds", type=float, default=1.0, help="time spent per endpoint and encoder")
+    parser.add_argument("--json", action="store_true", help="print the raw results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.projects, args.seconds)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    fast = "orjson" if responses.orjson is not None else "stdlib (orjson not installed)"
+    print(f"📊 Encodes/sec per endpoint; fast = {fast}; all outputs byte-identical")
+    print(f"{'endpoint':<22}{'bytes':>9}{'fastapi':>11}{'stdlib':>11}{'fast':>11}{'speedup':>9}")
+    for route, row in results.items():
+        print(f"{route:<22}{row['bytes']:>9,}{row['fastapi']:>11,.0f}{row['stdlib']:>11,.0f}{row['fast']:>11,.0f}  x{row['speedup']}")
+
+
+if __name__ == "__main__":
+    main()
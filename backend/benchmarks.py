@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark suite for the Portfolio API hot path
+
+Times the pieces every request goes through on synthetic datasets of
+several sizes:
+
+    hydration        DatabaseManager.hydrate() of project documents into models
+    serialization    building and encoding the /api/projects ApiResponse
+    category_filter  DatabaseManager.get_projects(category) without the content cache
+    contact_insert   DatabaseManager.create_contact_message() with deduplication,
+                     into a collection already holding `size` messages
+
+The last two run against the in-memory backend (memory_mongo.py), so they
+measure DatabaseManager plus the stand-in rather than a MongoDB server.
+Each result is the best per-call time over `--repeat` rounds.
+
+    python benchmarks.py run                   # print results
+    python benchmarks.py run --save            # record them as the baseline
+    python benchmarks.py check --threshold 15  # exit 1 if anything got >15% slower
+
+Baselines only compare meaningfully on the machine that recorded them;
+re-record with `run --save` after changing hardware or Python.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from bench_hydration import CATEGORIES, synthetic_projects
+from contact_dedup import ContactDeduplicator
+from database import DatabaseManager
+from models import *
+from responses import encode_api_response
+
+SIZES = (100, 1000, 10000)
+
+BASELINE = Path(__file__).parent / "bench_baseline.json"
+
+DEFAULT_THRESHOLD = 20.0
+
+Operation = Union[Callable[[], Any], Callable[[], Awaitable[Any]]]
+
+
+# Benchmarks
+# Each takes a dataset size and returns (operation, is_async), after any setup.
+
+async def bench_hydration(size: int) -> Tuple[Operation, bool]:
+    manager = DatabaseManager("memory://", "bench", connect=False)
+    docs = synthetic_projects(size)
+
+    def operation():
+        # hydrate() renames `_id` in place, so every call needs fresh dicts
+        manager.hydrate("projects", Project, [dict(doc) for doc in docs])
+    return operation, False
+
+
+async def bench_serialization(size: int) -> Tuple[Operation, bool]:
+    manager = DatabaseManager("memory://", "bench", connect=False)
+    projects = manager.hydrate("projects", Project, synthetic_projects(size))
+
+    def operation():
+        # What the /api/projects handler and ApiRoute do with a fetched list
+        encode_api_response(ApiResponse(
+            success=True,
+            data=[project.dict() for project in projects],
+            message="Projects retrieved successfully"
+        ))
+    return operation, False
+
+
+async def bench_category_filter(size: int) -> Tuple[Operation, bool]:
+    manager = DatabaseManager("memory://", "bench")
+    await manager.ensure_indexes()
+    await manager.db.projects.insert_many(synthetic_projects(size))
+
+    async def operation():
+        await manager.get_projects(CATEGORIES[0])
+    return operation, True
+
+
+async def bench_contact_insert(size: int) -> Tuple[Operation, bool]:
+    manager = DatabaseManager("memory://", "bench")
+    manager.contact_dedup = ContactDeduplicator()
+    await manager.ensure_indexes()
+    now = datetime.utcnow()
+    await manager.db.contact_messages.insert_many([
+        {**ContactMessage(name=f"Visitor {i}", email=f"v{i}@example.com", subject="Hello",
+                          message=f"Existing message {i}").dict(), "contentHash": f"existing-{i}", "createdAt": now}
+        for i in range(size)
+    ])
+    sequence = [0]
+
+    async def operation():
+        sequence[0] += 1
+        await manager.create_contact_message(ContactMessageCreate(
+            name="Benchmark", email="bench@example.com", company="Acme",
+            subject=f"Benchmark message {sequence[0]}", message="I'd like to talk about a role. " * 5
+        ))
+    return operation, True
+
+
+BENCHMARKS: Dict[str, Callable[[int], Awaitable[Tuple[Operation, bool]]]] = {
+    "hydration": bench_hydration,
+    "serialization": bench_serialization,
+    "category_filter": bench_category_filter,
+    "contact_insert": bench_contact_insert,
+}
+
+
+# Timing
+async def _time_calls(operation: Operation, is_async: bool, number: int) -> float:
+    start = time.perf_counter()
+    if is_async:
+        for _ in range(number):
+            await operation()
+    else:
+        for _ in range(number):
+            operation()
+    return time.perf_counter() - start
+
+
+async def measure(operation: Operation, is_async: bool, min_time: float, repeat: int) -> float:
+    """Best seconds per call; each round runs enough calls to last at least `min_time`"""
+    number = 1
+    while True:
+        elapsed = await _time_calls(operation, is_async, number)
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed == 0 else max(2, min(10, int(min_time / elapsed) + 1))
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        best = min(best, await _time_calls(operation, is_async, number) / number)
+    return best
+
+
+def result_key(name: str, size: int) -> str:
+    return f"{name}[{size}]"
+
+
+async def run_benchmarks(names: List[str], sizes: List[int], min_time: float, repeat: int,
+                         progress: bool = True) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for name in names:
+        for size in sizes:
+            operation, is_async = await BENCHMARKS[name](size)
+            seconds = await measure(operation, is_async, min_time, repeat)
+            results[result_key(name, size)] = {"seconds": seconds, "opsPerSec": round(1 / seconds, 1)}
+            if progress:
+                print(f"  {result_key(name, size):<28}{seconds * 1000:>12.4f} ms", file=sys.stderr)
+    return results
+
+
+# Baselines
+def save_baseline(path: Path, results: Dict[str, Dict[str, float]], min_time: float, repeat: int):
+    baseline = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "recordedAt": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "minTime": min_time,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+    path.write_text(json.dumps(baseline, indent=2) + "\n")
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            threshold: float) -> Dict[str, Dict[str, Any]]:
+    """Change against the baseline per result; `regressed` when slower by more than `threshold` percent"""
+    changes = {}
+    for key, result in results.items():
+        before = baseline.get(key)
+        if before is None:
+            changes[key] = {"seconds": result["seconds"], "baseline": None, "change": None, "regressed": False}
+            continue
+        change = (result["seconds"] / before["seconds"] - 1) * 100
+        changes[key] = {
+            "seconds": result["seconds"],
+            "baseline": before["seconds"],
+            "change": round(change, 1),
+            "regressed": change > threshold,
+        }
+    return changes
+
+
+def print_results(results: Dict[str, Dict[str, float]]):
+    print(f"{'benchmark':<28}{'ms/call':>12}{'calls/sec':>14}")
+    for key, result in results.items():
+        print(f"{key:<28}{result['seconds'] * 1000:>12.4f}{result['opsPerSec']:>14,.1f}")
+
+
+def print_changes(changes: Dict[str, Dict[str, Any]], threshold: float):
+    print(f"{'benchmark':<28}{'baseline ms':>13}{'now ms':>12}{'change':>10}")
+    for key, change in changes.items():
+        if change["baseline"] is None:
+            print(f"{key:<28}{'-':>13}{change['seconds'] * 1000:>12.4f}{'new':>10}")
+            continue
+        flag = "  ❌" if change["regressed"] else ""
+        print(f"{key:<28}{change['baseline'] * 1000:>13.4f}{change['seconds'] * 1000:>12.4f}"
+              f"{change['change']:>+9.1f}%{flag}")
+    regressed = [key for key, change in changes.items() if change["regressed"]]
+    if regressed:
+        print(f"❌ {len(regressed)} benchmarks regressed by more than {threshold}%: {', '.join(regressed)}")
+    else:
+        print(f"✅ No benchmark regressed by more than {threshold}%")
+
+
+async def check(args, names: List[str], sizes: List[int]) -> int:
+    if not args.baseline.exists():
+        print(f"❌ No baseline at {args.baseline}; record one with `python benchmarks.py run --save`")
+        return 2
+    baseline = json.loads(args.baseline.read_text())["results"]
+    results = await run_benchmarks(names, sizes, args.min_time, args.repeat)
+    changes = compare(results, baseline, args.threshold)
+
+    # A single noisy round shouldn't fail a deploy: re-measure regressions once, keep the better time
+    retry = [key for key, change in changes.items() if change["regressed"]]
+    for key in retry:
+        name, size = key[:-1].split("[")
+        operation, is_async = await BENCHMARKS[name](int(size))
+        seconds = await measure(operation, is_async, args.min_time, args.repeat)
+        results[key]["seconds"] = min(results[key]["seconds"], seconds)
+    if retry:
+        changes = compare(results, baseline, args.threshold)
+
+    if args.json:
+        print(json.dumps(changes, indent=2))
+    else:
+        print_changes(changes, args.threshold)
+    return 1 if any(change["regressed"] for change in changes.values()) else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Portfolio API hot path")
+    parser.add_argument("command", choices=["run", "check"],
+                        help="run: measure (and optionally --save); check: compare against the baseline")
+    parser.add_argument("--only", help=f"comma-separated benchmarks; default all of: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in SIZES), help="comma-separated dataset sizes")
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum seconds per timing round")
+    parser.add_argument("--repeat", type=int, default=5, help="timing rounds per benchmark; the best is kept")
+    parser.add_argument("--baseline", type=Path, default=BASELINE, help="baseline file")
+    parser.add_argument("--save", action="store_true", help="with run: write the results to the baseline file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="with check: percent slowdown that counts as a regression")
+    parser.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = parser.parse_args()
+
+    names = args.only.split(",") if args.only else list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"Unknown benchmarks: {', '.join(unknown)}")
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    if args.command == "check":
+        sys.exit(asyncio.run(check(args, names, sizes)))
+
+    results = asyncio.run(run_benchmarks(names, sizes, args.min_time, args.repeat))
+    if args.save:
+        save_baseline(args.baseline, results, args.min_time, args.repeat)
+        print(f"💾 Baseline written to {args.baseline}")
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_results(results)
+
+
+if __name__ == "__main__":
+    main()
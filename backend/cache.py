@@ -0,0 +1,275 @@
+import asyncio
+import functools
+import inspect
+import logging
+import os
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Default time-to-live (seconds) per collection. Portfolio content only changes
+# when the seed scripts run, so these are generous; writes made through
+# DatabaseManager invalidate the matching collection immediately.
+DEFAULT_TTLS = {
+    "personal_info": 600,
+    "about": 600,
+    "skills": 600,
+    "projects": 300,
+    "experience": 600,
+    "education": 600,
+    "certifications": 600,
+}
+
+CacheKey = Tuple[str, Hashable]
+
+# Document in the `counters` collection holding a version number per content
+# collection. Every write bumps it, so servers that didn't make the write
+# (seed scripts run out of process, other workers) drop their cached reads.
+CONTENT_VERSIONS_ID = "content_versions"
+
+# Generation of the entry behind the most recent cached read in this task, or
+# None when that read bypassed the cache. Lets callers key derived data (such
+# as encoded response bodies) to the exact cache fill they were built from.
+served_generation: ContextVar[Optional[int]] = ContextVar("served_generation", default=None)
+
+
+class CacheEntry:
+    __slots__ = ("value", "expires_at", "generation")
+
+    def __init__(self, value: Any, expires_at: float, generation: int):
+        self.value = value
+        self.expires_at = expires_at
+        self.generation = generation
+
+
+class ContentCache:
+    """In-process read-through cache for DatabaseManager getters.
+
+    Entries are keyed by (collection, call arguments), expire after the
+    collection's TTL and are evicted least-recently-used once `max_entries`
+    is reached. Every fill gets a new generation number so callers can tell
+    when a cached value has been replaced.
+    """
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, default_ttl: float = 300.0, max_entries: int = 256):
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[CacheKey, CacheEntry]" = OrderedDict()
+        self._pending: Dict[CacheKey, asyncio.Future] = {}
+        self._epochs: Dict[str, int] = {}
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @classmethod
+    def from_env(cls) -> Optional["ContentCache"]:
+        if os.environ.get("CACHE_ENABLED", "true").lower() in ("0", "false", "no"):
+            return None
+        ttls = {
+            collection: float(os.environ.get(f"CACHE_TTL_{collection.upper()}", ttl))
+            for collection, ttl in DEFAULT_TTLS.items()
+        }
+        return cls(
+            ttls,
+            default_ttl=float(os.environ.get("CACHE_DEFAULT_TTL", 300)),
+            max_entries=int(os.environ.get("CACHE_MAX_ENTRIES", 256)),
+        )
+
+    def ttl_for(self, collection: str) -> float:
+        return self.ttls.get(collection, self.default_ttl)
+
+    def peek(self, collection: str, key: Hashable = ()) -> Optional[CacheEntry]:
+        """Return the fresh entry for a key without touching counters or LRU order."""
+        entry = self._entries.get((collection, key))
+        if entry is not None and entry.expires_at > time.monotonic():
+            return entry
+        return None
+
+    async def get_or_load(self, collection: str, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        full_key = (collection, key)
+        entry = self._entries.get(full_key)
+        if entry is not None and entry.expires_at > time.monotonic():
+            self._entries.move_to_end(full_key)
+            self.hits += 1
+            served_generation.set(entry.generation)
+            return entry.value
+
+        # Concurrent misses for the same key share a single Mongo round-trip
+        task = self._pending.get(full_key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(self._load(full_key, loader))
+            self._pending[full_key] = task
+        else:
+            self.coalesced += 1
+        value, generation = await asyncio.shield(task)
+        served_generation.set(generation)
+        return value
+
+    async def _load(self, full_key: CacheKey, loader: Callable[[], Awaitable[Any]]) -> Tuple[Any, Optional[int]]:
+        collection = full_key[0]
+        epoch = self._epochs.get(collection, 0)
+        try:
+            value = await loader()
+            # A write that landed while we were loading makes this value stale
+            if self._epochs.get(collection, 0) != epoch:
+                return value, None
+            return value, self._store(full_key, value)
+        finally:
+            if self._pending.get(full_key) is asyncio.current_task():
+                del self._pending[full_key]
+
+    def _store(self, full_key: CacheKey, value: Any) -> Optional[int]:
+        ttl = self.ttl_for(full_key[0])
+        if ttl <= 0:
+            return None
+        self._generation += 1
+        self._entries[full_key] = CacheEntry(value, time.monotonic() + ttl, self._generation)
+        self._entries.move_to_end(full_key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return self._generation
+
+    def invalidate(self, collection: str):
+        self._epochs[collection] = self._epochs.get(collection, 0) + 1
+        for full_key in [k for k in self._entries if k[0] == collection]:
+            del self._entries[full_key]
+        for full_key in [k for k in self._pending if k[0] == collection]:
+            del self._pending[full_key]
+        self.invalidations += 1
+
+    def clear(self):
+        for collection in {k[0] for k in self._entries} | {k[0] for k in self._pending}:
+            self.invalidate(collection)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "entries": len(self._entries),
+            "maxEntries": self.max_entries,
+            "hitRatio": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+        }
+
+
+def cached(collection: str):
+    """Serve a DatabaseManager getter through `self.cache` when one is configured."""
+    def decorator(method):
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            if self.cache is None:
+                served_generation.set(None)
+                return await method(self, *args, **kwargs)
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            key = tuple(bound.arguments.values())[1:]
+            return await self.cache.get_or_load(collection, key, lambda: method(self, *args, **kwargs))
+        return wrapper
+    return decorator
+
+
+def invalidates(collection: str):
+    """Drop cached reads for `collection` once the decorated write has run.
+
+    The write also bumps the collection's content version, so other
+    processes watching it (ContentVersionWatcher) drop theirs too.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            try:
+                return await method(self, *args, **kwargs)
+            finally:
+                if self.cache is not None:
+                    self.cache.invalidate(collection)
+                try:
+                    await bump_content_versions(self.db, [collection])
+                except Exception as e:
+                    logger.error(f"Failed to bump content version of {collection}: {str(e)}")
+        return wrapper
+    return decorator
+
+
+async def bump_content_versions(db, collections: Iterable[str]):
+    """Mark `collections` as changed for every server caching them; call after writing to them directly"""
+    increments = {collection: 1 for collection in collections}
+    if not increments:
+        return
+    await db.counters.update_one(
+        {"_id": CONTENT_VERSIONS_ID},
+        {"$inc": increments, "$set": {"updatedAt": datetime.utcnow()}},
+        upsert=True
+    )
+
+
+class ContentVersionWatcher:
+    """Polls the content versions document and invalidates collections whose version moved.
+
+    One find_one by _id every `interval` seconds bounds how long a server
+    keeps serving content that was rewritten elsewhere, instead of the
+    collection TTL. The first read only records the current versions.
+    """
+
+    def __init__(self, cache: ContentCache, interval: float = 5.0):
+        self.cache = cache
+        self.interval = interval
+        self.versions: Optional[Dict[str, int]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls, cache: Optional[ContentCache]) -> Optional["ContentVersionWatcher"]:
+        interval = float(os.environ.get("CACHE_VERSION_POLL_INTERVAL", 5))
+        if cache is None or interval <= 0:
+            return None
+        return cls(cache, interval)
+
+    async def check(self, db) -> list:
+        """Invalidate collections changed since the last check; returns their names"""
+        doc = await db.counters.find_one({"_id": CONTENT_VERSIONS_ID}) or {}
+        versions = {name: value for name, value in doc.items() if isinstance(value, int) and name != "_id"}
+        previous, self.versions = self.versions, versions
+        if previous is None:
+            return []
+        changed = [name for name, value in versions.items() if previous.get(name) != value]
+        for collection in changed:
+            self.cache.invalidate(collection)
+        return changed
+
+    async def _run(self, db):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.check(db)
+            except Exception as e:
+                logger.error(f"Content version check failed: {str(e)}")
+
+    async def start(self, db):
+        try:
+            await self.check(db)
+        except Exception as e:
+            logger.warning(f"Content version check failed: {str(e)}")
+        self._task = asyncio.create_task(self._run(db))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,122 @@
+import asyncio
+import hashlib
+import os
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from models import ContactMessageCreate
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class IdempotencyConflict(ValueError):
+    pass
+
+
+def _normalize(text: str) -> str:
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text)).strip().casefold()
+
+
+def contact_content_hash(message: ContactMessageCreate) -> str:
+    """Hash of the normalized email, subject and message; equal for retries and double submits"""
+    parts = (message.email.strip().lower(), _normalize(message.subject), _normalize(message.message))
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class ContactDeduplicator:
+    """Short-lived in-memory tables that collapse repeated contact submissions.
+
+    A submission is identified by its content hash and, when the client sends
+    one, its Idempotency-Key. While a first submission is in flight, repeats
+    await the same insert; afterwards they get its result until the entry
+    expires. Across processes and restarts the unique index on `contentHash`
+    does the same job (see DatabaseManager.create_contact_message).
+    """
+
+    def __init__(self, window: float = 600.0, key_ttl: float = 600.0, max_entries: int = 10000):
+        self.window = window
+        self.key_ttl = key_ttl
+        self.max_entries = max_entries
+        self._recent: "OrderedDict[str, Tuple[float, asyncio.Future]]" = OrderedDict()
+        self._keys: "OrderedDict[str, Tuple[float, str, asyncio.Future]]" = OrderedDict()
+        self.submitted = 0
+        self.duplicates = 0
+        self.replays = 0
+        self.conflicts = 0
+
+    @classmethod
+    def from_env(cls) -> Optional["ContactDeduplicator"]:
+        if os.environ.get("CONTACT_DEDUP_ENABLED", "true").lower() in ("0", "false", "no"):
+            return None
+        return cls(
+            window=float(os.environ.get("CONTACT_DEDUP_WINDOW", 600)),
+            key_ttl=float(os.environ.get("CONTACT_IDEMPOTENCY_TTL", 600)),
+            max_entries=int(os.environ.get("CONTACT_DEDUP_MAX_ENTRIES", 10000)),
+        )
+
+    def _expire(self, now: float):
+        # Both tables are in insertion order, which is expiry order
+        for table in (self._recent, self._keys):
+            while table:
+                oldest = next(iter(table.values()))
+                if oldest[0] > now and len(table) <= self.max_entries:
+                    break
+                table.popitem(last=False)
+
+    def _forget(self, content_hash: str, key: Optional[str], future: asyncio.Future):
+        entry = self._recent.get(content_hash)
+        if entry is not None and entry[1] is future:
+            del self._recent[content_hash]
+        entry = self._keys.get(key) if key else None
+        if entry is not None and entry[2] is future:
+            del self._keys[key]
+
+    async def submit(self, content_hash: str, key: Optional[str], create: Callable[[], Awaitable[Any]]) -> Any:
+        """Run `create()` unless this submission was already seen; return its result either way"""
+        now = time.monotonic()
+        self._expire(now)
+
+        if key:
+            entry = self._keys.get(key)
+            if entry is not None:
+                if entry[1] != content_hash:
+                    self.conflicts += 1
+                    raise IdempotencyConflict("Idempotency-Key was already used for a different message")
+                self.replays += 1
+                return await asyncio.shield(entry[2])
+
+        entry = self._recent.get(content_hash)
+        if entry is not None:
+            self.duplicates += 1
+            if key:
+                self._keys[key] = (now + self.key_ttl, content_hash, entry[1])
+            return await asyncio.shield(entry[1])
+
+        self.submitted += 1
+        future = asyncio.ensure_future(create())
+        self._recent[content_hash] = (now + self.window, future)
+        if key:
+            self._keys[key] = (now + self.key_ttl, content_hash, future)
+        try:
+            return await asyncio.shield(future)
+        except BaseException:
+            # Failed submissions may be retried
+            if future.done():
+                self._forget(content_hash, key, future)
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": True,
+            "windowSeconds": self.window,
+            "idempotencyKeyTtlSeconds": self.key_ttl,
+            "submitted": self.submitted,
+            "duplicates": self.duplicates,
+            "idempotentReplays": self.replays,
+            "keyConflicts": self.conflicts,
+            "trackedHashes": len(self._recent),
+            "trackedKeys": len(self._keys),
+        }
@@ -0,0 +1,220 @@
+import asyncio
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from bson import json_util
+from pymongo.errors import BulkWriteError
+from pymongo.write_concern import WriteConcern
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_KEY = 11000
+
+# Outside the deploy directory, which scripts/cleanup.sh empties before the old process stops
+DEFAULT_SPILL_PATH = Path("/var/lib/portfolio/contact_spill.ndjson")
+
+
+def write_concern_from_env() -> WriteConcern:
+    w = os.environ.get("CONTACT_WRITE_CONCERN", "1")
+    journal = os.environ.get("CONTACT_WRITE_JOURNAL", "")
+    return WriteConcern(
+        w=int(w) if w.isdigit() else w,
+        j=journal.lower() in ("1", "true", "yes") if journal else None,
+    )
+
+
+class ContactWriteQueue:
+    """Write-behind batching for contact form submissions.
+
+    submit() appends the document to an on-disk spill file and to a bounded
+    in-memory queue, and returns immediately; a background task drains the
+    queue with insert_many() once `batch_size` documents are waiting or
+    `flush_interval` seconds have passed since the first one arrived.
+
+    The spill file is truncated whenever every submitted document has been
+    written. Anything left in it after a crash is replayed by start(); the
+    documents carry their `_id`, so replaying ones that did reach Mongo is a
+    harmless duplicate-key error.
+    """
+
+    def __init__(self, spill_path: Path, max_size: int = 1000, batch_size: int = 100,
+                 flush_interval: float = 0.25, write_concern: Optional[WriteConcern] = None,
+                 fsync: bool = False):
+        self.spill_path = Path(spill_path)
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.write_concern = write_concern or WriteConcern(w=1)
+        self.fsync = fsync
+        self.collection = None
+        # Called for documents rejected by a unique index other than _id
+        self.on_duplicate: Optional[Callable[[Dict[str, Any]], Awaitable[Any]]] = None
+        # Called with the number of documents each insert_many actually stored
+        self.on_inserted: Optional[Callable[[int], Awaitable[Any]]] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._spill = None
+        self._closing = False
+        self._pending = 0
+        self.enqueued = 0
+        self.rejected = 0
+        self.flushed = 0
+        self.batches = 0
+        self.failed_flushes = 0
+        self.recovered = 0
+
+    @classmethod
+    def from_env(cls, default_spill_path: Path = DEFAULT_SPILL_PATH) -> Optional["ContactWriteQueue"]:
+        if os.environ.get("CONTACT_WRITE_BEHIND", "false").lower() not in ("1", "true", "yes"):
+            return None
+        return cls(
+            Path(os.environ.get("CONTACT_SPILL_FILE", default_spill_path)),
+            max_size=int(os.environ.get("CONTACT_QUEUE_MAX", 1000)),
+            batch_size=int(os.environ.get("CONTACT_BATCH_SIZE", 100)),
+            flush_interval=int(os.environ.get("CONTACT_FLUSH_INTERVAL_MS", 250)) / 1000,
+            write_concern=write_concern_from_env(),
+            fsync=os.environ.get("CONTACT_SPILL_FSYNC", "false").lower() in ("1", "true", "yes"),
+        )
+
+    @property
+    def running(self) -> bool:
+        return self._flusher is not None and not self._flusher.done()
+
+    async def start(self, collection):
+        """Replay anything a previous process left in the spill file, then start flushing"""
+        self.collection = collection.with_options(write_concern=self.write_concern)
+        self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+        await self._recover()
+        self._spill = open(self.spill_path, "ab")
+        self._queue = asyncio.Queue(self.max_size)
+        self._flusher = asyncio.create_task(self._run())
+
+    def submit(self, doc: Dict[str, Any]) -> bool:
+        """Queue `doc` (which must carry its `_id`) for writing; False means write it directly"""
+        if not self.running or self._closing or self._queue.full():
+            self.rejected += 1
+            return False
+        self._spill.write(json_util.dumps(doc).encode("utf-8") + b"\n")
+        self._spill.flush()
+        if self.fsync:
+            os.fsync(self._spill.fileno())
+        self._queue.put_nowait(doc)
+        self._pending += 1
+        self.enqueued += 1
+        return True
+
+    async def stop(self):
+        """Stop accepting submissions and flush everything already queued"""
+        if not self.running:
+            return
+        self._closing = True
+        await self._queue.put(None)
+        await self._flusher
+        self._spill.close()
+        self._spill = None
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is None:
+                break
+            batch = [first]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    doc = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if doc is None:
+                    stopping = True
+                    break
+                batch.append(doc)
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[Dict[str, Any]]):
+        delay = 0.5
+        while True:
+            try:
+                await self._insert(batch)
+                break
+            except Exception as e:
+                self.failed_flushes += 1
+                logger.error(f"Failed to flush {len(batch)} contact messages: {str(e)}")
+                if self._closing:
+                    # Still in the spill file; replayed on the next start
+                    return
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+        self.flushed += len(batch)
+        self.batches += 1
+        self._pending -= len(batch)
+        if self._pending == 0:
+            self._spill.truncate(0)
+
+    async def _insert(self, docs: List[Dict[str, Any]]):
+        try:
+            await self.collection.insert_many(docs, ordered=False)
+            inserted = len(docs)
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            if e.details.get("writeConcernErrors") or any(error.get("code") != DUPLICATE_KEY for error in errors):
+                raise
+            for error in errors:
+                # Documents replayed after a crash may already be stored
+                if "_id" in error.get("keyPattern", {"_id": 1}):
+                    continue
+                if self.on_duplicate is None:
+                    raise
+                await self.on_duplicate(docs[error["index"]])
+            inserted = e.details.get("nInserted", 0)
+        if self.on_inserted is not None:
+            try:
+                await self.on_inserted(inserted)
+            except Exception as e:
+                # The documents are stored; retrying the batch would only count them twice
+                logger.error(f"Failed to count {inserted} contact messages: {str(e)}")
+
+    async def _recover(self):
+        if not self.spill_path.exists() or self.spill_path.stat().st_size == 0:
+            return
+        docs = []
+        with open(self.spill_path, "rb") as fh:
+            for line in fh:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    docs.append(json_util.loads(line))
+                except ValueError:
+                    # The last line can be cut short by the crash; it was never acknowledged
+                    logger.warning(f"Skipping unreadable line in {self.spill_path}")
+        for start in range(0, len(docs), self.batch_size):
+            await self._insert(docs[start:start + self.batch_size])
+        self.recovered += len(docs)
+        logger.info(f"Replayed {len(docs)} contact messages from {self.spill_path}")
+        self.spill_path.write_bytes(b"")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": True,
+            "running": self.running,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "pending": self._pending,
+            "maxSize": self.max_size,
+            "batchSize": self.batch_size,
+            "flushIntervalMs": int(self.flush_interval * 1000),
+            "writeConcern": self.write_concern.document,
+            "enqueued": self.enqueued,
+            "rejected": self.rejected,
+            "flushed": self.flushed,
+            "batches": self.batches,
+            "failedFlushes": self.failed_flushes,
+            "recovered": self.recovered,
+        }
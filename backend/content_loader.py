@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Declarative content loader for the Portfolio API
+
+Loads portfolio content from JSON, YAML or NDJSON files instead of Python
+seed scripts. Each file holds records for the collection named by its stem
+(`projects.ndjson`, `certifications.yaml`, `personal_info.json`, ...):
+
+    .ndjson / .jsonl   one JSON object per line
+    .json              a top-level array of objects, or a single object
+    .yaml / .yml       a top-level list, a single mapping, or one record per
+                       `---` document (needs PyYAML)
+
+Records are parsed and validated against the collection's *Create model one
+at a time, and written with reseed.SeedWriter: matched by natural key, new
+and changed ones go out in bulk_write batches, unchanged ones are skipped.
+Every parse and validation error is reported as `file:line: message`.
+
+    python content_loader.py content/
+    python content_loader.py content/projects.ndjson --check
+    python content_loader.py content/ --prune --batch-size 1000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+
+from database import DatabaseManager
+from models import *
+from reseed import SeedWriter, print_seed_report
+
+# Model every record of a collection is validated against
+CREATE_MODELS: Dict[str, Type[BaseModel]] = {
+    "personal_info": PersonalInfoCreate,
+    "about": AboutCreate,
+    "skills": SkillsCreate,
+    "projects": ProjectCreate,
+    "experience": ExperienceCreate,
+    "education": EducationCreate,
+    "certifications": CertificationCreate,
+}
+
+CONTENT_SUFFIXES = (".json", ".ndjson", ".jsonl", ".yaml", ".yml")
+
+BATCH_SIZE = 500
+
+CHUNK_SIZE = 64 * 1024
+
+
+class ContentError(ValueError):
+    """A record or file that can't be loaded, located by file and line"""
+
+    def __init__(self, path: Path, line: int, message: str):
+        super().__init__(f"{path}:{line}: {message}")
+        self.path = path
+        self.line = line
+
+
+# Record Readers
+# Each yields (line, record) with the 1-based line the record starts on.
+
+def iter_ndjson_records(path: Path) -> Iterator[Tuple[int, Any]]:
+    with open(path, encoding="utf-8") as fh:
+        for line_number, line in enumerate(fh, 1):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ContentError(path, line_number, e.msg)
+
+
+_NON_WHITESPACE = re.compile(r"\S")
+_DECODER = json.JSONDecoder()
+_NUMBER_ENDS = set(",]} \t\r\n")
+_LITERALS = ("true", "false", "null", "NaN", "Infinity", "-Infinity")
+_NUMBER_TAIL = re.compile(r"\.|[eE][-+]?")
+
+
+def _truncated(buffer: str, error: json.JSONDecodeError) -> bool:
+    """Whether `error` can come from a value that continues past the end of `buffer`"""
+    if error.msg.startswith("Unterminated string"):
+        # Strings can't hold raw newlines, so an unclosed one mid-file fails differently
+        return True
+    rest = buffer[error.pos:].rstrip()
+    if error.msg.startswith("Invalid \\uXXXX escape"):
+        return len(rest) < len("\\ud83d\\ude00")
+    if error.pos and buffer[error.pos - 1].isdigit() and _NUMBER_TAIL.fullmatch(rest):
+        # A number cut before its fraction or exponent digits ("2." or "2.5e" of "2.5e3")
+        return True
+    # Nothing but whitespace after the error, or the start of a literal ("tr", "-Inf")
+    return any(literal.startswith(rest) for literal in _LITERALS)
+
+
+class _JsonStream:
+    """Reads consecutive JSON values from a file in chunks, tracking the current line"""
+
+    def __init__(self, path: Path, fh, chunk_size: int):
+        self.path = path
+        self.fh = fh
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.line = 1
+        self.eof = False
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.fh.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _advance(self, end: int):
+        self.line += self.buffer.count("\n", self.pos, end)
+        self.pos = end
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character, or '' at the end of the file"""
+        while True:
+            match = _NON_WHITESPACE.search(self.buffer, self.pos)
+            if match:
+                self._advance(match.start())
+                return self.buffer[self.pos]
+            self._advance(len(self.buffer))
+            if not self._fill():
+                return ""
+
+    def take(self):
+        self._advance(self.pos + 1)
+
+    def value(self) -> Any:
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                # A value cut off by the chunk boundary continues in the next chunk;
+                # anything else is a syntax error, reported without reading further
+                if _truncated(self.buffer, e) and self._fill():
+                    continue
+                raise ContentError(self.path, self.line + self.buffer.count("\n", self.pos, e.pos), e.msg)
+            # A number cut off by the chunk boundary ("12" of "125", "2.5" of "2.5e3")
+            # decodes fine, so only trust it once a delimiter follows
+            if (isinstance(value, (int, float)) and self.buffer[end:end + 1] not in _NUMBER_ENDS
+                    and self._fill()):
+                continue
+            self._advance(end)
+            return value
+
+    def error(self, message: str) -> ContentError:
+        return ContentError(self.path, self.line, message)
+
+
+def iter_json_records(path: Path, chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[int, Any]]:
+    """Yield the elements of a top-level JSON array one by one, or a single top-level object"""
+    with open(path, encoding="utf-8") as fh:
+        stream = _JsonStream(path, fh, chunk_size)
+        first = stream.peek()
+        if first == "{":
+            yield stream.line, stream.value()
+        elif first == "[":
+            stream.take()
+            if stream.peek() == "]":
+                stream.take()
+            else:
+                while True:
+                    stream.peek()
+                    line = stream.line
+                    yield line, stream.value()
+                    separator = stream.peek()
+                    stream.take()
+                    if separator == "]":
+                        break
+                    if separator != ",":
+                        raise stream.error("Expecting ',' or ']' after an array element")
+        elif first:
+            raise stream.error("Expecting a top-level array or object")
+        if stream.peek():
+            raise stream.error("Extra data after the top-level value")
+
+
+def iter_yaml_records(path: Path) -> Iterator[Tuple[int, Any]]:
+    """Yield the items of a top-level YAML list, or each document of a multi-document stream.
+
+    The loader is driven event by event: a top-level list is never composed
+    as a whole, only one item at a time, so memory stays flat however long
+    the file is. Anchors defined by earlier items stay usable for the rest
+    of their document.
+    """
+    try:
+        import yaml
+    except ImportError:
+        raise ContentError(path, 1, "PyYAML is required for YAML content (pip install pyyaml)")
+    with open(path, encoding="utf-8") as fh:
+        loader = yaml.SafeLoader(fh)
+        try:
+            loader.get_event()  # StreamStart
+            while not loader.check_event(yaml.StreamEndEvent):
+                loader.get_event()  # DocumentStart
+                if loader.check_event(yaml.SequenceStartEvent):
+                    loader.get_event()
+                    while not loader.check_event(yaml.SequenceEndEvent):
+                        item = loader.compose_node(None, None)
+                        yield item.start_mark.line + 1, loader.construct_document(item)
+                    loader.get_event()
+                else:
+                    node = loader.compose_node(None, None)
+                    yield node.start_mark.line + 1, loader.construct_document(node)
+                loader.get_event()  # DocumentEnd
+                loader.anchors = {}
+        except yaml.YAMLError as e:
+            mark = getattr(e, "problem_mark", None) or getattr(e, "context_mark", None)
+            raise ContentError(path, mark.line + 1 if mark else 1, str(getattr(e, "problem", None) or e))
+        finally:
+            loader.dispose()
+
+
+def iter_records(path: Path) -> Iterator[Tuple[int, Any]]:
+    suffix = path.suffix.lower()
+    if suffix in (".ndjson", ".jsonl"):
+        return iter_ndjson_records(path)
+    if suffix == ".json":
+        return iter_json_records(path)
+    return iter_yaml_records(path)
+
+
+# Validation
+
+def format_validation_error(error: ValidationError) -> List[str]:
+    return [
+        f"{'.'.join(str(part) for part in detail['loc']) or 'record'}: {detail['msg']}"
+        for detail in error.errors()
+    ]
+
+
+def validated_records(path: Path, collection: str, errors: List[str]) -> Iterator[Tuple[int, BaseModel]]:
+    """Yield (line, model) for each valid record of `path`; append everything else to `errors`"""
+    model = CREATE_MODELS[collection]
+    try:
+        for line, record in iter_records(path):
+            if not isinstance(record, dict):
+                errors.append(str(ContentError(path, line, "Expecting an object")))
+                continue
+            try:
+                yield line, model.model_validate(record)
+            except ValidationError as e:
+                errors.extend(str(ContentError(path, line, message)) for message in format_validation_error(e))
+    except ContentError as e:
+        # Parse errors end the file; records before them were already yielded
+        errors.append(str(e))
+    except (OSError, UnicodeDecodeError) as e:
+        errors.append(str(ContentError(path, 1, str(e))))
+
+
+def collection_for(path: Path) -> str:
+    return path.stem
+
+
+def content_files(paths: List[Path]) -> List[Path]:
+    """Expand directories into their content files, in a stable order"""
+    files = []
+    for path in paths:
+        if path.is_dir():
+            files.extend(sorted(child for child in path.iterdir() if child.suffix.lower() in CONTENT_SUFFIXES))
+        else:
+            files.append(path)
+    return files
+
+
+async def load_content(db, paths: List[Path], batch_size: int = BATCH_SIZE, prune: bool = False) -> Dict[str, Any]:
+    """Validate and write every record in `paths`; `db` None only validates.
+
+    Files for the same collection share one SeedWriter. With `prune`,
+    documents no record matched are deleted, except in collections that had
+    errors, where a missing record may just be an invalid one.
+    """
+    errors: List[str] = []
+    by_collection: Dict[str, List[Path]] = {}
+    for path in content_files(paths):
+        collection = collection_for(path)
+        if collection not in CREATE_MODELS:
+            errors.append(str(ContentError(path, 1, f"Unknown collection '{collection}'; expected one of: "
+                                                    f"{', '.join(CREATE_MODELS)}")))
+            continue
+        by_collection.setdefault(collection, []).append(path)
+
+    reports: Dict[str, Dict[str, Any]] = {}
+    for collection, files in by_collection.items():
+        writer: Optional[SeedWriter] = None
+        if db is not None:
+            writer = SeedWriter(db, collection, batch_size=batch_size, prune=False)
+            await writer.start()
+        error_count = len(errors)
+        valid = 0
+        for path in files:
+            for line, item in validated_records(path, collection, errors):
+                valid += 1
+                if writer is None:
+                    continue
+                try:
+                    await writer.add(item)
+                except ValueError as e:
+                    errors.append(str(ContentError(path, line, str(e))))
+        if writer is None:
+            reports[collection] = {"valid": valid}
+            continue
+        writer.prune = prune and len(errors) == error_count
+        reports[collection] = await writer.finish()
+    return {"collections": reports, "errors": errors}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Load portfolio content from JSON, YAML or NDJSON files")
+    parser.add_argument("paths", nargs="+", type=Path, help="content files, or directories of them")
+    parser.add_argument("--check", action="store_true", help="only parse and validate; don't touch the database")
+    parser.add_argument("--prune", action="store_true",
+                        help="delete stored documents that no record in the files matches")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="operations per bulk_write")
+    args = parser.parse_args()
+
+    db = None
+    if not args.check:
+        mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+        db_name = os.environ.get('DB_NAME', 'portfolio')
+        db = DatabaseManager(mongo_url, db_name)
+
+    print("📥 Loading portfolio content...")
+    result = await load_content(db.db if db else None, args.paths, args.batch_size, args.prune)
+    if db is not None:
+        await db.close()
+        print_seed_report(result["collections"], details=False)
+    else:
+        for collection, report in result["collections"].items():
+            print(f"✅ {collection}: {report['valid']} valid records")
+
+    for error in result["errors"]:
+        print(f"❌ {error}")
+    if result["errors"]:
+        print(f"⚠️ {len(result['errors'])} errors; the records they refer to were not loaded")
+        sys.exit(1)
+    print("🎉 Content loaded successfully")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
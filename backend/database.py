@@ -1,25 +1,185 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 from models import *
+from cache import ContentCache, cached, invalidates
+from indexes import ensure_indexes, index_report
+from pagination import (decode_cursor, decode_offset_cursor, encode_cursor, encode_offset_cursor,
+                        keyset_filter, keyset_sort, page_size)
+from mongo_pool import PoolMetrics
+from pymongo import monitoring
+from tracing import phase
+from hydration import hydrate, hydration_modes_from_env
+from contact_dedup import contact_content_hash
+from pymongo.errors import DuplicateKeyError
+from bson import ObjectId
+from datetime import timedelta
+import asyncio
 import os
-from typing import List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+# Sections of the aggregated portfolio bundle, keyed by their response name
+PORTFOLIO_SECTIONS = {
+    "personalInfo": "get_personal_info",
+    "about": "get_about",
+    "skills": "get_skills",
+    "projects": "get_projects",
+    "experience": "get_experience",
+    "education": "get_education",
+    "certifications": "get_certifications",
+}
+
+# Model and keyset sort order for paginated reads; `_id` is appended as the tiebreaker
+PAGINATED_COLLECTIONS = {
+    "skills": (Skills, []),
+    "projects": (Project, []),
+    "experience": (Experience, [("startedAt", -1)]),
+    "education": (Education, [("startedAt", -1)]),
+    "certifications": (Certification, [("issuedAt", -1)]),
+    "contact_messages": (ContactMessage, [("createdAt", -1)]),
+}
+
+# Most documents a list read returns without ?limit=, as before pagination existed;
+# pages past it are reachable with limit/cursor
+UNPAGINATED_READ_LIMIT = 1000
+
+# MONGO_URL prefix that selects the in-memory stand-in (memory_mongo.py)
+MEMORY_URL_SCHEME = "memory://"
+
+# Per-status contact message counts, kept in one document of the `counters` collection
+CONTACT_COUNTS_ID = "contact_messages"
 
 class DatabaseManager:
-    def __init__(self, mongo_url: str, db_name: str):
-        self.client = AsyncIOMotorClient(mongo_url)
-        self.db = self.client[db_name]
+    def __init__(self, mongo_url: str, db_name: str, cache: Optional[ContentCache] = None,
+                 client_options: Optional[Dict[str, Any]] = None, connect: bool = True,
+                 hydration_modes: Optional[Dict[str, str]] = None):
+        self.mongo_url = mongo_url
+        self.db_name = db_name
+        self.client_options = client_options or {}
+        # Checkout waits and in-use counts, fed by the driver's pool events
+        self.pool_metrics = PoolMetrics()
+        # Command listeners (metrics, request tracing); add them before the client is created
+        self.command_listeners: List[monitoring.CommandListener] = []
+        self.client = None
+        self.db = None
+        # Read-through cache for portfolio content; None means every read hits Mongo
+        self.cache = cache
+        # Optional write-behind queue for contact messages, started by the app
+        self.contact_writes = None
+        # Collapses repeated contact submissions; None stores every submission
+        self.contact_dedup = None
+        # Per-collection model hydration strategy for reads (see hydration.py)
+        self.hydration_modes = hydration_modes if hydration_modes is not None else hydration_modes_from_env()
+        if connect:
+            self._create_client()
+    
+    def _create_client(self):
+        if self.mongo_url.startswith(MEMORY_URL_SCHEME):
+            # No server: local development and the load test harness. Imported
+            # here so production processes never load the stand-in
+            from memory_mongo import MemoryMongoClient
+            self.client = MemoryMongoClient()
+        else:
+            self.client = AsyncIOMotorClient(
+                self.mongo_url,
+                event_listeners=[self.pool_metrics, *self.command_listeners],
+                **self.client_options
+            )
+        self.db = self.client[self.db_name]
+    
+    async def connect(self, warmup_connections: int = 0):
+        """Create the client if needed, ping, and open `warmup_connections` pooled connections.
         
+        The pings run concurrently so each one checks out its own connection;
+        a failed ping raises, so an app started with this never serves requests
+        without a reachable database.
+        """
+        if self.client is None:
+            self._create_client()
+        await self.client.admin.command("ping")
+        if warmup_connections > 1:
+            await asyncio.gather(*(
+                self.client.admin.command("ping") for _ in range(warmup_connections)
+            ))
+    
+    def pool_stats(self) -> Dict[str, Any]:
+        return {
+            "connected": self.client is not None,
+            "options": self.client_options,
+            **self.pool_metrics.snapshot()
+        }
+    
     async def close(self):
-        self.client.close()
+        if self.client is not None:
+            self.client.close()
+            self.client = None
+            self.db = None
+    
+    def hydrate(self, collection: str, model: Type[BaseModel], docs: List[Dict[str, Any]]) -> list:
+        with phase("hydrate"):
+            return hydrate(model, docs, self.hydration_modes.get(collection, "validate"))
+    
+    async def ensure_indexes(self) -> Dict[str, List[str]]:
+        return await ensure_indexes(self.db)
+    
+    async def index_report(self) -> Dict[str, Any]:
+        return await index_report(self.db)
+    
+    async def warm_cache(self):
+        """Prime the content cache so the first visitors don't pay for Mongo round-trips"""
+        if self.cache is None:
+            return
+        await asyncio.gather(
+            self.get_personal_info(),
+            self.get_about(),
+            self.get_skills(),
+            self.get_projects(),
+            self.get_experience(),
+            self.get_education(),
+            self.get_certifications(),
+        )
+    
+    # Portfolio Bundle Operations
+    async def get_portfolio(self, sections: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Fetch the requested portfolio sections concurrently"""
+        names = list(dict.fromkeys(sections or PORTFOLIO_SECTIONS))
+        results = await asyncio.gather(*(getattr(self, PORTFOLIO_SECTIONS[name])() for name in names))
+        return dict(zip(names, results))
+    
+    # Paginated Reads
+    async def get_page(self, collection: str, query: Optional[dict] = None, fields: Optional[Tuple[str, ...]] = None,
+                       limit: Optional[int] = None, cursor: Optional[str] = None) -> Tuple[list, Optional[str]]:
+        """Return one keyset page of `collection` and the cursor for the next page, if any"""
+        model, sort = PAGINATED_COLLECTIONS[collection]
+        sort = keyset_sort(sort)
+        size = page_size(limit)
+        query = dict(query or {})
+        if cursor:
+            after = keyset_filter(sort, decode_cursor(collection, sort, cursor))
+            query = {"$and": [query, after]} if query else after
+        
+        # The cursor is built from the sort keys, so fetch them even when not selected
+        fetch = projection(fields)
+        if fetch:
+            fetch.update({field: 1 for field, _ in sort})
+        docs = await self.db[collection].find(query, fetch).sort(sort).limit(size + 1).to_list(size + 1)
+        next_cursor = None
+        if len(docs) > size:
+            docs = docs[:size]
+            next_cursor = encode_cursor(collection, sort, docs[-1])
+        
+        if fields:
+            docs = [{name: value for name, value in doc.items() if name == '_id' or name in fields} for doc in docs]
+        items = self.hydrate(collection, partial_model(model) if fields else model, docs)
+        return items, next_cursor
     
     # Personal Info Operations
+    @cached("personal_info")
     async def get_personal_info(self) -> Optional[PersonalInfo]:
         doc = await self.db.personal_info.find_one()
         if doc:
-            doc['id'] = str(doc['_id'])
-            del doc['_id']
-            return PersonalInfo(**doc)
+            return self.hydrate("personal_info", PersonalInfo, [doc])[0]
         return None
     
+    @invalidates("personal_info")
     async def create_or_update_personal_info(self, personal_info: PersonalInfoCreate) -> PersonalInfo:
         existing = await self.db.personal_info.find_one()
         personal_info_dict = personal_info.dict()
@@ -39,14 +199,14 @@ class DatabaseManager:
         return PersonalInfo(**personal_info_dict)
     
     # About Operations
+    @cached("about")
     async def get_about(self) -> Optional[About]:
         doc = await self.db.about.find_one()
         if doc:
-            doc['id'] = str(doc['_id'])
-            del doc['_id']
-            return About(**doc)
+            return self.hydrate("about", About, [doc])[0]
         return None
     
+    @invalidates("about")
     async def create_or_update_about(self, about: AboutCreate) -> About:
         existing = await self.db.about.find_one()
         about_dict = about.dict()
@@ -66,15 +226,13 @@ class DatabaseManager:
         return About(**about_dict)
     
     # Skills Operations
-    async def get_skills(self) -> List[Skills]:
-        docs = await self.db.skills.find().to_list(1000)
-        skills = []
-        for doc in docs:
-            doc['id'] = str(doc['_id'])
-            del doc['_id']
-            skills.append(Skills(**doc))
-        return skills
+    @cached("skills")
+    async def get_skills(self, fields: Optional[Tuple[str, ...]] = None) -> List[Skills]:
+        # Same order as the keyset pages, so adding ?limit= doesn't reorder results
+        docs = await self.db.skills.find({}, projection(fields)).sort([("_id", 1)]).limit(UNPAGINATED_READ_LIMIT).to_list(UNPAGINATED_READ_LIMIT)
+        return self.hydrate("skills", partial_model(Skills) if fields else Skills, docs)
     
+    @invalidates("skills")
     async def create_skill(self, skill: SkillsCreate) -> Skills:
         skill_obj = Skills(**skill.dict())
         result = await self.db.skills.insert_one(skill_obj.dict())
@@ -83,16 +241,13 @@ class DatabaseManager:
         return Skills(**skill_dict)
     
     # Projects Operations
-    async def get_projects(self, category: Optional[str] = None) -> List[Project]:
+    @cached("projects")
+    async def get_projects(self, category: Optional[str] = None, fields: Optional[Tuple[str, ...]] = None) -> List[Project]:
         query = {"category": category} if category else {}
-        docs = await self.db.projects.find(query).to_list(1000)
-        projects = []
-        for doc in docs:
-            doc['id'] = str(doc['_id'])
-            del doc['_id']
-            projects.append(Project(**doc))
-        return projects
+        docs = await self.db.projects.find(query, projection(fields)).sort([("_id", 1)]).limit(UNPAGINATED_READ_LIMIT).to_list(UNPAGINATED_READ_LIMIT)
+        return self.hydrate("projects", partial_model(Project) if fields else Project, docs)
     
+    @invalidates("projects")
     async def create_project(self, project: ProjectCreate) -> Project:
         project_obj = Project(**project.dict())
         result = await self.db.projects.insert_one(project_obj.dict())
@@ -101,32 +256,26 @@ class DatabaseManager:
         return Project(**project_dict)
     
     # Experience Operations
-    async def get_experience(self) -> List[Experience]:
-        docs = await self.db.experience.find().sort("startDate", -1).to_list(1000)
-        experience = []
-        for doc in docs:
-            doc['id'] = str(doc['_id'])
-            del doc['_id']
-            experience.append(Experience(**doc))
-        return experience
+    @cached("experience")
+    async def get_experience(self, fields: Optional[Tuple[str, ...]] = None) -> List[Experience]:
+        docs = await self.db.experience.find({}, projection(fields)).sort([("startedAt", -1), ("_id", -1)]).limit(UNPAGINATED_READ_LIMIT).to_list(UNPAGINATED_READ_LIMIT)
+        return self.hydrate("experience", partial_model(Experience) if fields else Experience, docs)
     
+    @invalidates("experience")
     async def create_experience(self, experience: ExperienceCreate) -> Experience:
         experience_obj = Experience(**experience.dict())
-        result = await self.db.experience.insert_one(experience_obj.dict())
+        result = await self.db.experience.insert_one(experience_document(experience_obj, experience.dict()))
         experience_dict = experience_obj.dict()
         experience_dict['id'] = str(result.inserted_id)
         return Experience(**experience_dict)
     
     # Education Operations
-    async def get_education(self) -> List[Education]:
-        docs = await self.db.education.find().sort("startDate", -1).to_list(1000)
-        education = []
-        for doc in docs:
-            doc['id'] = str(doc['_id'])
-            del doc['_id']
-            education.append(Education(**doc))
-        return education
+    @cached("education")
+    async def get_education(self, fields: Optional[Tuple[str, ...]] = None) -> List[Education]:
+        docs = await self.db.education.find({}, projection(fields)).sort([("startedAt", -1), ("_id", -1)]).limit(UNPAGINATED_READ_LIMIT).to_list(UNPAGINATED_READ_LIMIT)
+        return self.hydrate("education", partial_model(Education) if fields else Education, docs)
     
+    @invalidates("education")
     async def create_education(self, education: EducationCreate) -> Education:
         education_obj = Education(**education.dict())
         result = await self.db.education.insert_one(education_obj.dict())
@@ -135,15 +284,12 @@ class DatabaseManager:
         return Education(**education_dict)
     
     # Certifications Operations
-    async def get_certifications(self) -> List[Certification]:
-        docs = await self.db.certifications.find().sort("issueDate", -1).to_list(1000)
-        certifications = []
-        for doc in docs:
-            doc['id'] = str(doc['_id'])
-            del doc['_id']
-            certifications.append(Certification(**doc))
-        return certifications
+    @cached("certifications")
+    async def get_certifications(self, fields: Optional[Tuple[str, ...]] = None) -> List[Certification]:
+        docs = await self.db.certifications.find({}, projection(fields)).sort([("issuedAt", -1), ("_id", -1)]).limit(UNPAGINATED_READ_LIMIT).to_list(UNPAGINATED_READ_LIMIT)
+        return self.hydrate("certifications", partial_model(Certification) if fields else Certification, docs)
     
+    @invalidates("certifications")
     async def create_certification(self, certification: CertificationCreate) -> Certification:
         certification_obj = Certification(**certification.dict())
         result = await self.db.certifications.insert_one(certification_obj.dict())
@@ -152,18 +298,185 @@ class DatabaseManager:
         return Certification(**certification_dict)
     
     # Contact Messages Operations
-    async def create_contact_message(self, message: ContactMessageCreate) -> ContactMessage:
+    async def create_contact_message(self, message: ContactMessageCreate, idempotency_key: Optional[str] = None) -> ContactMessage:
+        if self.contact_dedup is None:
+            return await self._create_contact_message(message, None)
+        content_hash = contact_content_hash(message)
+        return await self.contact_dedup.submit(
+            content_hash, idempotency_key,
+            lambda: self._create_contact_message(message, content_hash)
+        )
+    
+    async def _create_contact_message(self, message: ContactMessageCreate, content_hash: Optional[str]) -> ContactMessage:
         message_obj = ContactMessage(**message.dict())
-        result = await self.db.contact_messages.insert_one(message_obj.dict())
-        message_dict = message_obj.dict()
-        message_dict['id'] = str(result.inserted_id)
-        return ContactMessage(**message_dict)
-    
-    async def get_contact_messages(self) -> List[ContactMessage]:
-        docs = await self.db.contact_messages.find().sort("createdAt", -1).to_list(1000)
-        messages = []
-        for doc in docs:
-            doc['id'] = str(doc['_id'])
-            del doc['_id']
-            messages.append(ContactMessage(**doc))
-        return messages
\ No newline at end of file
+        doc = message_obj.dict()
+        if content_hash:
+            doc['contentHash'] = content_hash
+        if self.contact_writes is not None:
+            if content_hash:
+                # Settle duplicates before queueing: the reply's _id must be the one that gets stored
+                existing = await self.db.contact_messages.find_one({"contentHash": content_hash})
+                if existing is not None and self._is_contact_repeat(doc, existing):
+                    return self.hydrate("contact_messages", ContactMessage, [existing])[0]
+            # The _id is assigned here so the reply can carry it before the batch is written
+            doc['_id'] = ObjectId()
+            if self.contact_writes.submit(doc):
+                message_dict = message_obj.dict()
+                message_dict['id'] = str(doc['_id'])
+                return ContactMessage(**message_dict)
+        stored = await self.insert_contact_doc(doc)
+        return self.hydrate("contact_messages", ContactMessage, [stored])[0]
+    
+    async def insert_contact_doc(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Insert a contact message document, or return the stored one it duplicates.
+        
+        A `contentHash` clash with a message created within the dedup window
+        returns that message. An older one gives up its hash so the new
+        message is stored and becomes the one later repeats match.
+        """
+        for _ in range(3):
+            try:
+                await self.db.contact_messages.insert_one(doc)
+                await self.count_new_contact_messages(1)
+                return doc
+            except DuplicateKeyError:
+                if 'contentHash' not in doc:
+                    raise
+                existing = await self.db.contact_messages.find_one({"contentHash": doc['contentHash']})
+                if existing is None:
+                    continue
+                if self._is_contact_repeat(doc, existing):
+                    return existing
+                await self.db.contact_messages.update_one(
+                    {"_id": existing['_id'], "contentHash": doc['contentHash']},
+                    {"$unset": {"contentHash": ""}}
+                )
+        await self.db.contact_messages.insert_one(doc)
+        await self.count_new_contact_messages(1)
+        return doc
+    
+    def _is_contact_repeat(self, doc: Dict[str, Any], existing: Dict[str, Any]) -> bool:
+        """Whether `doc` repeats `existing` (same contentHash) within the dedup window"""
+        window = timedelta(seconds=self.contact_dedup.window if self.contact_dedup else 0)
+        return doc['createdAt'] - existing['createdAt'] <= window
+    
+    async def insert_queued_contact_doc(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Store a write-behind document whose `_id` the client already has.
+        
+        Repeats are normally caught before queueing, but another process can
+        store the same content in between. The earlier message keeps the hash
+        and this one is stored without it, so the returned `_id` still exists.
+        """
+        stored = await self.insert_contact_doc(doc)
+        if stored['_id'] != doc['_id']:
+            doc = {key: value for key, value in doc.items() if key != 'contentHash'}
+            await self.db.contact_messages.insert_one(doc)
+            await self.count_new_contact_messages(1)
+        return doc
+    
+    async def set_contact_status(self, status: str, ids: Optional[List[ObjectId]] = None,
+                                 from_status: Optional[str] = None, until: Optional[datetime] = None) -> Dict[str, int]:
+        """Move the selected messages to `status`; return how many left each previous status.
+        
+        One update_many per previous status, each filtered on that status, so
+        the returned counts (and the counter document) match exactly what was
+        changed even when admins act on the same messages concurrently.
+        """
+        query = self.contact_query(until=until)
+        if ids is not None:
+            query["_id"] = {"$in": ids}
+        sources = [from_status] if from_status else list(CONTACT_STATUSES)
+        sources = [source for source in sources if source != status]
+        update = {"$set": {"status": status, "updatedAt": datetime.utcnow()}}
+        results = await asyncio.gather(*(
+            self.db.contact_messages.update_many({**query, "status": source}, update) for source in sources
+        ))
+        moved = {source: result.modified_count for source, result in zip(sources, results)}
+        deltas = {source: -count for source, count in moved.items()}
+        deltas[status] = sum(moved.values())
+        await self._bump_contact_counts(deltas)
+        return moved
+    
+    # Contact Message Counters
+    async def count_new_contact_messages(self, count: int):
+        await self._bump_contact_counts({"new": count})
+    
+    async def _bump_contact_counts(self, deltas: Dict[str, int]):
+        # No upsert: a missing document is rebuilt from the collection on first read
+        deltas = {status: count for status, count in deltas.items() if count}
+        if deltas:
+            await self.db.counters.update_one(
+                {"_id": CONTACT_COUNTS_ID},
+                {"$inc": deltas, "$set": {"updatedAt": datetime.utcnow()}}
+            )
+    
+    async def get_contact_counts(self, rebuild: bool = False) -> Dict[str, Any]:
+        """Per-status message counts from the counter document; one indexed read"""
+        doc = None if rebuild else await self.db.counters.find_one({"_id": CONTACT_COUNTS_ID})
+        if doc is None:
+            doc = await self.rebuild_contact_counts()
+        counts = {status: doc.get(status, 0) for status in CONTACT_STATUSES}
+        return {**counts, "total": sum(counts.values()), "updatedAt": doc.get("updatedAt")}
+    
+    async def rebuild_contact_counts(self) -> Dict[str, Any]:
+        """Recount messages per status with one aggregation and replace the counter document"""
+        groups = await self.db.contact_messages.aggregate([
+            {"$group": {"_id": "$status", "count": {"$sum": 1}}}
+        ]).to_list(None)
+        doc = {"_id": CONTACT_COUNTS_ID, **{status: 0 for status in CONTACT_STATUSES}}
+        doc.update({group["_id"]: group["count"] for group in groups if group["_id"] in CONTACT_STATUSES})
+        doc["updatedAt"] = datetime.utcnow()
+        await self.db.counters.replace_one({"_id": CONTACT_COUNTS_ID}, doc, upsert=True)
+        return doc
+    
+    @staticmethod
+    def contact_query(status: Optional[str] = None, since: Optional[datetime] = None,
+                      until: Optional[datetime] = None) -> Dict[str, Any]:
+        """Status and createdAt range filter, served by the status_createdAt_id / createdAt_id indexes"""
+        query: Dict[str, Any] = {}
+        if status:
+            query["status"] = status
+        if since or until:
+            query["createdAt"] = {}
+            if since:
+                query["createdAt"]["$gte"] = since
+            if until:
+                query["createdAt"]["$lt"] = until
+        return query
+    
+    async def get_contact_messages(self, limit: Optional[int] = None, cursor: Optional[str] = None,
+                                   search: Optional[str] = None, status: Optional[str] = None,
+                                   since: Optional[datetime] = None, until: Optional[datetime] = None) -> Tuple[List[ContactMessage], Optional[str]]:
+        query = self.contact_query(status, since, until)
+        if search:
+            return await self.search_contact_messages(search, query, limit, cursor)
+        return await self.get_page("contact_messages", query, limit=limit, cursor=cursor)
+    
+    async def search_contact_messages(self, search: str, query: Optional[Dict[str, Any]] = None,
+                                      limit: Optional[int] = None, cursor: Optional[str] = None) -> Tuple[List[ContactMessage], Optional[str]]:
+        """Text search over name, email, company, subject and message, most relevant first.
+        
+        Relevance scores can't be range-filtered, so pages are resumed by offset.
+        """
+        size = page_size(limit)
+        offset = decode_offset_cursor("contact_messages:search", cursor) if cursor else 0
+        query = {"$text": {"$search": search}, **(query or {})}
+        docs = await self.db.contact_messages.find(
+            query, {"score": {"$meta": "textScore"}}
+        ).sort([
+            ("score", {"$meta": "textScore"}), ("createdAt", -1), ("_id", -1)
+        ]).skip(offset).limit(size + 1).to_list(size + 1)
+        next_cursor = None
+        if len(docs) > size:
+            docs = docs[:size]
+            next_cursor = encode_offset_cursor("contact_messages:search", offset + size)
+        return self.hydrate("contact_messages", ContactMessage, docs), next_cursor
+    
+    async def iter_contact_messages(self, status: Optional[str] = None, since: Optional[datetime] = None,
+                                    until: Optional[datetime] = None, batch_size: int = 500) -> AsyncIterator[Dict[str, Any]]:
+        """Stream raw contact message documents, newest first, without materializing the result"""
+        query = self.contact_query(status, since, until)
+        cursor = self.db.contact_messages.find(query).sort([("createdAt", -1), ("_id", -1)]).batch_size(batch_size)
+        async for doc in cursor:
+            doc['id'] = str(doc.pop('_id'))
+            yield doc
@@ -0,0 +1,125 @@
+import hashlib
+from typing import List, Optional, Tuple
+
+Headers = List[Tuple[bytes, bytes]]
+
+# Headers that describe the body and must not be sent with a 304
+_ENTITY_HEADERS = {b"content-length", b"content-type", b"content-encoding"}
+
+# Failure envelopes start like this (ApiResponse encodes `success` first, compactly);
+# they must not become validators clients revalidate against
+_FAILURE_PREFIX = b'{"success":false'
+
+
+def make_etag(body: bytes) -> str:
+    """Strong validator derived from the encoded response body."""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    # If-None-Match uses the weak comparison function (RFC 9110 13.1.2)
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def _header(headers: Headers, name: bytes) -> Optional[bytes]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+class ETagMiddleware:
+    """Conditional GET support for every read route.
+
+    Responses that already carry an ETag (such as bodies served from the
+    response cache) are answered with 304 as soon as the start message
+    arrives, before any Mongo query or encoding. Other successful JSON
+    responses with a known length are buffered and hashed; for those routes
+    (e.g. /api/portfolio) the handler has already run by then, so a 304
+    saves bandwidth only. Failure envelopes (`success: false`) get no ETag
+    or Cache-Control. Streaming responses pass through untouched.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        raw = _header(scope["headers"], b"if-none-match")
+        if_none_match = raw.decode("latin-1") if raw is not None else None
+        state = {"mode": "pass", "start": None, "chunks": []}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                etag = _header(headers, b"etag")
+                if message["status"] != 200:
+                    await send(message)
+                elif etag is not None:
+                    if etag_matches(etag.decode("latin-1"), if_none_match):
+                        state["mode"] = "not_modified"
+                        await send(_not_modified(headers))
+                    else:
+                        await send(_with_revalidation(message, headers))
+                elif (_header(headers, b"content-length") is not None
+                      and (_header(headers, b"content-type") or b"").startswith(b"application/json")):
+                    state["mode"] = "buffer"
+                    state["start"] = message
+                else:
+                    await send(message)
+                return
+
+            if message["type"] != "http.response.body" or state["mode"] == "pass":
+                await send(message)
+            elif state["mode"] == "not_modified":
+                if not message.get("more_body", False):
+                    await send({"type": "http.response.body", "body": b""})
+            else:
+                state["chunks"].append(message.get("body", b""))
+                if message.get("more_body", False):
+                    return
+                body = b"".join(state["chunks"])
+                start = state["start"]
+                if body.startswith(_FAILURE_PREFIX):
+                    await send(start)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                # The handler already ran: a match saves the transfer, not the work
+                etag = make_etag(body)
+                headers = list(start.get("headers", [])) + [(b"etag", etag.encode("latin-1"))]
+                if etag_matches(etag, if_none_match):
+                    await send(_not_modified(headers))
+                    await send({"type": "http.response.body", "body": b""})
+                else:
+                    await send(_with_revalidation(start, headers))
+                    await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
+
+
+def _with_revalidation(message, headers: Headers):
+    # Let browsers keep the body but revalidate it on every use
+    if _header(headers, b"cache-control") is None:
+        headers = headers + [(b"cache-control", b"no-cache")]
+    return {**message, "headers": headers}
+
+
+def _not_modified(headers: Headers):
+    headers = [(k, v) for k, v in headers if k.lower() not in _ENTITY_HEADERS]
+    if _header(headers, b"cache-control") is None:
+        headers.append((b"cache-control", b"no-cache"))
+    return {"type": "http.response.start", "status": 304, "headers": headers}
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Static snapshot exporter for the Portfolio API
+
+Calls every public read endpoint through the FastAPI app in-process and writes
+the responses as JSON files with pre-compressed .gz and .br siblings, plus an
+nginx include that serves them. Reads
+then never reach uvicorn; anything without a snapshot file falls back to the
+backend, which keeps handling POST /api/contact and the admin routes.
+
+Re-run after every seed so the snapshot matches the database.
+"""
+
+import argparse
+import asyncio
+import gzip
+import os
+import shutil
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+from urllib.parse import quote, urlencode
+
+import brotli
+import httpx
+
+from server import app, db_manager
+
+# Read endpoints that are safe to serve as static files
+SNAPSHOT_ROUTES = [
+    "/api/portfolio",
+    "/api/personal-info",
+    "/api/about",
+    "/api/skills",
+    "/api/projects",
+    "/api/experience",
+    "/api/education",
+    "/api/certifications",
+    "/api/resume-url",
+]
+
+
+def snapshot_file(route: str, query: str = "") -> str:
+    """Path (relative to the snapshot root) nginx resolves via `$args`."""
+    return f"{route.lstrip('/')}/_{query}.json"
+
+
+def write_compressed(path: Path, body: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(body)
+    with open(f"{path}.gz", "wb") as fh:
+        # mtime=0 keeps the .gz byte-identical across exports of the same data
+        fh.write(gzip.compress(body, compresslevel=9, mtime=0))
+    Path(f"{path}.br").write_bytes(brotli.compress(body, quality=11))
+
+
+def render_nginx_include(root: str, backend_url: str, brotli_static: bool) -> str:
+    lines = [
+        f"# Generated by export_snapshot.py on {datetime.utcnow().isoformat()}Z -- do not edit",
+        "# Include inside the portfolio `server { }` block.",
+        "",
+        "# Served by the backend: misses, and CORS preflights (the app's CORSMiddleware answers those)",
+        "location @portfolio_backend {",
+        f"    proxy_pass {backend_url};",
+        "    proxy_set_header Host $host;",
+        "    proxy_set_header X-Forwarded-For $proxy_add_x_forwarded_for;",
+        "}",
+    ]
+    for route in SNAPSHOT_ROUTES:
+        lines += [
+            "",
+            f"location = {route} {{",
+            "    limit_except GET HEAD OPTIONS { deny all; }",
+            "    error_page 418 = @portfolio_backend;",
+            "    if ($request_method = OPTIONS) { return 418; }",
+            f"    root {root};",
+            "    default_type application/json;",
+            "    add_header Cache-Control \"no-cache\";",
+            # What CORSMiddleware sends on these reads, so browsers on the frontend origin keep working
+            "    add_header Access-Control-Allow-Origin \"*\" always;",
+            "    add_header Access-Control-Allow-Credentials \"true\" always;",
+            "    gzip_static on;",
+        ]
+        if brotli_static:
+            lines.append("    brotli_static on;")
+        # $args is the raw query string, so each exported variant has its own file
+        lines += [
+            f"    try_files /{route.lstrip('/')}/_$args.json @portfolio_backend;",
+            "}",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+async def collect(client: httpx.AsyncClient) -> Dict[str, bytes]:
+    files: Dict[str, bytes] = {}
+
+    async def fetch(route: str, query: str = "") -> dict:
+        url = f"{route}?{query}" if query else route
+        response = await client.get(url)
+        payload = response.json()
+        if response.status_code != 200 or not payload.get("success"):
+            raise RuntimeError(f"{url} returned {response.status_code}: {payload.get('error')}")
+        files[snapshot_file(route, query)] = response.content
+        return payload
+
+    results = await asyncio.gather(*(fetch(route) for route in SNAPSHOT_ROUTES))
+    projects = results[SNAPSHOT_ROUTES.index("/api/projects")]["data"]
+
+    # Encode the way browsers and axios do (spaces as %20)
+    categories: List[str] = sorted({project["category"] for project in projects})
+    await asyncio.gather(*(
+        fetch("/api/projects", urlencode({"category": category}, quote_via=quote))
+        for category in categories
+    ))
+    return files
+
+
+def publish(files: Dict[str, bytes], out_dir: Path):
+    """Write the snapshot to a new directory and point the `out_dir` symlink at it.
+
+    The flip is one os.replace() of a symlink, so every request sees either
+    the old tree or the new one, never a missing or partial one. The
+    previous tree is removed afterwards.
+    """
+    version = out_dir.with_name(f"{out_dir.name}.{datetime.utcnow():%Y%m%d%H%M%S%f}-{os.getpid()}")
+    link = out_dir.with_name(f"{out_dir.name}.link-{os.getpid()}")
+    for relative, body in files.items():
+        write_compressed(version / relative, body)
+
+    previous = None
+    if out_dir.is_symlink():
+        previous = out_dir.parent / os.readlink(out_dir)
+    elif out_dir.exists():
+        # Snapshots from before the symlink layout: move the directory aside once
+        previous = out_dir.with_name(f"{out_dir.name}.legacy-{os.getpid()}")
+        out_dir.rename(previous)
+
+    if link.is_symlink():
+        link.unlink()
+    link.symlink_to(version.name)
+    os.replace(link, out_dir)
+    if previous is not None and previous.resolve() != version.resolve():
+        shutil.rmtree(previous, ignore_errors=True)
+
+
+async def export_snapshot(out_dir: Path, nginx_conf: Path, backend_url: str, brotli_static: bool) -> int:
+    # ASGITransport does not run the app lifespan, so open the client here
+    await db_manager.connect()
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://snapshot") as client:
+            files = await collect(client)
+    finally:
+        await db_manager.close()
+
+    publish(files, out_dir)
+    nginx_conf.parent.mkdir(parents=True, exist_ok=True)
+    nginx_conf.write_text(render_nginx_include(str(out_dir.absolute()), backend_url, brotli_static))
+    return len(files)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export Portfolio API reads as static, pre-compressed files")
+    parser.add_argument("--out", default="snapshot", help="snapshot directory served by nginx")
+    parser.add_argument("--nginx-conf", default="portfolio_api_snapshot.conf",
+                        help="where to write the nginx include")
+    parser.add_argument("--backend-url", default="http://127.0.0.1:8001",
+                        help="uvicorn upstream for requests without a snapshot file")
+    parser.add_argument("--brotli-static", action="store_true",
+                        help="emit `brotli_static on;` (requires the ngx_brotli module)")
+    args = parser.parse_args()
+
+    try:
+        count = asyncio.run(export_snapshot(Path(args.out), Path(args.nginx_conf), args.backend_url, args.brotli_static))
+    except Exception as e:
+        print(f"❌ Snapshot export failed: {e}")
+        sys.exit(1)
+
+    print(f"✅ Exported {count} responses to {args.out}")
+    print(f"✅ Wrote nginx include to {args.nginx_conf}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List
+
+# Flush a chunk to the client once this many bytes are buffered
+CHUNK_SIZE = 64 * 1024
+
+
+def _default(value: Any):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+async def ndjson_chunks(docs: AsyncIterator[Dict[str, Any]], fields: List[str]) -> AsyncIterator[bytes]:
+    """Encode documents as newline-delimited JSON, one object per line."""
+    buffer = []
+    size = 0
+    async for doc in docs:
+        line = json.dumps({name: doc.get(name) for name in fields}, ensure_ascii=False, default=_default) + "\n"
+        buffer.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            yield "".join(buffer).encode("utf-8")
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+async def csv_chunks(docs: AsyncIterator[Dict[str, Any]], fields: List[str]) -> AsyncIterator[bytes]:
+    """Encode documents as CSV with a header row."""
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(fields)
+    yield out.getvalue().encode("utf-8")
+    out.seek(0)
+    out.truncate()
+    async for doc in docs:
+        writer.writerow([_default(v) if isinstance(v, datetime) else v for v in (doc.get(name) for name in fields)])
+        if out.tell() >= CHUNK_SIZE:
+            yield out.getvalue().encode("utf-8")
+            out.seek(0)
+            out.truncate()
+    if out.tell():
+        yield out.getvalue().encode("utf-8")
@@ -0,0 +1,82 @@
+import os
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Tuple, Type
+
+from pydantic import BaseModel, TypeAdapter
+
+# How documents read back from each collection are turned into models:
+#   validate  - Model(**doc) per document (full validation, the original path)
+#   adapter   - one TypeAdapter(List[Model]) call per batch; still validates,
+#               but skips the per-document constructor overhead
+#   construct - no validation; the document's values become the model's
+#               field values directly (see construct()). Batches where any
+#               document lacks a field (projections, legacy documents) are
+#               hydrated with the adapter instead.
+# Only flat models whose documents are written by DatabaseManager itself are
+# constructed. Nested models (socialLinks, skill items) would be left as plain
+# dicts, and the dated sections rely on their before-validators to derive
+# startedAt/current/duration for documents that predate those fields, and a
+# current role's duration on every read (it is stored as null).
+HYDRATION_MODES = {
+    "personal_info": "adapter",
+    "about": "construct",
+    "skills": "adapter",
+    "projects": "construct",
+    "experience": "adapter",
+    "education": "adapter",
+    "certifications": "adapter",
+    "contact_messages": "construct",
+}
+
+MODES = ("validate", "adapter", "construct")
+
+def hydration_modes_from_env() -> Dict[str, str]:
+    """HYDRATION_MODES with HYDRATION_<COLLECTION> overrides applied"""
+    modes = {}
+    for collection, default in HYDRATION_MODES.items():
+        mode = os.environ.get(f"HYDRATION_{collection.upper()}", default).lower()
+        if mode not in MODES:
+            raise ValueError(f"HYDRATION_{collection.upper()} must be one of: {', '.join(MODES)}")
+        modes[collection] = mode
+    return modes
+
+
+@lru_cache(maxsize=None)
+def list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+
+@lru_cache(maxsize=None)
+def _field_names(model: Type[BaseModel]) -> Tuple[Tuple[str, ...], FrozenSet[str]]:
+    return tuple(model.model_fields), frozenset(model.model_fields)
+
+
+def construct(model: Type[BaseModel], doc: Dict[str, Any]) -> BaseModel:
+    """Trusted-data equivalent of model_construct() for a document carrying every field.
+
+    Skips model_construct()'s per-field default handling; values are copied in
+    field order, which keeps serialization identical to a validated model.
+    """
+    names, name_set = _field_names(model)
+    instance = model.__new__(model)
+    object.__setattr__(instance, '__dict__', {name: doc[name] for name in names})
+    object.__setattr__(instance, '__pydantic_fields_set__', set(name_set))
+    object.__setattr__(instance, '__pydantic_extra__', None)
+    object.__setattr__(instance, '__pydantic_private__', None)
+    return instance
+
+
+def hydrate(model: Type[BaseModel], docs: List[Dict[str, Any]], mode: str = "validate") -> List[BaseModel]:
+    """Build `model` instances from raw Mongo documents, renaming `_id` to `id` in place"""
+    for doc in docs:
+        doc['id'] = str(doc.pop('_id'))
+    if mode == "construct":
+        name_set = _field_names(model)[1]
+        if all(name_set <= doc.keys() for doc in docs):
+            return [construct(model, doc) for doc in docs]
+        # Projected reads and documents missing fields need defaults filled in,
+        # which pydantic-core does faster than Python can
+        mode = "adapter"
+    if mode == "adapter":
+        return list_adapter(model).validate_python(docs)
+    return [model(**doc) for doc in docs]
@@ -0,0 +1,34 @@
+from database import DatabaseManager
+import asyncio
+import os
+import sys
+
+async def print_index_report():
+    """Create the declared indexes and report how each query is served"""
+    
+    mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+    db_name = os.environ.get('DB_NAME', 'portfolio')
+    db = DatabaseManager(mongo_url, db_name)
+    
+    try:
+        await db.ensure_indexes()
+        report = await db.index_report()
+    finally:
+        await db.close()
+    
+    print("📇 Index usage")
+    for collection, indexes in report["usage"].items():
+        for index in indexes:
+            print(f"   {collection}.{index['name']}: {index['ops']} ops")
+    
+    print("\n🔍 Query plans")
+    for query in report["queries"]:
+        status = "❌ COLLSCAN" if query["collscan"] else "✅"
+        sort_note = " (in-memory sort)" if query["inMemorySort"] else ""
+        indexes = ", ".join(query["indexes"]) or "-"
+        print(f"{status} {query['query']}: {' <- '.join(query['stages'])} [{indexes}]{sort_note}")
+    
+    return not report["collscans"]
+
+if __name__ == "__main__":
+    sys.exit(0 if asyncio.run(print_index_report()) else 1)
@@ -0,0 +1,105 @@
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from datetime import datetime
+
+from pymongo.errors import OperationFailure
+
+from models import DOCUMENT_MODELS
+
+logger = logging.getLogger(__name__)
+
+# Representative query shapes issued by DatabaseManager, for the explain report.
+# Filter values are placeholders; the plan only depends on the shape.
+QUERY_SHAPES: List[Tuple[str, str, Dict[str, Any], Optional[List[Tuple[str, int]]]]] = [
+    ("projects", "get_projects(category)", {"category": "Web Development"}, [("_id", 1)]),
+    ("projects", "get_page(projects, category)", {"category": "Web Development"}, [("_id", 1)]),
+    ("experience", "get_experience()", {}, [("startedAt", -1), ("_id", -1)]),
+    ("education", "get_education()", {}, [("startedAt", -1), ("_id", -1)]),
+    ("certifications", "get_certifications()", {}, [("issuedAt", -1), ("_id", -1)]),
+    ("contact_messages", "get_contact_messages()", {}, [("createdAt", -1), ("_id", -1)]),
+    ("contact_messages", "iter_contact_messages(status)", {"status": "new"}, [("createdAt", -1), ("_id", -1)]),
+    ("contact_messages", "get_contact_messages(status, since)",
+     {"status": "new", "createdAt": {"$gte": datetime(2024, 1, 1)}}, [("createdAt", -1), ("_id", -1)]),
+    ("contact_messages", "get_contact_messages(since, until)",
+     {"createdAt": {"$gte": datetime(2024, 1, 1), "$lt": datetime(2025, 1, 1)}}, [("createdAt", -1), ("_id", -1)]),
+    ("contact_messages", "search_contact_messages(q)", {"$text": {"$search": "project"}}, None),
+    ("contact_messages", "set_contact_status(fromStatus, until)",
+     {"createdAt": {"$lt": datetime(2025, 1, 1)}, "status": "new"}, None),
+]
+
+
+async def ensure_indexes(db) -> Dict[str, List[str]]:
+    """Create the indexes declared on each document model.
+
+    create_indexes is a no-op for indexes that already exist with the same
+    definition, so this is safe to run on every startup. A conflicting
+    definition is logged and left for an operator to resolve.
+    """
+    created = {}
+    for model in DOCUMENT_MODELS:
+        if not model.indexes:
+            continue
+        try:
+            created[model.collection_name] = await db[model.collection_name].create_indexes(model.indexes)
+        except OperationFailure as e:
+            logger.error(f"Failed to create indexes on {model.collection_name}: {str(e)}")
+    return created
+
+
+def _plan_stages(plan: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    stages, index_names = [], []
+    pending = [plan]
+    while pending:
+        node = pending.pop()
+        if "stage" in node:
+            stages.append(node["stage"])
+        if "indexName" in node:
+            index_names.append(node["indexName"])
+        if "inputStage" in node:
+            pending.append(node["inputStage"])
+        pending.extend(node.get("inputStages", []))
+    return stages, index_names
+
+
+async def explain_query(db, collection: str, query: Dict[str, Any], sort: Optional[List[Tuple[str, int]]]) -> Dict[str, Any]:
+    command: Dict[str, Any] = {"find": collection, "filter": query}
+    if sort:
+        command["sort"] = dict(sort)
+    result = await db.command("explain", command, verbosity="queryPlanner")
+    winning = result.get("queryPlanner", {}).get("winningPlan", {})
+    # Slot-based engine plans nest the classic tree under queryPlan
+    stages, index_names = _plan_stages(winning.get("queryPlan", winning))
+    return {
+        "stages": stages,
+        "indexes": index_names,
+        "collscan": "COLLSCAN" in stages,
+        "inMemorySort": "SORT" in stages,
+    }
+
+
+async def index_report(db) -> Dict[str, Any]:
+    """Index usage counters plus the winning plan of every known query shape."""
+    usage = {}
+    for model in DOCUMENT_MODELS:
+        stats = await db[model.collection_name].aggregate([{"$indexStats": {}}]).to_list(None)
+        usage[model.collection_name] = [
+            {
+                "name": stat["name"],
+                "key": dict(stat["key"]),
+                "ops": int(stat.get("accesses", {}).get("ops", 0)),
+                "since": stat.get("accesses", {}).get("since"),
+            }
+            for stat in stats
+        ]
+
+    queries = []
+    for collection, label, query, sort in QUERY_SHAPES:
+        plan = await explain_query(db, collection, query, sort)
+        queries.append({"collection": collection, "query": label, **plan})
+
+    return {
+        "usage": usage,
+        "queries": queries,
+        "collscans": [q["query"] for q in queries if q["collscan"]],
+    }
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Load test harness for the Portfolio API
+
+Runs `--concurrency` async workers for `--duration` seconds, each picking the
+next endpoint from a weighted `--mix`, and reports throughput and p50/p95/p99
+latency per endpoint. Requests go to the app in this process, either over an
+ASGI transport (no sockets, measures the app alone) or over real sockets to
+a uvicorn server started on a free local port. `--url` targets an already
+running server instead.
+
+The backend is the in-memory Motor stand-in (memory_mongo.py) by default,
+seeded with the resume content plus `--projects` synthetic projects; with
+`--backend mongo` it is MONGO_URL / DB_NAME, seeded only with `--seed`.
+
+    python loadtest.py --concurrency 32 --duration 10
+    python loadtest.py --transport uvicorn --mix projects=4,portfolio=2,contact=1 --output run.json
+    python loadtest.py --backend mongo --seed --projects 500 --compare run.json
+    python loadtest.py --url http://localhost:8001 --duration 30 --json
+
+Client and server share one event loop (and CPU) in-process, so compare runs
+made the same way rather than reading the numbers as absolute capacity.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import random
+import socket
+import sys
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+# name -> (method, path)
+ENDPOINTS: Dict[str, Tuple[str, str]] = {
+    "root": ("GET", "/api/"),
+    "personal-info": ("GET", "/api/personal-info"),
+    "about": ("GET", "/api/about"),
+    "portfolio": ("GET", "/api/portfolio"),
+    "skills": ("GET", "/api/skills"),
+    "projects": ("GET", "/api/projects"),
+    "projects-category": ("GET", "/api/projects?category=Web%20Development"),
+    "projects-page": ("GET", "/api/projects?limit=10"),
+    "experience": ("GET", "/api/experience"),
+    "education": ("GET", "/api/education"),
+    "certifications": ("GET", "/api/certifications"),
+    "contact": ("POST", "/api/contact"),
+    "admin-messages": ("GET", "/api/admin/messages?limit=20"),
+    "message-counts": ("GET", "/api/admin/messages/counts"),
+}
+
+DEFAULT_MIX = "portfolio=3,projects=3,projects-category=2,skills=1,experience=1,certifications=1,contact=1"
+
+# Envelope of a handled failure; those come back as 200
+_FAILED = b'"success":false'
+
+
+def parse_mix(mix: str) -> Tuple[List[str], List[float]]:
+    names, weights = [], []
+    for part in mix.split(","):
+        name, _, weight = part.strip().partition("=")
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint '{name}'; expected one of: {', '.join(ENDPOINTS)}")
+        names.append(name)
+        weights.append(float(weight or 1))
+    return names, weights
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+class EndpointStats:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.statuses: Counter = Counter()
+        self.errors = 0
+        self.bytes = 0
+
+    def record(self, elapsed: float, status: Any, size: int, failed: bool):
+        self.latencies.append(elapsed)
+        self.statuses[str(status)] += 1
+        self.bytes += size
+        if failed:
+            self.errors += 1
+
+    def report(self, seconds: float) -> Dict[str, Any]:
+        ordered = sorted(self.latencies)
+        count = len(ordered)
+        return {
+            "requests": count,
+            "throughput": round(count / seconds, 1),
+            "errors": self.errors,
+            "statuses": dict(self.statuses),
+            "meanBytes": round(self.bytes / count) if count else 0,
+            "latencyMs": {
+                "mean": round(sum(ordered) / count * 1000, 3),
+                "p50": round(percentile(ordered, 50) * 1000, 3),
+                "p95": round(percentile(ordered, 95) * 1000, 3),
+                "p99": round(percentile(ordered, 99) * 1000, 3),
+                "max": round(ordered[-1] * 1000, 3),
+            } if count else None,
+        }
+
+
+def contact_body(number: int) -> Dict[str, str]:
+    # Distinct content per request, so deduplication doesn't short-circuit the insert
+    return {
+        "name": f"Load Test {number}",
+        "email": f"loadtest+{number}@example.com",
+        "subject": f"Load test message {number}",
+        "message": "Checking how the contact form holds up under load. " * 4,
+    }
+
+
+async def worker(client: httpx.AsyncClient, names: List[str], weights: List[float], rng: random.Random,
+                 measure_from: float, deadline: float, stats: Dict[str, EndpointStats], sequence: List[int]):
+    while time.perf_counter() < deadline:
+        name = rng.choices(names, weights)[0]
+        method, path = ENDPOINTS[name]
+        kwargs = {}
+        if method == "POST":
+            sequence[0] += 1
+            kwargs["json"] = contact_body(sequence[0])
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, path, **kwargs)
+            status, size = response.status_code, len(response.content)
+            failed = status >= 400 or _FAILED in response.content
+        except httpx.HTTPError as e:
+            status, size, failed = type(e).__name__, 0, True
+        if start >= measure_from:
+            stats[name].record(time.perf_counter() - start, status, size, failed)
+
+
+async def run_load(client: httpx.AsyncClient, names: List[str], weights: List[float], concurrency: int,
+                   duration: float, warmup: float, random_seed: int) -> Dict[str, Any]:
+    stats = {name: EndpointStats() for name in names}
+    sequence = [0]
+    started = time.perf_counter()
+    measure_from = started + warmup
+    deadline = measure_from + duration
+    await asyncio.gather(*(
+        worker(client, names, weights, random.Random(random_seed + n), measure_from, deadline, stats, sequence)
+        for n in range(concurrency)
+    ))
+    # Requests in flight at the deadline finish late; count the time they took
+    seconds = max(time.perf_counter(), deadline) - measure_from
+    endpoints = {name: stats[name].report(seconds) for name in names}
+    requests = sum(endpoint["requests"] for endpoint in endpoints.values())
+    return {
+        "durationSeconds": round(seconds, 3),
+        "requests": requests,
+        "throughput": round(requests / seconds, 1),
+        "errors": sum(endpoint["errors"] for endpoint in endpoints.values()),
+        "endpoints": endpoints,
+    }
+
+
+def configure_environment(args):
+    """Must run before server.py is imported; it reads its settings at import time"""
+    if args.backend == "memory":
+        os.environ["MONGO_URL"] = "memory://"
+        os.environ.setdefault("DB_NAME", "loadtest")
+    if not args.rate_limit:
+        # Every in-process request comes from one client address
+        os.environ["CONTACT_RATE_LIMIT_ENABLED"] = "false"
+    # Admin endpoints in the mix need a key; against --url, export the server's ADMIN_API_KEY
+    os.environ.setdefault("ADMIN_API_KEY", "loadtest")
+
+
+def admin_headers() -> Dict[str, str]:
+    key = os.environ.get("ADMIN_API_KEY")
+    return {"X-Admin-Key": key} if key else {}
+
+
+async def seed(db_manager, projects: int):
+    from bench_hydration import synthetic_projects
+    from reseed import diff_seed
+    from updated_seed_data import resume_content
+
+    await diff_seed(db_manager.db, resume_content())
+    if projects:
+        await db_manager.db.projects.insert_many(synthetic_projects(projects))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run(args) -> Dict[str, Any]:
+    names, weights = parse_mix(args.mix)
+    load = dict(concurrency=args.concurrency, duration=args.duration, warmup=args.warmup, random_seed=args.random_seed)
+    timeout = httpx.Timeout(args.timeout)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=timeout, limits=limits,
+                                     headers=admin_headers()) as client:
+            return await run_load(client, names, weights, **load)
+
+    configure_environment(args)
+    import server
+    # server.py logs every request httpx makes at INFO
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    # Seed before the app starts so its cache warmup sees the data
+    await server.db_manager.connect()
+    if args.backend == "memory" or args.seed:
+        await seed(server.db_manager, args.projects)
+
+    if args.transport == "asgi":
+        async with server.app.router.lifespan_context(server.app):
+            transport = httpx.ASGITransport(app=server.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=timeout,
+                                         headers=admin_headers()) as client:
+                return await run_load(client, names, weights, **load)
+
+    import uvicorn
+
+    port = free_port()
+    uvicorn_server = uvicorn.Server(uvicorn.Config(server.app, host="127.0.0.1", port=port, log_level="warning"))
+    serving = asyncio.create_task(uvicorn_server.serve())
+    while not uvicorn_server.started:
+        if serving.done():
+            serving.result()
+        await asyncio.sleep(0.05)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=timeout, limits=limits,
+                                     headers=admin_headers()) as client:
+            return await run_load(client, names, weights, **load)
+    finally:
+        uvicorn_server.should_exit = True
+        await serving
+
+
+def print_report(report: Dict[str, Any], previous: Optional[Dict[str, Any]]):
+    config = report["config"]
+    print(f"📊 {config['target']} | backend {config['backend']} | concurrency {config['concurrency']} | "
+          f"{report['durationSeconds']}s measured")
+    print(f"{'endpoint':<20}{'req':>8}{'req/s':>10}{'err':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+          + (f"{'Δp95':>9}" if previous else ""))
+    for name, endpoint in report["endpoints"].items():
+        latency = endpoint["latencyMs"] or {"p50": 0, "p95": 0, "p99": 0}
+        line = (f"{name:<20}{endpoint['requests']:>8,}{endpoint['throughput']:>10,.1f}{endpoint['errors']:>6}"
+                f"{latency['p50']:>10.2f}{latency['p95']:>10.2f}{latency['p99']:>10.2f}")
+        before = previous and previous["endpoints"].get(name)
+        if before and before["latencyMs"] and latency["p95"]:
+            line += f"{(latency['p95'] / before['latencyMs']['p95'] - 1) * 100:>+8.1f}%"
+        print(line)
+    summary = f"Total: {report['requests']:,} requests, {report['throughput']:,.1f} req/s, {report['errors']} errors"
+    if previous:
+        summary += f" (previous run: {previous['throughput']:,.1f} req/s)"
+    print(summary)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the Portfolio API")
+    parser.add_argument("--transport", choices=["asgi", "uvicorn"], default="asgi",
+                        help="in-process ASGI calls, or HTTP over sockets to a local uvicorn")
+    parser.add_argument("--url", help="load an already running server instead (backend options are ignored)")
+    parser.add_argument("--backend", choices=["memory", "mongo"], default="memory",
+                        help="in-memory Motor stand-in, or MONGO_URL / DB_NAME")
+    parser.add_argument("--seed", action="store_true", help="seed the resume content into the mongo backend first")
+    parser.add_argument("--projects", type=int, default=0, help="synthetic projects added when seeding")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent workers")
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=1.0, help="unmeasured seconds before that")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="weighted endpoints, e.g. projects=3,contact=1; "
+                                                           f"endpoints: {', '.join(ENDPOINTS)}")
+    parser.add_argument("--rate-limit", action="store_true", help="keep contact rate limiting on")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout in seconds")
+    parser.add_argument("--random-seed", type=int, default=1, help="seed for the request sequence")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument("--compare", help="JSON report of an earlier run to show p95 changes against")
+    parser.add_argument("--json", action="store_true", help="print the JSON report instead of a table")
+    args = parser.parse_args()
+
+    try:
+        parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    report = {
+        "config": {
+            "target": args.url or args.transport,
+            "backend": "external" if args.url else args.backend,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "mix": args.mix,
+            "projects": args.projects,
+        },
+        **asyncio.run(run(args)),
+    }
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=2)
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+        return
+    previous = None
+    if args.compare:
+        with open(args.compare) as fh:
+            previous = json.load(fh)
+    print_report(report, previous)
+
+
+if __name__ == "__main__":
+    main()
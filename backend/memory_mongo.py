@@ -0,0 +1,516 @@
+"""
+In-memory stand-in for the parts of Motor the Portfolio API uses.
+
+Selected with `MONGO_URL=memory://` (see DatabaseManager), mainly so the load
+test harness and local development can run without a MongoDB server.
+Documents are stored BSON-encoded and decoded on every read, so callers get
+fresh copies with Mongo's datetime precision, much like a real round-trip.
+
+Covered: find/find_one with the comparison, $in/$exists, $and/$or and $text
+operators, sort/skip/limit, projections, insert/update/replace/delete,
+bulk_write, $match/$group aggregation, unique (optionally partial) indexes
+and collection rename. Not covered: explain, $indexStats (always empty) and
+anything the app doesn't issue.
+"""
+
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import bson
+from bson import ObjectId
+from pymongo import DeleteMany, DeleteOne, InsertOne, ReplaceOne, UpdateMany, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+from pymongo.results import BulkWriteResult, DeleteResult, InsertManyResult, InsertOneResult, UpdateResult
+
+DUPLICATE_KEY = 11000
+
+_WORD = re.compile(r"\w+")
+
+_MISSING = object()
+
+
+# Query Matching
+def _get(doc: Dict[str, Any], path: str) -> Any:
+    value: Any = doc
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def _sort_key(value: Any) -> Tuple[int, Any]:
+    # Mongo's cross-type order, reduced to the types the app stores
+    if value is _MISSING or value is None:
+        return (0, 0)
+    if isinstance(value, bool):
+        return (4, value)
+    if isinstance(value, (int, float)):
+        return (1, value)
+    if isinstance(value, str):
+        return (2, value)
+    if isinstance(value, ObjectId):
+        return (3, value.binary)
+    return (5, value)
+
+
+def _compare(value: Any, op: str, operand: Any) -> bool:
+    if value is _MISSING or value is None:
+        return False
+    try:
+        if op == "$gt":
+            return value > operand
+        if op == "$gte":
+            return value >= operand
+        if op == "$lt":
+            return value < operand
+        return value <= operand
+    except TypeError:
+        return False
+
+
+def _equals(value: Any, expected: Any) -> bool:
+    if isinstance(value, list) and not isinstance(expected, list):
+        return expected in value
+    if value is _MISSING:
+        return expected is None
+    return value == expected
+
+
+def _match_operators(value: Any, condition: Dict[str, Any]) -> bool:
+    for op, operand in condition.items():
+        if op == "$eq":
+            ok = _equals(value, operand)
+        elif op == "$ne":
+            ok = not _equals(value, operand)
+        elif op == "$in":
+            ok = any(_equals(value, option) for option in operand)
+        elif op == "$nin":
+            ok = not any(_equals(value, option) for option in operand)
+        elif op == "$exists":
+            ok = (value is not _MISSING) == bool(operand)
+        elif op in ("$gt", "$gte", "$lt", "$lte"):
+            ok = _compare(value, op, operand)
+        else:
+            raise OperationFailure(f"Unsupported query operator in memory backend: {op}")
+        if not ok:
+            return False
+    return True
+
+
+def matches(doc: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    for key, condition in query.items():
+        if key == "$and":
+            if not all(matches(doc, part) for part in condition):
+                return False
+        elif key == "$or":
+            if not any(matches(doc, part) for part in condition):
+                return False
+        elif key == "$text":
+            continue
+        elif isinstance(condition, dict) and condition and all(op.startswith("$") for op in condition):
+            if not _match_operators(_get(doc, key), condition):
+                return False
+        elif not _equals(_get(doc, key), condition):
+            return False
+    return True
+
+
+def _text_score(doc: Dict[str, Any], terms: List[str], weights: Dict[str, int]) -> float:
+    score = 0.0
+    for field, weight in weights.items():
+        value = doc.get(field)
+        if isinstance(value, str):
+            words = [word.casefold() for word in _WORD.findall(value)]
+            score += weight * sum(words.count(term) for term in terms)
+    return score
+
+
+# Updates
+def _apply_update(doc: Dict[str, Any], update: Dict[str, Any], inserting: bool = False):
+    for op, fields in update.items():
+        if op == "$set" or (op == "$setOnInsert" and inserting):
+            doc.update(fields)
+        elif op == "$unset":
+            for field in fields:
+                doc.pop(field, None)
+        elif op == "$inc":
+            for field, amount in fields.items():
+                doc[field] = doc.get(field, 0) + amount
+        elif op != "$setOnInsert":
+            raise OperationFailure(f"Unsupported update operator in memory backend: {op}")
+
+
+def _upsert_seed(query: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in query.items() if not key.startswith("$") and not isinstance(value, dict)}
+
+
+class MemoryCursor:
+    def __init__(self, collection: "MemoryCollection", query: Dict[str, Any], projection: Optional[Dict[str, Any]]):
+        self._collection = collection
+        self._query = query or {}
+        self._projection = projection
+        self._sort: List[Tuple[str, Any]] = []
+        self._skip = 0
+        self._limit = 0
+        self._results: Optional[Iterator[Dict[str, Any]]] = None
+
+    def sort(self, key, direction=None):
+        self._sort = list(key) if isinstance(key, list) else [(key, direction or 1)]
+        return self
+
+    def skip(self, count: int):
+        self._skip = count
+        return self
+
+    def limit(self, count: int):
+        self._limit = count
+        return self
+
+    def batch_size(self, size: int):
+        return self
+
+    def _evaluate(self) -> List[Dict[str, Any]]:
+        return self._collection._select(self._query, self._projection, self._sort, self._skip, self._limit)
+
+    async def to_list(self, length: Optional[int] = None) -> List[Dict[str, Any]]:
+        docs = self._evaluate()
+        return docs if length is None else docs[:length]
+
+    def __aiter__(self):
+        self._results = iter(self._evaluate())
+        return self
+
+    async def __anext__(self) -> Dict[str, Any]:
+        try:
+            return next(self._results)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class MemoryCollection:
+    def __init__(self, database: "MemoryDatabase", name: str):
+        self.database = database
+        self.name = name
+        # _id -> (decoded document for matching, BSON bytes handed out on reads)
+        self._docs: Dict[Any, Tuple[Dict[str, Any], bytes]] = {}
+        self._indexes: Dict[str, Dict[str, Any]] = {}
+
+    def with_options(self, **kwargs):
+        return self
+
+    # Reads
+    def _select(self, query, projection, sort, skip, limit) -> List[Dict[str, Any]]:
+        text = query.get("$text") if query else None
+        weights = self._text_weights() if text else {}
+        terms = [term.casefold() for term in _WORD.findall(text["$search"])] if text else []
+        selected = []
+        for doc, raw in self._docs.values():
+            if not matches(doc, query):
+                continue
+            score = _text_score(doc, terms, weights) if text else 0.0
+            if text and score <= 0:
+                continue
+            selected.append((doc, raw, score))
+
+        for field, direction in reversed(sort or []):
+            if isinstance(direction, dict):
+                selected.sort(key=lambda entry: entry[2], reverse=True)
+            else:
+                selected.sort(key=lambda entry: _sort_key(_get(entry[0], field)), reverse=direction == -1)
+        selected = selected[skip:]
+        if limit:
+            selected = selected[:limit]
+        return [self._project(bson.decode(raw), projection, score) for _, raw, score in selected]
+
+    @staticmethod
+    def _project(doc: Dict[str, Any], projection: Optional[Dict[str, Any]], score: float) -> Dict[str, Any]:
+        if not projection:
+            return doc
+        meta = [field for field, spec in projection.items() if isinstance(spec, dict)]
+        include = [field for field, spec in projection.items() if not isinstance(spec, dict) and spec]
+        exclude = [field for field, spec in projection.items() if not isinstance(spec, dict) and not spec]
+        if include:
+            doc = {field: value for field, value in doc.items()
+                   if field in include or (field == "_id" and "_id" not in exclude)}
+        else:
+            doc = {field: value for field, value in doc.items() if field not in exclude}
+        for field in meta:
+            doc[field] = score
+        return doc
+
+    def _text_weights(self) -> Dict[str, int]:
+        for spec in self._indexes.values():
+            if "text" in dict(spec["key"]).values():
+                weights = spec.get("weights") or {}
+                return {field: weights.get(field, 1) for field, kind in spec["key"] if kind == "text"}
+        raise OperationFailure("text index required for $text query")
+
+    def find(self, query: Optional[Dict[str, Any]] = None, projection: Optional[Dict[str, Any]] = None, **kwargs) -> MemoryCursor:
+        return MemoryCursor(self, query or {}, projection)
+
+    async def find_one(self, query: Optional[Dict[str, Any]] = None, projection: Optional[Dict[str, Any]] = None, **kwargs):
+        docs = self._select(query or {}, projection, None, 0, 1)
+        return docs[0] if docs else None
+
+    async def count_documents(self, query: Dict[str, Any]) -> int:
+        return sum(1 for doc, _ in self._docs.values() if matches(doc, query))
+
+    def aggregate(self, pipeline: List[Dict[str, Any]]) -> MemoryCursor:
+        docs = [doc for doc, _ in self._docs.values()]
+        for stage in pipeline:
+            (name, spec), = stage.items()
+            if name == "$indexStats":
+                docs = []
+            elif name == "$match":
+                docs = [doc for doc in docs if matches(doc, spec)]
+            elif name == "$group":
+                docs = self._group(docs, spec)
+            else:
+                raise OperationFailure(f"Unsupported aggregation stage in memory backend: {name}")
+        results = MemoryCollection(self.database, self.name)
+        for doc in docs:
+            results._docs[len(results._docs)] = (doc, bson.encode(doc))
+        return MemoryCursor(results, {}, None)
+
+    @staticmethod
+    def _group(docs: Iterable[Dict[str, Any]], spec: Dict[str, Any]) -> List[Dict[str, Any]]:
+        key_spec = spec["_id"]
+        groups: Dict[Any, Dict[str, Any]] = {}
+        for doc in docs:
+            key = _get(doc, key_spec[1:]) if isinstance(key_spec, str) else key_spec
+            key = None if key is _MISSING else key
+            group = groups.setdefault(key, {"_id": key, **{field: 0 for field in spec if field != "_id"}})
+            for field, accumulator in spec.items():
+                if field == "_id":
+                    continue
+                (op, operand), = accumulator.items()
+                if op != "$sum":
+                    raise OperationFailure(f"Unsupported accumulator in memory backend: {op}")
+                value = _get(doc, operand[1:]) if isinstance(operand, str) else operand
+                group[field] += value if isinstance(value, (int, float)) else 0
+        return list(groups.values())
+
+    # Writes
+    @staticmethod
+    def _unique_key(spec: Dict[str, Any], doc: Dict[str, Any]) -> Optional[bytes]:
+        partial = spec.get("partialFilterExpression")
+        if partial and not matches(doc, partial):
+            return None
+        values = [_get(doc, field) for field, _ in spec["key"]]
+        # BSON bytes are hashable and compare the way Mongo compares the values
+        return bson.encode({"v": [None if value is _MISSING else value for value in values]})
+
+    def _unique_indexes(self) -> Iterable[Dict[str, Any]]:
+        return (spec for spec in self._indexes.values() if spec.get("unique"))
+
+    def _check_unique(self, doc: Dict[str, Any], ignore_id: Any = _MISSING):
+        if doc["_id"] in self._docs and doc["_id"] != ignore_id:
+            raise DuplicateKeyError("duplicate key error", DUPLICATE_KEY, {"keyPattern": {"_id": 1}})
+        for spec in self._unique_indexes():
+            key = self._unique_key(spec, doc)
+            owner = spec["entries"].get(key, _MISSING) if key is not None else _MISSING
+            if owner is not _MISSING and owner != ignore_id:
+                raise DuplicateKeyError("duplicate key error", DUPLICATE_KEY,
+                                        {"keyPattern": {field: 1 for field, _ in spec["key"]}})
+
+    def _unindex(self, doc: Dict[str, Any]):
+        for spec in self._unique_indexes():
+            key = self._unique_key(spec, doc)
+            if key is not None and spec["entries"].get(key) == doc["_id"]:
+                del spec["entries"][key]
+
+    def _store(self, doc: Dict[str, Any]):
+        previous = self._docs.get(doc["_id"])
+        if previous is not None:
+            self._unindex(previous[0])
+        raw = bson.encode(doc)
+        self._docs[doc["_id"]] = (bson.decode(raw), raw)
+        for spec in self._unique_indexes():
+            key = self._unique_key(spec, doc)
+            if key is not None:
+                spec["entries"][key] = doc["_id"]
+
+    def _insert(self, doc: Dict[str, Any]) -> Any:
+        if "_id" not in doc:
+            doc["_id"] = ObjectId()
+        self._check_unique(doc)
+        self._store(doc)
+        return doc["_id"]
+
+    async def insert_one(self, doc: Dict[str, Any], **kwargs) -> InsertOneResult:
+        return InsertOneResult(self._insert(doc), True)
+
+    async def insert_many(self, docs: List[Dict[str, Any]], ordered: bool = True, **kwargs) -> InsertManyResult:
+        inserted, errors = [], []
+        for index, doc in enumerate(docs):
+            try:
+                inserted.append(self._insert(doc))
+            except DuplicateKeyError as e:
+                errors.append({"index": index, "code": DUPLICATE_KEY, "errmsg": str(e), **e.details})
+                if ordered:
+                    break
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "writeConcernErrors": [], "nInserted": len(inserted)})
+        return InsertManyResult(inserted, True)
+
+    def _update(self, query, update, upsert: bool, many: bool, replace: bool = False) -> UpdateResult:
+        matched = modified = 0
+        for doc, _ in list(self._docs.values()):
+            if not matches(doc, query):
+                continue
+            matched += 1
+            updated = {"_id": doc["_id"], **update} if replace else dict(doc)
+            if not replace:
+                _apply_update(updated, update)
+            if updated != doc:
+                self._check_unique(updated, ignore_id=doc["_id"])
+                self._store(updated)
+                modified += 1
+            if not many:
+                break
+        upserted_id = None
+        if not matched and upsert:
+            doc = _upsert_seed(query)
+            if replace:
+                doc.update(update)
+            else:
+                _apply_update(doc, update, inserting=True)
+            upserted_id = self._insert(doc)
+        return UpdateResult({"n": matched or int(upserted_id is not None), "nModified": modified,
+                             "upserted": upserted_id}, True)
+
+    async def update_one(self, query, update, upsert: bool = False, **kwargs) -> UpdateResult:
+        return self._update(query, update, upsert, many=False)
+
+    async def update_many(self, query, update, upsert: bool = False, **kwargs) -> UpdateResult:
+        return self._update(query, update, upsert, many=True)
+
+    async def replace_one(self, query, replacement, upsert: bool = False, **kwargs) -> UpdateResult:
+        return self._update(query, replacement, upsert, many=False, replace=True)
+
+    def _delete(self, query, many: bool) -> int:
+        deleted = 0
+        for _id, (doc, _) in list(self._docs.items()):
+            if matches(doc, query):
+                self._unindex(doc)
+                del self._docs[_id]
+                deleted += 1
+                if not many:
+                    break
+        return deleted
+
+    async def delete_one(self, query, **kwargs) -> DeleteResult:
+        return DeleteResult({"n": self._delete(query, many=False)}, True)
+
+    async def delete_many(self, query, **kwargs) -> DeleteResult:
+        return DeleteResult({"n": self._delete(query, many=True)}, True)
+
+    async def bulk_write(self, requests: List[Any], ordered: bool = True, **kwargs) -> BulkWriteResult:
+        result = {"nInserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0, "nUpserted": 0,
+                  "upserted": [], "writeErrors": [], "writeConcernErrors": []}
+        for index, request in enumerate(requests):
+            try:
+                if isinstance(request, InsertOne):
+                    self._insert(request._doc)
+                    result["nInserted"] += 1
+                elif isinstance(request, (UpdateOne, UpdateMany, ReplaceOne)):
+                    updated = self._update(request._filter, request._doc, bool(request._upsert),
+                                           many=isinstance(request, UpdateMany), replace=isinstance(request, ReplaceOne))
+                    result["nMatched"] += updated.matched_count
+                    result["nModified"] += updated.modified_count
+                    if updated.upserted_id is not None:
+                        result["nUpserted"] += 1
+                        result["upserted"].append({"index": index, "_id": updated.upserted_id})
+                elif isinstance(request, (DeleteOne, DeleteMany)):
+                    result["nRemoved"] += self._delete(request._filter, many=isinstance(request, DeleteMany))
+                else:
+                    raise OperationFailure(f"Unsupported bulk operation in memory backend: {type(request).__name__}")
+            except DuplicateKeyError as e:
+                result["writeErrors"].append({"index": index, "code": DUPLICATE_KEY, "errmsg": str(e), **e.details})
+                if ordered:
+                    break
+        if result["writeErrors"]:
+            raise BulkWriteError(result)
+        return BulkWriteResult(result, True)
+
+    # Indexes and collection management
+    async def create_indexes(self, indexes: List[Any], **kwargs) -> List[str]:
+        names = []
+        for index in indexes:
+            spec = dict(index.document)
+            spec["key"] = list(spec["key"].items())
+            if spec.get("unique"):
+                spec["entries"] = {}
+                for doc, _ in self._docs.values():
+                    key = self._unique_key(spec, doc)
+                    if key is None:
+                        continue
+                    if key in spec["entries"]:
+                        raise OperationFailure(f"E11000 duplicate key error building index {spec['name']}")
+                    spec["entries"][key] = doc["_id"]
+            self._indexes[spec["name"]] = spec
+            names.append(spec["name"])
+        return names
+
+    async def drop_index(self, name: str):
+        if self._indexes.pop(name, None) is None:
+            raise OperationFailure(f"index not found with name [{name}]")
+
+    async def drop(self):
+        # Handles stay usable after a drop, as with Motor
+        self._docs = {}
+        self._indexes = {}
+
+    async def rename(self, new_name: str, dropTarget: bool = False, **kwargs):
+        collections = self.database._collections
+        if new_name in collections and collections[new_name]._docs and not dropTarget:
+            raise OperationFailure("target namespace exists")
+        # Collection handles are looked up by name, so moving the state is the rename
+        target = self.database[new_name]
+        target._docs, target._indexes = self._docs, self._indexes
+        self._docs, self._indexes = {}, {}
+        collections.pop(self.name, None)
+
+
+class MemoryDatabase:
+    def __init__(self, name: str):
+        self.name = name
+        self._collections: Dict[str, MemoryCollection] = {}
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        if name not in self._collections:
+            self._collections[name] = MemoryCollection(self, name)
+        return self._collections[name]
+
+    def __getattr__(self, name: str) -> MemoryCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    async def create_collection(self, name: str, **kwargs) -> MemoryCollection:
+        return self[name]
+
+    async def list_collection_names(self) -> List[str]:
+        return list(self._collections)
+
+    async def command(self, name, *args, **kwargs) -> Dict[str, Any]:
+        if name == "ping":
+            return {"ok": 1.0}
+        raise OperationFailure(f"Command {name} is not supported by the memory backend")
+
+
+class MemoryMongoClient:
+    """Drop-in for AsyncIOMotorClient; one process-wide store per client"""
+
+    def __init__(self, *args, **kwargs):
+        self._databases: Dict[str, MemoryDatabase] = {}
+        self.admin = self["admin"]
+
+    def __getitem__(self, name: str) -> MemoryDatabase:
+        if name not in self._databases:
+            self._databases[name] = MemoryDatabase(name)
+        return self._databases[name]
+
+    def close(self):
+        pass
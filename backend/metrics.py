@@ -0,0 +1,273 @@
+import os
+import time
+from bisect import bisect_left
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pymongo import monitoring
+from starlette.routing import Match
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Upper bounds of the histogram buckets; +Inf is implied
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+MONGO_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0)
+
+# Route label for requests no route matched (404s), so scanners can't blow up label cardinality
+UNMATCHED_ROUTE = "unmatched"
+
+# Command events waiting to be folded in before a request triggers it, and the hard cap
+COMMAND_DRAIN_THRESHOLD = 4096
+MAX_PENDING_COMMANDS = 100000
+
+
+class Histogram:
+    """Bucket counts plus sum and count; observe() is a bisect and three increments"""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name: str, labels: str) -> List[str]:
+        prefix = labels + "," if labels else ""
+        lines, cumulative = [], 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum{{{labels}}} {round(self.sum, 6)}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(**labels: str) -> str:
+    return ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items())
+
+
+def command_collection(event) -> str:
+    """Collection a command started event targets, or "" for database and admin commands"""
+    if event.command_name == "getMore":
+        # getMore names the cursor, not the collection
+        collection = event.command.get("collection")
+    else:
+        collection = event.command.get(event.command_name)
+    return collection if isinstance(collection, str) else ""
+
+
+class _RouteStats:
+    __slots__ = ("requests", "latency", "size")
+
+    def __init__(self):
+        self.requests = 0
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.size = Histogram(SIZE_BUCKETS)
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """Mongo command timings per collection and command, fed by pymongo's command events.
+
+    Events arrive on the driver's threads. Instead of taking a lock, each
+    finished command is appended to a deque (atomic in CPython) and drain()
+    folds the backlog into histograms on the event loop, when /metrics is
+    scraped or once COMMAND_DRAIN_THRESHOLD events are waiting.
+    """
+
+    def __init__(self):
+        self._collections: Dict[int, str] = {}
+        self._events: deque = deque(maxlen=MAX_PENDING_COMMANDS)
+        self.commands: Dict[Tuple[str, str], Histogram] = {}
+        self.failures: Dict[Tuple[str, str], int] = {}
+
+    def started(self, event):
+        self._collections[event.request_id] = command_collection(event)
+
+    def succeeded(self, event):
+        collection = self._collections.pop(event.request_id, "")
+        self._events.append((collection, event.command_name, event.duration_micros / 1e6, False))
+
+    def failed(self, event):
+        collection = self._collections.pop(event.request_id, "")
+        self._events.append((collection, event.command_name, event.duration_micros / 1e6, True))
+
+    @property
+    def pending(self) -> int:
+        return len(self._events)
+
+    def drain(self):
+        events = self._events
+        while events:
+            collection, command, seconds, failed = events.popleft()
+            key = (collection, command)
+            histogram = self.commands.get(key)
+            if histogram is None:
+                histogram = self.commands[key] = Histogram(MONGO_BUCKETS)
+            histogram.observe(seconds)
+            if failed:
+                self.failures[key] = self.failures.get(key, 0) + 1
+
+
+class Metrics:
+    """Request, Mongo, pool and cache metrics rendered in the Prometheus text format.
+
+    Request counters are plain ints and lists updated by MetricsMiddleware
+    on the event loop thread, with no await between read and write, so the
+    hot path takes no locks. Mongo command timings come from `commands`;
+    pool gauges and cache ratios are read from their owners' snapshot() and
+    stats() only when /metrics is scraped.
+    """
+
+    def __init__(self):
+        self.requests: Dict[Tuple[str, str, str], _RouteStats] = {}
+        self.in_flight = 0
+        self.commands: Optional[CommandMetrics] = None
+        self.pool: Optional[Callable[[], Dict[str, Any]]] = None
+        self._caches: Dict[str, Callable[[], Optional[Dict[str, Any]]]] = {}
+        self.started_at = time.time()
+
+    @classmethod
+    def from_env(cls) -> Optional["Metrics"]:
+        if os.environ.get("METRICS_ENABLED", "true").lower() in ("0", "false", "no"):
+            return None
+        return cls()
+
+    def add_cache(self, name: str, stats: Callable[[], Optional[Dict[str, Any]]]):
+        """Report a cache whose stats() has hits/misses/hitRatio; returning None skips it"""
+        self._caches[name] = stats
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float, size: int):
+        key = (method, route, str(status))
+        stats = self.requests.get(key)
+        if stats is None:
+            stats = self.requests[key] = _RouteStats()
+        stats.requests += 1
+        stats.latency.observe(seconds)
+        stats.size.observe(size)
+        if self.commands is not None and self.commands.pending >= COMMAND_DRAIN_THRESHOLD:
+            self.commands.drain()
+
+    # Exposition
+    def render(self) -> bytes:
+        lines: List[str] = []
+
+        def family(name: str, kind: str, help_text: str):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        requests = sorted(self.requests.items())
+        family("http_requests_total", "counter", "HTTP requests by method, route template and status")
+        for (method, route, status), stats in requests:
+            lines.append(f"http_requests_total{{{format_labels(method=method, route=route, status=status)}}} {stats.requests}")
+        family("http_request_duration_seconds", "histogram", "Time from receiving a request to sending the last body byte")
+        for (method, route, status), stats in requests:
+            lines.extend(stats.latency.lines("http_request_duration_seconds",
+                                             format_labels(method=method, route=route, status=status)))
+        family("http_response_size_bytes", "histogram", "Response body size")
+        for (method, route, status), stats in requests:
+            lines.extend(stats.size.lines("http_response_size_bytes",
+                                          format_labels(method=method, route=route, status=status)))
+        family("http_requests_in_flight", "gauge", "Requests currently being handled")
+        lines.append(f"http_requests_in_flight {self.in_flight}")
+
+        if self.commands is not None:
+            self.commands.drain()
+            commands = sorted(self.commands.commands.items())
+            family("mongodb_command_duration_seconds", "histogram", "Mongo command round trips by collection and command")
+            for (collection, command), histogram in commands:
+                lines.extend(histogram.lines("mongodb_command_duration_seconds",
+                                             format_labels(collection=collection, command=command)))
+            family("mongodb_command_failures_total", "counter", "Mongo commands that returned an error")
+            for (collection, command), count in sorted(self.commands.failures.items()):
+                lines.append(f"mongodb_command_failures_total{{{format_labels(collection=collection, command=command)}}} {count}")
+
+        if self.pool is not None:
+            pool = self.pool()
+            family("mongodb_pool_connections", "gauge", "Pooled Mongo connections by state")
+            lines.append(f'mongodb_pool_connections{{state="open"}} {pool["open"]}')
+            lines.append(f'mongodb_pool_connections{{state="in_use"}} {pool["inUse"]}')
+            family("mongodb_pool_checkout_failures_total", "counter", "Connection checkouts that failed or timed out")
+            lines.append(f"mongodb_pool_checkout_failures_total {pool['checkoutFailures']}")
+            wait = pool["checkoutWait"]
+            family("mongodb_pool_checkout_wait_seconds", "histogram", "Time spent waiting for a pooled connection")
+            for bound, count in wait["buckets"].items():
+                lines.append(f'mongodb_pool_checkout_wait_seconds_bucket{{le="{bound}"}} {count}')
+            lines.append(f"mongodb_pool_checkout_wait_seconds_sum {wait['sumSeconds']}")
+            lines.append(f"mongodb_pool_checkout_wait_seconds_count {wait['count']}")
+
+        caches = [(name, stats()) for name, stats in self._caches.items()]
+        caches = [(name, stats) for name, stats in caches if stats is not None]
+        if caches:
+            family("cache_requests_total", "counter", "Cache lookups by cache and result")
+            for name, stats in caches:
+                for result, field in (("hit", "hits"), ("miss", "misses"), ("coalesced", "coalesced")):
+                    if field in stats:
+                        lines.append(f"cache_requests_total{{{format_labels(cache=name, result=result)}}} {stats[field]}")
+            family("cache_hit_ratio", "gauge", "Share of cache lookups served without a load")
+            for name, stats in caches:
+                lines.append(f"cache_hit_ratio{{{format_labels(cache=name)}}} {stats['hitRatio']}")
+            family("cache_entries", "gauge", "Entries held by each cache")
+            for name, stats in caches:
+                lines.append(f"cache_entries{{{format_labels(cache=name)}}} {stats['entries']}")
+
+        family("process_start_time_seconds", "gauge", "Start time of the process since the Unix epoch")
+        lines.append(f"process_start_time_seconds {self.started_at:.3f}")
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def route_template(scope) -> str:
+    """Path template of the route that served `scope`, e.g. /api/projects"""
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    # Answered before routing (e.g. a 429 from RateLimitMiddleware): match it ourselves
+    app = scope.get("app")
+    for candidate in getattr(getattr(app, "router", None), "routes", ()):
+        match, _ = candidate.matches(scope)
+        if match != Match.NONE:
+            return getattr(candidate, "path", UNMATCHED_ROUTE)
+    return UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """Count, time and size every HTTP response; add outermost so 304s and 429s are seen too"""
+
+    def __init__(self, app, metrics: Optional[Metrics]):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if self.metrics is None or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = self.metrics
+        start = time.perf_counter()
+        state = {"status": 500, "size": 0}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                state["size"] += len(message.get("body", b""))
+            await send(message)
+
+        metrics.in_flight += 1
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.in_flight -= 1
+            metrics.observe_request(scope["method"], route_template(scope), state["status"],
+                                    time.perf_counter() - start, state["size"])
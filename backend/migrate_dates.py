@@ -0,0 +1,97 @@
+from database import DatabaseManager
+from models import *
+from pymongo import UpdateOne
+from pymongo.errors import OperationFailure
+import asyncio
+import os
+
+# (model, raw start field, derived fields) per collection; documents missing any
+# derived field are run through the model's own derive_dates validator
+DERIVED_FIELDS = [
+    (Experience, "startDate", ("startedAt", "endedAt", "current", "duration")),
+    (Education, "startDate", ("startedAt", "endedAt")),
+    (Certification, "issueDate", ("issuedAt", "expiresAt")),
+]
+
+# Indexes on the raw date strings, superseded by the parsed fields
+OBSOLETE_INDEXES = {
+    "experience": "startDate_id",
+    "education": "startDate_id",
+    "certifications": "issueDate_id",
+}
+
+BATCH_SIZE = 500
+
+def missing_derived_values(model, fields, doc: dict) -> dict:
+    """Derived fields `doc` lacks (or holds as null), computed as the model would on insert"""
+    derived = model.derive_dates({key: value for key, value in doc.items() if value is not None})
+    values = {field: derived.get(field) for field in fields if doc.get(field) is None}
+    if derived.get("current"):
+        # Stays null so reads derive it from today (see models.experience_document)
+        values.pop("duration", None)
+    return values
+
+def has_frozen_duration(doc: dict) -> bool:
+    """Whether a current role's stored duration is the one derived on the day it was written.
+
+    Earlier versions stored that value, which then never grew; durations
+    entered by hand don't match it and are kept.
+    """
+    if not doc.get("current") or not doc.get("duration") or not doc.get("startedAt") or not doc.get("createdAt"):
+        return False
+    return doc["duration"] == format_duration(doc["startedAt"], doc["createdAt"])
+
+async def backfill_normalized_dates():
+    """Store parsed dates (and experience current/duration) on documents written before those fields existed"""
+    
+    mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+    db_name = os.environ.get('DB_NAME', 'portfolio')
+    db = DatabaseManager(mongo_url, db_name)
+    
+    print("🔄 Backfilling normalized date fields...")
+    
+    for model, start, fields in DERIVED_FIELDS:
+        collection = model.collection_name
+        # Parsed dates stay None when unparseable, so only their absence means "not migrated";
+        # current and duration are also refilled when stored as null
+        missing = {"$or": [
+            {field: None} if field in ("current", "duration") else {field: {"$exists": False}}
+            for field in fields
+        ]}
+        ops = []
+        updated = 0
+        async for doc in db.db[collection].find(missing):
+            values = missing_derived_values(model, fields, doc)
+            if values.get(fields[0], doc.get(fields[0])) is None:
+                print(f"⚠️ {collection} {doc['_id']}: could not parse {start}={doc.get(start)!r}")
+            if values:
+                ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": values}))
+            if len(ops) >= BATCH_SIZE:
+                updated += (await db.db[collection].bulk_write(ops, ordered=False)).modified_count
+                ops = []
+        if ops:
+            updated += (await db.db[collection].bulk_write(ops, ordered=False)).modified_count
+        print(f"✅ {collection}: backfilled {updated} documents")
+    
+    ops = [
+        UpdateOne({"_id": doc["_id"]}, {"$set": {"duration": None}})
+        async for doc in db.db.experience.find({"current": True}, {"current": 1, "duration": 1, "startedAt": 1, "createdAt": 1})
+        if has_frozen_duration(doc)
+    ]
+    if ops:
+        await db.db.experience.bulk_write(ops, ordered=False)
+    print(f"✅ experience: {len(ops)} current roles now derive their duration on read")
+    
+    await db.ensure_indexes()
+    for collection, index_name in OBSOLETE_INDEXES.items():
+        try:
+            await db.db[collection].drop_index(index_name)
+            print(f"🗑️ Dropped obsolete index {collection}.{index_name}")
+        except OperationFailure:
+            pass
+    
+    await db.close()
+    print("🎉 Date backfill completed")
+
+if __name__ == "__main__":
+    asyncio.run(backfill_normalized_dates())
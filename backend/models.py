@@ -1,8 +1,60 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional, Union, Any
+from pydantic import BaseModel, Field, create_model, model_validator
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from typing import List, Optional, Union, Any, ClassVar, Dict, Tuple, Type
 from datetime import datetime
+from functools import lru_cache
+import calendar
+import re
 import uuid
 
+# Date Normalization Helpers
+# Resume dates are free-form ("August 2020", "Aug 2020", "2016", "Current"); these
+# turn them into datetimes that sort and range-filter correctly inside Mongo.
+_MONTHS = {name.lower(): number for number, name in enumerate(calendar.month_name) if name}
+_MONTHS.update({name.lower(): number for number, name in enumerate(calendar.month_abbr) if name})
+_MONTHS["sept"] = 9
+CURRENT_DATE_MARKERS = {"current", "present", "now", "ongoing"}
+
+def is_current_date(value: Optional[str]) -> bool:
+    return bool(value) and value.strip().lower() in CURRENT_DATE_MARKERS
+
+def parse_month_year(value: Optional[str]) -> Optional[datetime]:
+    """Parse 'August 2020', 'Aug 2020', '2020-08', '08/2020' or '2020' to the first of that month"""
+    if not value or is_current_date(value):
+        return None
+    text = value.strip().lower().replace(",", " ").replace(".", " ")
+    match = re.fullmatch(r"([a-z]+)\s+(\d{4})", text)
+    if match and match.group(1) in _MONTHS:
+        return datetime(int(match.group(2)), _MONTHS[match.group(1)], 1)
+    match = re.fullmatch(r"(\d{4})-(\d{1,2})(?:-\d{1,2})?", text) or re.fullmatch(r"(\d{1,2})/(\d{4})", text)
+    if match:
+        year, month = (match.group(1), match.group(2)) if len(match.group(1)) == 4 else (match.group(2), match.group(1))
+        if 1 <= int(month) <= 12:
+            return datetime(int(year), int(month), 1)
+    if re.fullmatch(r"\d{4}", text):
+        return datetime(int(text), 1, 1)
+    return None
+
+def format_duration(start: datetime, end: datetime) -> str:
+    months = max((end.year - start.year) * 12 + end.month - start.month, 1)
+    years, months = divmod(months, 12)
+    parts = []
+    if years:
+        parts.append(f"{years} year{'s' if years > 1 else ''}")
+    if months:
+        parts.append(f"{months} month{'s' if months > 1 else ''}")
+    return " ".join(parts)
+
+def with_normalized_dates(data: Dict[str, Any], start: str, end: str, started: str, ended: str) -> Dict[str, Any]:
+    """Copy of `data` with the parsed `started` / `ended` fields filled from the raw `start` / `end`
+    strings when absent; validators build on the copy so the caller's dict is never modified"""
+    data = dict(data)
+    if started not in data:
+        data[started] = parse_month_year(data.get(start))
+    if ended not in data:
+        data[ended] = parse_month_year(data.get(end))
+    return data
+
 # Personal Info Models
 class SocialLinks(BaseModel):
     linkedin: str
@@ -10,6 +62,9 @@ class SocialLinks(BaseModel):
     twitter: str
 
 class PersonalInfo(BaseModel):
+    collection_name: ClassVar[str] = "personal_info"
+    indexes: ClassVar[List[IndexModel]] = []
+
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     name: str
     title: str
@@ -34,6 +89,9 @@ class PersonalInfoCreate(BaseModel):
 
 # About Models
 class About(BaseModel):
+    collection_name: ClassVar[str] = "about"
+    indexes: ClassVar[List[IndexModel]] = []
+
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     summary: str
     highlights: List[str]
@@ -54,6 +112,9 @@ class SkillItem(BaseModel):
     status: Optional[str] = None
 
 class Skills(BaseModel):
+    collection_name: ClassVar[str] = "skills"
+    indexes: ClassVar[List[IndexModel]] = []
+
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     category: str
     items: List[SkillItem]
@@ -66,6 +127,12 @@ class SkillsCreate(BaseModel):
 
 # Projects Models
 class Project(BaseModel):
+    collection_name: ClassVar[str] = "projects"
+    indexes: ClassVar[List[IndexModel]] = [
+        # get_projects(category) and its keyset pages
+        IndexModel([("category", ASCENDING), ("_id", ASCENDING)], name="category_id"),
+    ]
+
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     title: str
     description: str
@@ -94,6 +161,11 @@ class ProjectCreate(BaseModel):
 
 # Experience Models
 class Experience(BaseModel):
+    collection_name: ClassVar[str] = "experience"
+    indexes: ClassVar[List[IndexModel]] = [
+        IndexModel([("startedAt", DESCENDING), ("_id", DESCENDING)], name="startedAt_id"),
+    ]
+
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     company: str
     position: str
@@ -106,9 +178,37 @@ class Experience(BaseModel):
     description: str
     achievements: List[str]
     technologies: List[str]
+    # Parsed from startDate / endDate; endedAt is None while current
+    startedAt: Optional[datetime] = None
+    endedAt: Optional[datetime] = None
     createdAt: datetime = Field(default_factory=datetime.utcnow)
     updatedAt: datetime = Field(default_factory=datetime.utcnow)
 
+    @model_validator(mode="before")
+    @classmethod
+    def derive_dates(cls, data: Any) -> Any:
+        if not isinstance(data, dict):
+            return data
+        data = with_normalized_dates(data, "startDate", "endDate", "startedAt", "endedAt")
+        if data.get("current") is None:
+            data["current"] = is_current_date(data.get("endDate"))
+        if data.get("duration") is None and data.get("startedAt"):
+            # Current roles run to today; experience_document() stores None so each read recomputes this
+            data["duration"] = format_duration(data["startedAt"], data.get("endedAt") or datetime.utcnow())
+        return data
+
+def experience_document(experience: Experience, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Document to store for `experience`, built from `payload`.
+
+    A current role's derived duration is stored as None: it keeps growing,
+    so reads derive it again instead of serving the length it had on the
+    day it was written. A duration given in the payload is stored as is.
+    """
+    doc = experience.dict()
+    if doc["current"] and payload.get("duration") is None:
+        doc["duration"] = None
+    return doc
+
 class ExperienceCreate(BaseModel):
     company: str
     position: str
@@ -116,14 +216,20 @@ class ExperienceCreate(BaseModel):
     location: str
     startDate: str
     endDate: str
-    duration: str
-    current: bool
+    # Derived from startDate / endDate when omitted
+    duration: Optional[str] = None
+    current: Optional[bool] = None
     description: str
     achievements: List[str]
     technologies: List[str]
 
 # Education Models
 class Education(BaseModel):
+    collection_name: ClassVar[str] = "education"
+    indexes: ClassVar[List[IndexModel]] = [
+        IndexModel([("startedAt", DESCENDING), ("_id", DESCENDING)], name="startedAt_id"),
+    ]
+
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     institution: str
     degree: str
@@ -132,9 +238,19 @@ class Education(BaseModel):
     endDate: str
     description: str
     relevantCourses: List[str]
+    # Parsed from startDate / endDate
+    startedAt: Optional[datetime] = None
+    endedAt: Optional[datetime] = None
     createdAt: datetime = Field(default_factory=datetime.utcnow)
     updatedAt: datetime = Field(default_factory=datetime.utcnow)
 
+    @model_validator(mode="before")
+    @classmethod
+    def derive_dates(cls, data: Any) -> Any:
+        if not isinstance(data, dict):
+            return data
+        return with_normalized_dates(data, "startDate", "endDate", "startedAt", "endedAt")
+
 class EducationCreate(BaseModel):
     institution: str
     degree: str
@@ -146,6 +262,11 @@ class EducationCreate(BaseModel):
 
 # Certifications Models
 class Certification(BaseModel):
+    collection_name: ClassVar[str] = "certifications"
+    indexes: ClassVar[List[IndexModel]] = [
+        IndexModel([("issuedAt", DESCENDING), ("_id", DESCENDING)], name="issuedAt_id"),
+    ]
+
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     name: str
     issuer: str
@@ -154,9 +275,19 @@ class Certification(BaseModel):
     credentialId: str
     description: str
     badgeUrl: str
+    # Parsed from issueDate / expiryDate
+    issuedAt: Optional[datetime] = None
+    expiresAt: Optional[datetime] = None
     createdAt: datetime = Field(default_factory=datetime.utcnow)
     updatedAt: datetime = Field(default_factory=datetime.utcnow)
 
+    @model_validator(mode="before")
+    @classmethod
+    def derive_dates(cls, data: Any) -> Any:
+        if not isinstance(data, dict):
+            return data
+        return with_normalized_dates(data, "issueDate", "expiryDate", "issuedAt", "expiresAt")
+
 class CertificationCreate(BaseModel):
     name: str
     issuer: str
@@ -167,7 +298,26 @@ class CertificationCreate(BaseModel):
     badgeUrl: str
 
 # Contact Models
+CONTACT_STATUSES = ("new", "read", "replied")
+
 class ContactMessage(BaseModel):
+    collection_name: ClassVar[str] = "contact_messages"
+    indexes: ClassVar[List[IndexModel]] = [
+        # Admin listing and its keyset pages, plus date-range exports
+        IndexModel([("createdAt", DESCENDING), ("_id", DESCENDING)], name="createdAt_id"),
+        # Status-filtered exports
+        IndexModel([("status", ASCENDING), ("createdAt", DESCENDING), ("_id", DESCENDING)], name="status_createdAt_id"),
+        # Admin free-text search, ranked by textScore
+        IndexModel(
+            [("name", TEXT), ("email", TEXT), ("company", TEXT), ("subject", TEXT), ("message", TEXT)],
+            name="contact_text",
+            weights={"subject": 5, "name": 3, "email": 3, "company": 2, "message": 1},
+        ),
+        # Duplicate submissions; messages stored before hashing have no contentHash
+        IndexModel([("contentHash", ASCENDING)], name="contentHash_unique", unique=True,
+                   partialFilterExpression={"contentHash": {"$exists": True}}),
+    ]
+
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     name: str
     email: str
@@ -185,9 +335,47 @@ class ContactMessageCreate(BaseModel):
     subject: str
     message: str
 
+class ContactStatusUpdate(BaseModel):
+    status: str
+    # Either explicit message ids or every message currently in `fromStatus`
+    ids: Optional[List[str]] = Field(None, max_length=1000)
+    fromStatus: Optional[str] = None
+    until: Optional[datetime] = None
+
 # Response Models
 class ApiResponse(BaseModel):
     success: bool
     data: Optional[Union[dict, list, Any]] = None
     message: Optional[str] = None
-    error: Optional[str] = None
\ No newline at end of file
+    error: Optional[str] = None
+
+# Models stored in their own collection, for index management
+DOCUMENT_MODELS = [PersonalInfo, About, Skills, Project, Experience, Education, Certification, ContactMessage]
+
+# Field Projection Helpers
+def normalize_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Turn a `?fields=a,b` query value into a stable, hashable field tuple"""
+    if not fields:
+        return None
+    names = tuple(sorted({name.strip() for name in fields.split(",") if name.strip()}))
+    return names or None
+
+def select_fields(model: Type[BaseModel], fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Normalize `fields` and reject names that `model` doesn't have"""
+    names = normalize_fields(fields)
+    unknown = [name for name in names or () if name not in model.model_fields]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return names
+
+def projection(fields: Optional[Tuple[str, ...]]) -> Optional[Dict[str, int]]:
+    """Mongo projection for a field selection; `_id` is always returned"""
+    if not fields:
+        return None
+    return {"_id": 1, **{name: 1 for name in fields if name != "id"}}
+
+@lru_cache(maxsize=None)
+def partial_model(model: Type[BaseModel]) -> Type[BaseModel]:
+    """Variant of `model` with every field optional, for projected reads"""
+    fields = {name: (Optional[field.annotation], None) for name, field in model.model_fields.items()}
+    return create_model(f"Partial{model.__name__}", **fields)
@@ -0,0 +1,135 @@
+import os
+import threading
+from typing import Any, Dict
+
+from pymongo import monitoring
+
+# Upper bounds (seconds) of the checkout wait histogram buckets
+CHECKOUT_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+# .env name -> (MongoClient option, type, default); None means the driver default
+_POOL_SETTINGS = {
+    "MONGO_MAX_POOL_SIZE": ("maxPoolSize", int, 100),
+    "MONGO_MIN_POOL_SIZE": ("minPoolSize", int, 5),
+    "MONGO_MAX_IDLE_TIME_MS": ("maxIdleTimeMS", int, 300000),
+    "MONGO_CONNECT_TIMEOUT_MS": ("connectTimeoutMS", int, 5000),
+    "MONGO_SERVER_SELECTION_TIMEOUT_MS": ("serverSelectionTimeoutMS", int, 5000),
+    "MONGO_SOCKET_TIMEOUT_MS": ("socketTimeoutMS", int, None),
+    "MONGO_WAIT_QUEUE_TIMEOUT_MS": ("waitQueueTimeoutMS", int, None),
+    "MONGO_MAX_CONNECTING": ("maxConnecting", int, None),
+}
+
+
+def client_options_from_env() -> Dict[str, Any]:
+    options = {}
+    for env_name, (option, cast, default) in _POOL_SETTINGS.items():
+        raw = os.environ.get(env_name)
+        value = cast(raw) if raw not in (None, "") else default
+        if value is not None:
+            options[option] = value
+    return options
+
+
+def warmup_connections_from_env(options: Dict[str, Any]) -> int:
+    """Connections to open before the app reports ready; defaults to minPoolSize."""
+    raw = os.environ.get("MONGO_WARMUP_CONNECTIONS")
+    if raw not in (None, ""):
+        return int(raw)
+    return options.get("minPoolSize", 0)
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Connection pool counters fed by pymongo's CMAP events.
+
+    Events arrive on driver threads, so updates are serialized with a lock;
+    each one is a handful of integer operations.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.open = 0
+        self.in_use = 0
+        self.created = 0
+        self.closed = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.pool_clears = 0
+        self.wait_count = 0
+        self.wait_sum = 0.0
+        self.wait_max = 0.0
+        self.wait_buckets = [0] * len(CHECKOUT_WAIT_BUCKETS)
+
+    def connection_created(self, event):
+        with self._lock:
+            self.created += 1
+            self.open += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.closed += 1
+            self.open -= 1
+
+    def connection_checked_out(self, event):
+        duration = getattr(event, "duration", None)
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            if duration is not None:
+                self.wait_count += 1
+                self.wait_sum += duration
+                self.wait_max = max(self.wait_max, duration)
+                for i, bound in enumerate(CHECKOUT_WAIT_BUCKETS):
+                    if duration <= bound:
+                        self.wait_buckets[i] += 1
+                        break
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.in_use -= 1
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    # Remaining CMAP events carry nothing we report on
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            cumulative, buckets = 0, {}
+            for bound, count in zip(CHECKOUT_WAIT_BUCKETS, self.wait_buckets):
+                cumulative += count
+                buckets[str(bound)] = cumulative
+            buckets["+Inf"] = self.wait_count
+            return {
+                "open": self.open,
+                "inUse": self.in_use,
+                "created": self.created,
+                "closed": self.closed,
+                "checkouts": self.checkouts,
+                "checkoutFailures": self.checkout_failures,
+                "poolClears": self.pool_clears,
+                "checkoutWait": {
+                    "count": self.wait_count,
+                    "sumSeconds": round(self.wait_sum, 6),
+                    "maxSeconds": round(self.wait_max, 6),
+                    "buckets": buckets,
+                },
+            }
@@ -0,0 +1,82 @@
+import base64
+import binascii
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import json_util
+
+SortSpec = List[Tuple[str, int]]
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+DEFAULT_PAGE_SIZE = int(os.environ.get("PAGE_SIZE_DEFAULT", 50))
+MAX_PAGE_SIZE = int(os.environ.get("PAGE_SIZE_MAX", 200))
+
+
+def page_size(limit: Optional[int]) -> int:
+    if limit is None:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def keyset_sort(sort: SortSpec) -> SortSpec:
+    """Append `_id` as the tiebreaker, in the direction of the last sort key."""
+    direction = sort[-1][1] if sort else 1
+    return list(sort) + [("_id", direction)]
+
+
+def encode_cursor(collection: str, sort: SortSpec, doc: Dict[str, Any]) -> str:
+    values = [doc.get(field) for field, _ in sort]
+    # json_util keeps datetimes and ObjectIds round-trippable
+    raw = json_util.dumps({"c": collection, "k": values})
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(collection: str, sort: SortSpec, cursor: str) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json_util.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, ValueError, UnicodeError, json.JSONDecodeError):
+        raise InvalidCursor("Invalid cursor")
+    if not isinstance(payload, dict) or payload.get("c") != collection or len(payload.get("k") or []) != len(sort):
+        raise InvalidCursor("Invalid cursor")
+    return payload["k"]
+
+
+def keyset_filter(sort: SortSpec, values: List[Any]) -> Dict[str, Any]:
+    """Match documents strictly after `values` in `sort` order.
+
+    For keys (a, b, _id) this is a > va OR (a == va AND b > vb) OR
+    (a == va AND b == vb AND _id > vid), with > flipped for descending keys,
+    which Mongo can answer from the matching compound index.
+    """
+    clauses = []
+    for i, (field, direction) in enumerate(sort):
+        clause = {prev: values[j] for j, (prev, _) in enumerate(sort[:i])}
+        clause[field] = {"$lt" if direction < 0 else "$gt": values[i]}
+        clauses.append(clause)
+    return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+
+def encode_offset_cursor(collection: str, offset: int) -> str:
+    """Cursor for result orders that can't be resumed by key, such as text relevance"""
+    raw = json.dumps({"c": collection, "o": offset})
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_offset_cursor(collection: str, cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, ValueError, UnicodeError):
+        raise InvalidCursor("Invalid cursor")
+    if not isinstance(payload, dict) or payload.get("c") != collection:
+        raise InvalidCursor("Invalid cursor")
+    offset = payload.get("o")
+    if not isinstance(offset, int) or isinstance(offset, bool) or offset < 0:
+        raise InvalidCursor("Invalid cursor")
+    return offset
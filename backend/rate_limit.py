@@ -0,0 +1,151 @@
+import math
+import os
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from models import ApiResponse
+from responses import encode_api_response
+
+
+class TokenBucketLimiter:
+    """Per-client and global token buckets kept in plain dicts.
+
+    Each client costs one dict entry holding a (tokens, updated_at) tuple.
+    A bucket that has been idle long enough to refill completely is the same
+    as a missing one, so sweep() drops those; it runs every `sweep_interval`
+    seconds and whenever the table outgrows `max_clients`, at which point the
+    least recently seen clients are evicted as well.
+    """
+
+    def __init__(self, client_rate: float, client_burst: float, global_rate: float, global_burst: float,
+                 max_clients: int = 10000, sweep_interval: float = 60.0):
+        self.client_rate = client_rate
+        self.client_burst = client_burst
+        self.global_rate = global_rate
+        self.global_burst = global_burst
+        self.max_clients = max_clients
+        self.sweep_interval = sweep_interval
+        self._clients: Dict[str, Tuple[float, float]] = {}
+        self._global: Tuple[float, float] = (global_burst, time.monotonic())
+        self._next_sweep = time.monotonic() + sweep_interval
+        self.allowed = 0
+        self.rejected_client = 0
+        self.rejected_global = 0
+        self.expired = 0
+
+    @classmethod
+    def from_env(cls) -> Optional["TokenBucketLimiter"]:
+        if os.environ.get("CONTACT_RATE_LIMIT_ENABLED", "true").lower() in ("0", "false", "no"):
+            return None
+        return cls(
+            client_rate=float(os.environ.get("CONTACT_RATE_PER_IP_PER_MIN", 5)) / 60,
+            client_burst=float(os.environ.get("CONTACT_BURST_PER_IP", 3)),
+            global_rate=float(os.environ.get("CONTACT_RATE_GLOBAL_PER_MIN", 120)) / 60,
+            global_burst=float(os.environ.get("CONTACT_BURST_GLOBAL", 30)),
+            max_clients=int(os.environ.get("CONTACT_RATE_MAX_CLIENTS", 10000)),
+        )
+
+    @staticmethod
+    def _refill(bucket: Tuple[float, float], rate: float, burst: float, now: float) -> float:
+        tokens, updated_at = bucket
+        return min(burst, tokens + (now - updated_at) * rate)
+
+    def acquire(self, client: str) -> Optional[float]:
+        """Take a token from both buckets; on refusal return seconds until one is available"""
+        now = time.monotonic()
+        if now >= self._next_sweep or len(self._clients) > self.max_clients:
+            self.sweep(now)
+
+        bucket = self._clients.pop(client, None)
+        client_tokens = self.client_burst if bucket is None else self._refill(bucket, self.client_rate, self.client_burst, now)
+        global_tokens = self._refill(self._global, self.global_rate, self.global_burst, now)
+
+        retry_after = None
+        if client_tokens < 1:
+            self.rejected_client += 1
+            retry_after = (1 - client_tokens) / self.client_rate
+        elif global_tokens < 1:
+            self.rejected_global += 1
+            retry_after = (1 - global_tokens) / self.global_rate
+        else:
+            self.allowed += 1
+            client_tokens -= 1
+            global_tokens -= 1
+
+        # Re-inserting keeps the dict ordered by last use, oldest first
+        self._clients[client] = (client_tokens, now)
+        self._global = (global_tokens, now)
+        return retry_after
+
+    def sweep(self, now: Optional[float] = None):
+        now = time.monotonic() if now is None else now
+        full_after = self.client_burst / self.client_rate
+        idle = [client for client, (_, updated_at) in self._clients.items() if now - updated_at >= full_after]
+        for client in idle:
+            del self._clients[client]
+        overflow = len(self._clients) - self.max_clients
+        if overflow > 0:
+            for client in list(self._clients)[:overflow]:
+                del self._clients[client]
+        self.expired += len(idle) + max(overflow, 0)
+        self._next_sweep = now + self.sweep_interval
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": True,
+            "allowed": self.allowed,
+            "rejected": self.rejected_client + self.rejected_global,
+            "rejectedPerClient": self.rejected_client,
+            "rejectedGlobal": self.rejected_global,
+            "trackedClients": len(self._clients),
+            "expiredClients": self.expired,
+            "limits": {
+                "perClientPerMinute": round(self.client_rate * 60, 3),
+                "perClientBurst": self.client_burst,
+                "globalPerMinute": round(self.global_rate * 60, 3),
+                "globalBurst": self.global_burst,
+            },
+        }
+
+
+_TOO_MANY_REQUESTS = encode_api_response(ApiResponse(
+    success=False,
+    error="Too many messages. Please try again later."
+))
+
+
+class RateLimitMiddleware:
+    """Answer 429 for rate-limited requests before routing, body parsing or Mongo.
+
+    `routes` are the (method, path) pairs the limiter applies to; the client
+    is the peer address, which uvicorn already resolves from X-Forwarded-For
+    for trusted proxies.
+    """
+
+    def __init__(self, app, limiter: Optional[TokenBucketLimiter], routes: Iterable[Tuple[str, str]]):
+        self.app = app
+        self.limiter = limiter
+        self.routes = frozenset(routes)
+
+    async def __call__(self, scope, receive, send):
+        if (self.limiter is None or scope["type"] != "http"
+                or (scope["method"], scope["path"]) not in self.routes):
+            await self.app(scope, receive, send)
+            return
+
+        client = scope.get("client")
+        retry_after = self.limiter.acquire(client[0] if client else "unknown")
+        if retry_after is None:
+            await self.app(scope, receive, send)
+            return
+
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(_TOO_MANY_REQUESTS)).encode("latin-1")),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": _TOO_MANY_REQUESTS})
@@ -0,0 +1,232 @@
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel
+from pymongo import DeleteOne, InsertOne, UpdateOne
+from pymongo.errors import OperationFailure
+
+from cache import bump_content_versions
+from models import DOCUMENT_MODELS, experience_document
+
+logger = logging.getLogger(__name__)
+
+STAGING_SUFFIX = "__staging"
+
+BATCH_SIZE = 1000
+
+# Document model per collection, for turning *Create payloads into stored documents
+COLLECTION_MODELS: Dict[str, Type[BaseModel]] = {model.collection_name: model for model in DOCUMENT_MODELS}
+
+# Fields that identify a seed record across runs; () marks single-document collections
+NATURAL_KEYS: Dict[str, Tuple[str, ...]] = {
+    "personal_info": (),
+    "about": (),
+    "skills": ("category",),
+    "projects": ("title",),
+    "experience": ("company", "position"),
+    "education": ("institution", "degree"),
+    "certifications": ("name", "issuer"),
+}
+
+# Stored on seeded documents: hash of the seed payload they were written from
+SEED_HASH_FIELD = "seedHash"
+
+
+def content_hash(item: BaseModel) -> str:
+    payload = json.dumps(item.model_dump(mode="json"), sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def natural_key(collection: str, record: Dict[str, Any]) -> Tuple[Any, ...]:
+    return tuple(record.get(field) for field in NATURAL_KEYS[collection])
+
+
+def key_label(collection: str, key: Tuple[Any, ...]) -> str:
+    return " / ".join(str(value) for value in key) if key else collection
+
+
+def seed_document(collection: str, item: BaseModel) -> Dict[str, Any]:
+    """Stored document for `item`, built the way the create_* methods build it, plus its seed hash"""
+    payload = item.dict()
+    obj = COLLECTION_MODELS[collection](**payload)
+    doc = experience_document(obj, payload) if collection == "experience" else obj.dict()
+    doc[SEED_HASH_FIELD] = content_hash(item)
+    return doc
+
+
+def seed_documents(collection: str, items: List[BaseModel]) -> List[Dict[str, Any]]:
+    return [seed_document(collection, item) for item in items]
+
+
+async def load_staging(db, collection: str, docs: List[Dict[str, Any]], batch_size: int = BATCH_SIZE):
+    """Write `docs` into a fresh staging copy of `collection` and build its indexes"""
+    staging = db[collection + STAGING_SUFFIX]
+    await staging.drop()
+    # Exists even when there is nothing to insert, so the rename always has a source
+    await db.create_collection(staging.name)
+    for start in range(0, len(docs), batch_size):
+        await staging.insert_many(docs[start:start + batch_size], ordered=False)
+    # Building indexes on the loaded collection is one pass instead of per-insert upkeep
+    indexes = COLLECTION_MODELS[collection].indexes
+    if indexes:
+        await staging.create_indexes(indexes)
+
+
+async def drop_staging(db, collections: List[str]):
+    for collection in collections:
+        try:
+            await db[collection + STAGING_SUFFIX].drop()
+        except OperationFailure as e:
+            logger.error(f"Failed to drop {collection}{STAGING_SUFFIX}: {str(e)}")
+
+
+async def atomic_reseed(db, content: Dict[str, List[BaseModel]], batch_size: int = BATCH_SIZE) -> Dict[str, int]:
+    """Replace each collection in `content` without readers ever seeing it empty or half-written.
+
+    Every collection is loaded into `<name>__staging` with insert_many and
+    indexed; only once all of them are ready is each one swapped in with
+    renameCollection(dropTarget=True), which replaces the live collection in
+    a single step. If loading fails the live collections are left untouched.
+    Collections are swapped one after another, so for a moment a reader of
+    two sections can see one old and one new. Swapped collections get their
+    content version bumped, so running servers drop their cached copies.
+    """
+    collections = list(content)
+    unknown = [collection for collection in collections if collection not in COLLECTION_MODELS]
+    if unknown:
+        raise ValueError(f"Unknown collections: {', '.join(unknown)}")
+
+    docs = {collection: seed_documents(collection, content[collection]) for collection in collections}
+    try:
+        await asyncio.gather(*(
+            load_staging(db, collection, docs[collection], batch_size) for collection in collections
+        ))
+    except Exception:
+        await drop_staging(db, collections)
+        raise
+
+    swapped = []
+    try:
+        for collection in collections:
+            await db[collection + STAGING_SUFFIX].rename(collection, dropTarget=True)
+            swapped.append(collection)
+    finally:
+        await bump_content_versions(db, swapped)
+    return {collection: len(docs[collection]) for collection in collections}
+
+
+class SeedWriter:
+    """Writes seed records to one collection, matched by natural key and skipping unchanged ones.
+
+    start() reads the stored keys and seed hashes with one projected find;
+    add() queues an insert or update for each new or changed record and,
+    with a `batch_size`, flushes a bulk_write whenever that many are queued;
+    finish() queues deletes for stored documents no record matched (when
+    `prune`) and flushes the rest. Only keys and hashes are held in memory,
+    never the records themselves. When anything was written, finish() bumps
+    the collection's content version so running servers reload it.
+    """
+
+    def __init__(self, db, collection: str, batch_size: Optional[int] = None, prune: bool = True):
+        if collection not in NATURAL_KEYS:
+            raise ValueError(f"Unknown collection: {collection}")
+        self.db = db
+        self.collection = db[collection]
+        self.name = collection
+        self.batch_size = batch_size
+        self.prune = prune
+        self._stored: Dict[Tuple[Any, ...], Tuple[Any, Optional[str]]] = {}
+        self._seen = set()
+        self._ops = []
+        self.report: Dict[str, Any] = {"inserted": [], "updated": [], "deleted": [], "unchanged": 0}
+
+    async def start(self):
+        fetch = {field: 1 for field in NATURAL_KEYS[self.name]}
+        fetch[SEED_HASH_FIELD] = 1
+        async for doc in self.collection.find({}, fetch):
+            key = natural_key(self.name, doc)
+            if key in self._stored:
+                # Left behind by seeding runs that appended instead of replacing
+                self._queue(DeleteOne({"_id": doc["_id"]}), "deleted", key)
+            else:
+                self._stored[key] = (doc["_id"], doc.get(SEED_HASH_FIELD))
+
+    def _queue(self, op, action: str, key: Tuple[Any, ...]):
+        self._ops.append(op)
+        self.report[action].append(key_label(self.name, key))
+
+    async def add(self, item: BaseModel):
+        key = natural_key(self.name, item.dict())
+        if key in self._seen:
+            raise ValueError(f"Duplicate {self.name} seed record: {key_label(self.name, key)}")
+        self._seen.add(key)
+        doc = seed_document(self.name, item)
+        existing = self._stored.get(key)
+        if existing is None:
+            self._queue(InsertOne(doc), "inserted", key)
+        elif existing[1] == doc[SEED_HASH_FIELD]:
+            self.report["unchanged"] += 1
+        else:
+            # Keep _id, id and createdAt so links and caches keyed on them stay valid
+            del doc["id"], doc["createdAt"]
+            self._queue(UpdateOne({"_id": existing[0]}, {"$set": doc}), "updated", key)
+        if self.batch_size and len(self._ops) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self):
+        if self._ops:
+            await self.collection.bulk_write(self._ops, ordered=False)
+            self._ops = []
+
+    async def finish(self) -> Dict[str, Any]:
+        if self.prune:
+            for key, (_id, _) in self._stored.items():
+                if key not in self._seen:
+                    self._queue(DeleteOne({"_id": _id}), "deleted", key)
+                    if self.batch_size and len(self._ops) >= self.batch_size:
+                        await self.flush()
+        await self.flush()
+        if self.report["inserted"] or self.report["updated"] or self.report["deleted"]:
+            await bump_content_versions(self.db, [self.name])
+        return self.report
+
+
+async def diff_collection(db, collection: str, items: List[BaseModel]) -> Dict[str, Any]:
+    writer = SeedWriter(db, collection)
+    await writer.start()
+    for item in items:
+        await writer.add(item)
+    return await writer.finish()
+
+
+async def diff_seed(db, content: Dict[str, List[BaseModel]]) -> Dict[str, Dict[str, Any]]:
+    """Bring each collection in `content` in line with it, writing only what changed.
+
+    Seed records are matched to stored documents by their natural key and
+    compared by content hash. Each collection costs one projected read plus,
+    when something differs, one unordered bulk_write with the needed inserts,
+    updates and deletes; unchanged documents keep their `_id` and timestamps.
+    """
+    unknown = [collection for collection in content if collection not in NATURAL_KEYS]
+    if unknown:
+        raise ValueError(f"Unknown collections: {', '.join(unknown)}")
+    reports = await asyncio.gather(*(
+        diff_collection(db, collection, items) for collection, items in content.items()
+    ))
+    return dict(zip(content, reports))
+
+
+def print_seed_report(reports: Dict[str, Dict[str, Any]], details: bool = True):
+    for collection, report in reports.items():
+        changes = [(action, report[action]) for action in ("inserted", "updated", "deleted") if report[action]]
+        if not changes:
+            print(f"✅ {collection}: unchanged ({report['unchanged']} documents)")
+            continue
+        print(f"✅ {collection}: " + ", ".join(f"{len(keys)} {action}" for action, keys in changes)
+              + f", {report['unchanged']} unchanged")
+        for action, keys in changes if details else ():
+            for key in keys:
+                print(f"   {action}: {key}")
@@ -0,0 +1,117 @@
+import functools
+import inspect
+import os
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from starlette.responses import Response
+
+from cache import ContentCache, served_generation
+from etag import make_etag
+from models import ApiResponse
+from responses import encode_api_response
+
+
+class CachedBody:
+    __slots__ = ("body", "etag", "generation")
+
+    def __init__(self, body: bytes, generation: Optional[int]):
+        self.body = body
+        self.etag = make_etag(body)
+        self.generation = generation
+
+    def response(self) -> Response:
+        return Response(content=self.body, media_type="application/json", headers={"ETag": self.etag})
+
+
+class ResponseCache:
+    """Fully encoded response bodies for read endpoints.
+
+    Each body is tied to the content cache generation it was built from, so it
+    is reused until the underlying collection is refilled or invalidated and
+    the endpoint skips model rebuilding, validation and JSON encoding. Bodies
+    carry a precomputed ETag so conditional requests cost a dict lookup.
+    """
+
+    def __init__(self, content_cache: Optional[ContentCache], enabled: bool = True, max_entries: int = 512):
+        self.content_cache = content_cache
+        self.enabled = enabled and content_cache is not None
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, Hashable], CachedBody]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls, content_cache: Optional[ContentCache]) -> "ResponseCache":
+        return cls(
+            content_cache,
+            enabled=os.environ.get("RESPONSE_CACHE_ENABLED", "true").lower() not in ("0", "false", "no"),
+            max_entries=int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", 512)),
+        )
+
+    def lookup(self, endpoint: str, collection: str, variant: Hashable) -> Optional[CachedBody]:
+        entry = self.content_cache.peek(collection, variant)
+        if entry is None:
+            return None
+        cached = self._entries.get((endpoint, variant))
+        if cached is None or cached.generation != entry.generation:
+            return None
+        self._entries.move_to_end((endpoint, variant))
+        return cached
+
+    def store(self, endpoint: str, variant: Hashable, cached: CachedBody) -> CachedBody:
+        self._entries[(endpoint, variant)] = cached
+        self._entries.move_to_end((endpoint, variant))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return cached
+
+    def clear(self):
+        self._entries.clear()
+
+    def endpoint(self, collection: str, variant: Optional[Callable[..., Hashable]] = None):
+        """Serve a read endpoint from pre-encoded bytes.
+
+        The cache variant must equal the arguments the endpoint passes to its
+        DatabaseManager getter. By default that is the endpoint's query
+        parameters in order; pass `variant` when the endpoint converts them,
+        returning None for requests that should bypass the cache. Failed
+        responses are never cached.
+        """
+        def decorator(func):
+            params = list(inspect.signature(func).parameters)
+
+            @functools.wraps(func)
+            async def wrapper(**kwargs):
+                if not self.enabled:
+                    return await func(**kwargs)
+                key = variant(**kwargs) if variant else tuple(kwargs[name] for name in params)
+                if key is None:
+                    return await func(**kwargs)
+                cached = self.lookup(func.__name__, collection, key)
+                if cached is not None:
+                    self.hits += 1
+                    return cached.response()
+
+                self.misses += 1
+                served_generation.set(None)
+                payload = await func(**kwargs)
+                if not isinstance(payload, ApiResponse) or not payload.success:
+                    return payload
+                cached = CachedBody(encode_api_response(payload), served_generation.get())
+                if cached.generation is not None:
+                    self.store(func.__name__, key, cached)
+                return cached.response()
+            return wrapper
+        return decorator
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "maxEntries": self.max_entries,
+            "hitRatio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,136 @@
+import functools
+import inspect
+import json
+import re
+from typing import Any, Callable, Optional
+
+from fastapi.routing import APIRoute
+from starlette.responses import JSONResponse
+
+from models import ApiResponse
+from tracing import phase
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson and `json` agree on ints and on floats in plain decimal notation, but
+# not where `json` switches to exponents (1e16 vs 1e+16, 0.00001 vs 1e-05).
+# Every such orjson float contains an exponent or a run of leading zeros; so
+# do some strings, which _floats_match() rules out from the surrounding token.
+_EXPONENT = re.compile(rb"e[-+]?\d")
+_LEADING_ZEROS = b"0.0000"
+_NUMBER_CHARS = frozenset(b"0123456789.-+eE")
+# Numeric tokens in compact JSON always sit between one of `:[,` and one of `,]}`
+_BEFORE_NUMBER = frozenset(b":[,")
+_AFTER_NUMBER = frozenset(b",]}")
+
+
+def _stdlib_dumps(content: Any) -> bytes:
+    # Starlette's JSONResponse.render, which every route used before
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def _unsupported(value: Any):
+    # Anything orjson can't encode natively goes through the stdlib path, so
+    # conversions and errors stay exactly what they were
+    raise TypeError
+
+
+def _float_token_matches(body: bytes, start: int, end: int) -> bool:
+    while start > 0 and body[start - 1] in _NUMBER_CHARS:
+        start -= 1
+    while end < len(body) and body[end] in _NUMBER_CHARS:
+        end += 1
+    if start == 0 or end == len(body) or body[start - 1] not in _BEFORE_NUMBER or body[end] not in _AFTER_NUMBER:
+        return True  # inside a string
+    token = body[start:end]
+    return repr(float(token)).encode("ascii") == token
+
+
+def _floats_match(body: bytes) -> bool:
+    """True when every float in `body` is written the way `json` would write it"""
+    for match in _EXPONENT.finditer(body):
+        if not _float_token_matches(body, match.start(), match.end()):
+            return False
+    position = body.find(_LEADING_ZEROS)
+    while position != -1:
+        if not _float_token_matches(body, position, position + len(_LEADING_ZEROS)):
+            return False
+        position = body.find(_LEADING_ZEROS, position + 1)
+    return True
+
+
+def _fast_dumps(content: Any) -> Optional[bytes]:
+    if orjson is not None:
+        try:
+            body = orjson.dumps(content, default=_unsupported, option=orjson.OPT_UTC_Z)
+        except TypeError:
+            pass
+        else:
+            if _floats_match(body):
+                return body
+    return None
+
+
+def dumps(content: Any) -> bytes:
+    """Encode already-JSON-compatible content byte-identically to JSONResponse"""
+    body = _fast_dumps(content)
+    return body if body is not None else _stdlib_dumps(content)
+
+
+_ENVELOPE_FIELDS = tuple(ApiResponse.model_fields)
+
+
+def encode_api_response(payload: ApiResponse) -> bytes:
+    """Encode an ApiResponse exactly as FastAPI does for `response_model=ApiResponse`.
+
+    The fast path hands the envelope's fields (datetimes and all) straight to
+    orjson in one pass; anything it can't encode the way FastAPI would, such
+    as models nested in `data`, takes FastAPI's own path: a JSON-mode dump
+    through `json`.
+    """
+    with phase("serialize"):
+        body = _fast_dumps({name: getattr(payload, name) for name in _ENVELOPE_FIELDS})
+        return body if body is not None else _stdlib_dumps(payload.model_dump(mode="json"))
+
+
+class ApiJSONResponse(JSONResponse):
+    """JSONResponse that renders through orjson when installed, with identical bytes"""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, ApiResponse):
+            return encode_api_response(content)
+        return dumps(content)
+
+
+class ApiRoute(APIRoute):
+    """Route class that encodes ApiResponse return values directly.
+
+    FastAPI would dump the envelope, re-validate it against `response_model`
+    and run jsonable_encoder before rendering; a returned Response skips all
+    of that. `response_model` is kept for the OpenAPI schema.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        super().__init__(path, _encode_envelope(endpoint), **kwargs)
+
+
+def _encode_envelope(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    if not inspect.iscoroutinefunction(endpoint):
+        return endpoint
+
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        result = await endpoint(*args, **kwargs)
+        if isinstance(result, ApiResponse):
+            return ApiJSONResponse(result)
+        return result
+    return wrapper
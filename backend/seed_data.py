@@ -1,17 +1,11 @@
 from database import DatabaseManager
 from models import *
+from reseed import diff_seed, print_seed_report
 import asyncio
 import os
 
-async def seed_database():
-    """Seed the database with mock data from frontend"""
-    
-    # Initialize database
-    mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
-    db_name = os.environ.get('DB_NAME', 'portfolio')
-    db = DatabaseManager(mongo_url, db_name)
-    
-    print("🌱 Starting database seeding...")
+def mock_content() -> Dict[str, List[BaseModel]]:
+    """Mock data from the frontend, keyed by collection"""
     
     # Personal Info
     personal_info = PersonalInfoCreate(
@@ -28,8 +22,6 @@ async def seed_database():
         ),
         resumeUrl="/resume.pdf"
     )
-    await db.create_or_update_personal_info(personal_info)
-    print("✅ Personal info seeded")
     
     # About
     about = AboutCreate(
@@ -47,8 +39,6 @@ async def seed_database():
             "Technology learning and AWS cloud architecture"
         ]
     )
-    await db.create_or_update_about(about)
-    print("✅ About section seeded")
     
     # Skills
     skills_data = [
@@ -100,10 +90,6 @@ async def seed_database():
         )
     ]
     
-    for skill in skills_data:
-        await db.create_skill(skill)
-    print("✅ Skills seeded")
-    
     # Projects
     projects_data = [
         ProjectCreate(
@@ -144,10 +130,6 @@ async def seed_database():
         )
     ]
     
-    for project in projects_data:
-        await db.create_project(project)
-    print("✅ Projects seeded")
-    
     # Experience (in reverse chronological order for proper sorting)
     experience_data = [
         ExperienceCreate(
@@ -258,10 +240,6 @@ async def seed_database():
         )
     ]
     
-    for exp in experience_data:
-        await db.create_experience(exp)
-    print("✅ Experience seeded")
-    
     # Education
     education_data = [
         EducationCreate(
@@ -284,10 +262,6 @@ async def seed_database():
         )
     ]
     
-    for edu in education_data:
-        await db.create_education(edu)
-    print("✅ Education seeded")
-    
     # Certifications
     certifications_data = [
         CertificationCreate(
@@ -310,9 +284,29 @@ async def seed_database():
         )
     ]
     
-    for cert in certifications_data:
-        await db.create_certification(cert)
-    print("✅ Certifications seeded")
+    return {
+        "personal_info": [personal_info],
+        "about": [about],
+        "skills": skills_data,
+        "projects": projects_data,
+        "experience": experience_data,
+        "education": education_data,
+        "certifications": certifications_data,
+    }
+
+async def seed_database():
+    """Seed the database with mock data from frontend"""
+    
+    # Initialize database
+    mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+    db_name = os.environ.get('DB_NAME', 'portfolio')
+    db = DatabaseManager(mongo_url, db_name)
+    
+    print("🌱 Starting database seeding...")
+    
+    # Re-running only writes records whose content changed; running servers
+    # drop their cached copies of those within CACHE_VERSION_POLL_INTERVAL
+    print_seed_report(await diff_seed(db.db, mock_content()))
     
     await db.close()
     print("🎉 Database seeding completed successfully!")
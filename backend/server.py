@@ -1,12 +1,30 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from database import DatabaseManager
+from database import DatabaseManager, PORTFOLIO_SECTIONS
+from cache import ContentCache, ContentVersionWatcher
+from response_cache import ResponseCache
+from responses import ApiJSONResponse, ApiRoute
+from etag import ETagMiddleware
+from pagination import InvalidCursor
+from exports import csv_chunks, ndjson_chunks
+from mongo_pool import client_options_from_env, warmup_connections_from_env
+from contact_queue import ContactWriteQueue
+from contact_dedup import ContactDeduplicator, IdempotencyConflict
+from rate_limit import RateLimitMiddleware, TokenBucketLimiter
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, CommandMetrics, Metrics, MetricsMiddleware
+from tracing import ServerTimingMiddleware, Tracer
+from admin_auth import AdminAuth
 from models import *
+from bson import ObjectId
+from bson.errors import InvalidId
+from contextlib import asynccontextmanager
 import os
 import logging
 from pathlib import Path
-from typing import Optional
+from datetime import datetime
+from typing import Optional, Tuple
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -14,21 +32,140 @@ load_dotenv(ROOT_DIR / '.env')
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
 db_name = os.environ['DB_NAME']
-db_manager = DatabaseManager(mongo_url, db_name)
+mongo_options = client_options_from_env()
+# The client is opened (and its pool warmed) by the app lifespan below
+db_manager = DatabaseManager(mongo_url, db_name, cache=ContentCache.from_env(),
+                             client_options=mongo_options, connect=False)
+
+# Drops cached content rewritten by other processes, e.g. the seed scripts
+content_versions = ContentVersionWatcher.from_env(db_manager.cache)
+
+# Optional write-behind batching for POST /api/contact
+contact_writes = ContactWriteQueue.from_env()
+
+# Repeated contact submissions return the original message
+db_manager.contact_dedup = ContactDeduplicator.from_env()
+
+# Per-client and global token buckets for POST /api/contact
+contact_limiter = TokenBucketLimiter.from_env()
+
+# Pre-encoded response bodies for the read endpoints, rebuilt on cache refill
+response_cache = ResponseCache.from_env(db_manager.cache)
+
+# Prometheus metrics served at /metrics; METRICS_ENABLED=false turns them off
+metrics = Metrics.from_env()
+if metrics is not None:
+    metrics.commands = CommandMetrics()
+    db_manager.command_listeners.append(metrics.commands)
+    metrics.pool = db_manager.pool_metrics.snapshot
+    metrics.add_cache("content", lambda: db_manager.cache.stats() if db_manager.cache is not None else None)
+    metrics.add_cache("response", response_cache.stats)
+
+# Server-Timing on every response, plus sampled span export (TRACE_SAMPLE_RATE)
+tracer = Tracer.from_env(ROOT_DIR / 'traces.jsonl')
+if tracer is not None:
+    db_manager.command_listeners.append(tracer.listener)
+
+# X-Admin-Key check for everything under /api/admin; it answers 404 until ADMIN_API_KEY is set
+require_admin = AdminAuth.from_env()
+
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Fail startup rather than serve requests without a reachable database
+    await db_manager.connect(warmup_connections_from_env(mongo_options))
+    try:
+        await db_manager.ensure_indexes()
+    except Exception as e:
+        logger.warning(f"Index creation failed: {str(e)}")
+    if content_versions is not None:
+        await content_versions.start(db_manager.db)
+    try:
+        await db_manager.warm_cache()
+    except Exception as e:
+        logger.warning(f"Content cache warmup failed: {str(e)}")
+    if contact_writes is not None:
+        # Replays messages a crashed process left in the spill file
+        contact_writes.on_duplicate = db_manager.insert_queued_contact_doc
+        contact_writes.on_inserted = db_manager.count_new_contact_messages
+        await contact_writes.start(db_manager.db.contact_messages)
+        db_manager.contact_writes = contact_writes
+    if tracer is not None and tracer.exporter is not None:
+        await tracer.exporter.start()
+    try:
+        yield
+    finally:
+        if tracer is not None and tracer.exporter is not None:
+            await tracer.exporter.stop()
+        if contact_writes is not None:
+            db_manager.contact_writes = None
+            await contact_writes.stop()
+        if content_versions is not None:
+            await content_versions.stop()
+        await db_manager.close()
 
 # Create the main app without a prefix
-app = FastAPI(title="Portfolio API", description="Personal Portfolio Backend API")
+app = FastAPI(title="Portfolio API", description="Personal Portfolio Backend API", lifespan=lifespan)
+
+def list_variant(fields: Optional[str] = None, limit: Optional[int] = None, cursor: Optional[str] = None, **filters):
+    """Response cache variant for list endpoints; paginated requests bypass the cache"""
+    if limit is not None or cursor:
+        return None
+    return (*filters.values(), normalize_fields(fields))
+
+def page_data(items: list, next_cursor: Optional[str], selected: Optional[Tuple[str, ...]]) -> dict:
+    return {
+        "items": [item.dict(exclude_unset=selected is not None) for item in items],
+        "next": next_cursor
+    }
+
+# Create a router with the /api prefix; envelopes are encoded by ApiRoute
+# (orjson when installed, byte-identical to FastAPI's own encoding)
+api_router = APIRouter(prefix="/api", route_class=ApiRoute, default_response_class=ApiJSONResponse)
 
-# Create a router with the /api prefix
-api_router = APIRouter(prefix="/api")
+# Admin routes need the X-Admin-Key header; every route added here inherits the check
+admin_router = APIRouter(prefix="/api/admin", route_class=ApiRoute, default_response_class=ApiJSONResponse,
+                         dependencies=[Depends(require_admin)])
 
 # Health check endpoint
 @api_router.get("/")
 async def root():
     return {"message": "Portfolio API is running"}
 
+# Portfolio Bundle Endpoint
+@api_router.get("/portfolio", response_model=ApiResponse)
+async def get_portfolio(sections: Optional[str] = None):
+    requested = [name.strip() for name in sections.split(",") if name.strip()] if sections else None
+    unknown = [name for name in requested or [] if name not in PORTFOLIO_SECTIONS]
+    if unknown:
+        return ApiResponse(
+            success=False,
+            error=f"Unknown portfolio sections: {', '.join(unknown)}"
+        )
+    try:
+        portfolio = await db_manager.get_portfolio(requested)
+        data = {}
+        for name, value in portfolio.items():
+            if isinstance(value, list):
+                data[name] = [item.dict() for item in value]
+            else:
+                data[name] = value.dict() if value else None
+        return ApiResponse(
+            success=True,
+            data=data,
+            message="Portfolio retrieved successfully"
+        )
+    except Exception as e:
+        logging.error(f"Error fetching portfolio: {str(e)}")
+        return ApiResponse(
+            success=False,
+            error="Failed to fetch portfolio"
+        )
+
 # Personal Info Endpoints
 @api_router.get("/personal-info", response_model=ApiResponse)
+@response_cache.endpoint("personal_info")
 async def get_personal_info():
     try:
         personal_info = await db_manager.get_personal_info()
@@ -49,6 +186,7 @@ async def get_personal_info():
 
 # About Endpoints
 @api_router.get("/about", response_model=ApiResponse)
+@response_cache.endpoint("about")
 async def get_about():
     try:
         about = await db_manager.get_about()
@@ -69,14 +207,33 @@ async def get_about():
 
 # Skills Endpoints
 @api_router.get("/skills", response_model=ApiResponse)
-async def get_skills():
+@response_cache.endpoint("skills", variant=list_variant)
+async def get_skills(fields: Optional[str] = None,
+                     limit: Optional[int] = None, cursor: Optional[str] = None):
     try:
-        skills = await db_manager.get_skills()
+        selected = select_fields(Skills, fields)
+    except ValueError as e:
+        return ApiResponse(
+            success=False,
+            error=str(e)
+        )
+    try:
+        if limit is not None or cursor:
+            skills, next_cursor = await db_manager.get_page("skills", None, selected, limit, cursor)
+            data = page_data(skills, next_cursor, selected)
+        else:
+            skills = await db_manager.get_skills(selected)
+            data = [skill.dict(exclude_unset=selected is not None) for skill in skills]
         return ApiResponse(
             success=True,
-            data=[skill.dict() for skill in skills],
+            data=data,
             message="Skills retrieved successfully"
         )
+    except InvalidCursor as e:
+        return ApiResponse(
+            success=False,
+            error=str(e)
+        )
     except Exception as e:
         logging.error(f"Error fetching skills: {str(e)}")
         return ApiResponse(
@@ -86,14 +243,33 @@ async def get_skills():
 
 # Projects Endpoints
 @api_router.get("/projects", response_model=ApiResponse)
-async def get_projects(category: Optional[str] = None):
+@response_cache.endpoint("projects", variant=list_variant)
+async def get_projects(category: Optional[str] = None, fields: Optional[str] = None,
+                       limit: Optional[int] = None, cursor: Optional[str] = None):
+    try:
+        selected = select_fields(Project, fields)
+    except ValueError as e:
+        return ApiResponse(
+            success=False,
+            error=str(e)
+        )
     try:
-        projects = await db_manager.get_projects(category)
+        if limit is not None or cursor:
+            projects, next_cursor = await db_manager.get_page("projects", {"category": category} if category else None, selected, limit, cursor)
+            data = page_data(projects, next_cursor, selected)
+        else:
+            projects = await db_manager.get_projects(category, selected)
+            data = [project.dict(exclude_unset=selected is not None) for project in projects]
         return ApiResponse(
             success=True,
-            data=[project.dict() for project in projects],
+            data=data,
             message="Projects retrieved successfully"
         )
+    except InvalidCursor as e:
+        return ApiResponse(
+            success=False,
+            error=str(e)
+        )
     except Exception as e:
         logging.error(f"Error fetching projects: {str(e)}")
         return ApiResponse(
@@ -103,14 +279,33 @@ async def get_projects(category: Optional[str] = None):
 
 # Experience Endpoints
 @api_router.get("/experience", response_model=ApiResponse)
-async def get_experience():
+@response_cache.endpoint("experience", variant=list_variant)
+async def get_experience(fields: Optional[str] = None,
+                         limit: Optional[int] = None, cursor: Optional[str] = None):
+    try:
+        selected = select_fields(Experience, fields)
+    except ValueError as e:
+        return ApiResponse(
+            success=False,
+            error=str(e)
+        )
     try:
-        experience = await db_manager.get_experience()
+        if limit is not None or cursor:
+            experience, next_cursor = await db_manager.get_page("experience", None, selected, limit, cursor)
+            data = page_data(experience, next_cursor, selected)
+        else:
+            experience = await db_manager.get_experience(selected)
+            data = [exp.dict(exclude_unset=selected is not None) for exp in experience]
         return ApiResponse(
             success=True,
-            data=[exp.dict() for exp in experience],
+            data=data,
             message="Experience retrieved successfully"
         )
+    except InvalidCursor as e:
+        return ApiResponse(
+            success=False,
+            error=str(e)
+        )
     except Exception as e:
         logging.error(f"Error fetching experience: {str(e)}")
         return ApiResponse(
@@ -120,14 +315,33 @@ async def get_experience():
 
 # Education Endpoints
 @api_router.get("/education", response_model=ApiResponse)
-async def get_education():
+@response_cache.endpoint("education", variant=list_variant)
+async def get_education(fields: Optional[str] = None,
+                        limit: Optional[int] = None, cursor: Optional[str] = None):
+    try:
+        selected = select_fields(Education, fields)
+    except ValueError as e:
+        return ApiResponse(
+            success=False,
+            error=str(e)
+        )
     try:
-        education = await db_manager.get_education()
+        if limit is not None or cursor:
+            education, next_cursor = await db_manager.get_page("education", None, selected, limit, cursor)
+            data = page_data(education, next_cursor, selected)
+        else:
+            education = await db_manager.get_education(selected)
+            data = [edu.dict(exclude_unset=selected is not None) for edu in education]
         return ApiResponse(
             success=True,
-            data=[edu.dict() for edu in education],
+            data=data,
             message="Education retrieved successfully"
         )
+    except InvalidCursor as e:
+        return ApiResponse(
+            success=False,
+            error=str(e)
+        )
     except Exception as e:
         logging.error(f"Error fetching education: {str(e)}")
         return ApiResponse(
@@ -137,14 +351,33 @@ async def get_education():
 
 # Certifications Endpoints
 @api_router.get("/certifications", response_model=ApiResponse)
-async def get_certifications():
+@response_cache.endpoint("certifications", variant=list_variant)
+async def get_certifications(fields: Optional[str] = None,
+                             limit: Optional[int] = None, cursor: Optional[str] = None):
     try:
-        certifications = await db_manager.get_certifications()
+        selected = select_fields(Certification, fields)
+    except ValueError as e:
+        return ApiResponse(
+            success=False,
+            error=str(e)
+        )
+    try:
+        if limit is not None or cursor:
+            certifications, next_cursor = await db_manager.get_page("certifications", None, selected, limit, cursor)
+            data = page_data(certifications, next_cursor, selected)
+        else:
+            certifications = await db_manager.get_certifications(selected)
+            data = [cert.dict(exclude_unset=selected is not None) for cert in certifications]
         return ApiResponse(
             success=True,
-            data=[cert.dict() for cert in certifications],
+            data=data,
             message="Certifications retrieved successfully"
         )
+    except InvalidCursor as e:
+        return ApiResponse(
+            success=False,
+            error=str(e)
+        )
     except Exception as e:
         logging.error(f"Error fetching certifications: {str(e)}")
         return ApiResponse(
@@ -154,14 +387,22 @@ async def get_certifications():
 
 # Contact Endpoints
 @api_router.post("/contact", response_model=ApiResponse)
-async def submit_contact_message(message: ContactMessageCreate):
+async def submit_contact_message(
+    message: ContactMessageCreate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255)
+):
     try:
-        contact_message = await db_manager.create_contact_message(message)
+        contact_message = await db_manager.create_contact_message(message, idempotency_key)
         return ApiResponse(
             success=True,
             data=contact_message.dict(),
             message="Message sent successfully! Thank you for reaching out."
         )
+    except IdempotencyConflict as e:
+        return ApiResponse(
+            success=False,
+            error=str(e)
+        )
     except Exception as e:
         logging.error(f"Error creating contact message: {str(e)}")
         return ApiResponse(
@@ -186,16 +427,35 @@ async def get_resume_url():
             error="Failed to fetch resume URL"
         )
 
-# Admin endpoint to view contact messages (for future use)
-@api_router.get("/admin/messages", response_model=ApiResponse)
-async def get_contact_messages():
+# Admin endpoint to view, search and filter contact messages
+@admin_router.get("/messages", response_model=ApiResponse)
+async def get_contact_messages(
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    q: Optional[str] = Query(None, max_length=200),
+    status: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+):
+    if status and status not in CONTACT_STATUSES:
+        return ApiResponse(
+            success=False,
+            error=f"Status must be one of: {', '.join(CONTACT_STATUSES)}"
+        )
     try:
-        messages = await db_manager.get_contact_messages()
+        messages, next_cursor = await db_manager.get_contact_messages(
+            limit, cursor, search=q.strip() if q else None, status=status, since=since, until=until
+        )
         return ApiResponse(
             success=True,
-            data=[msg.dict() for msg in messages],
+            data=page_data(messages, next_cursor, None),
             message="Contact messages retrieved successfully"
         )
+    except InvalidCursor as e:
+        return ApiResponse(
+            success=False,
+            error=str(e)
+        )
     except Exception as e:
         logging.error(f"Error fetching contact messages: {str(e)}")
         return ApiResponse(
@@ -203,8 +463,209 @@ async def get_contact_messages():
             error="Failed to fetch contact messages"
         )
 
-# Include the router in the main app
+# Admin endpoint for per-status message counts, e.g. the unread badge
+@admin_router.get("/messages/counts", response_model=ApiResponse)
+async def get_contact_message_counts(rebuild: bool = False):
+    try:
+        counts = await db_manager.get_contact_counts(rebuild=rebuild)
+        return ApiResponse(
+            success=True,
+            data=counts,
+            message="Contact message counts retrieved successfully"
+        )
+    except Exception as e:
+        logging.error(f"Error fetching contact message counts: {str(e)}")
+        return ApiResponse(
+            success=False,
+            error="Failed to fetch contact message counts"
+        )
+
+# Admin endpoint to move many contact messages to another status at once
+@admin_router.post("/messages/status", response_model=ApiResponse)
+async def update_contact_message_status(update: ContactStatusUpdate):
+    for status in (update.status, update.fromStatus):
+        if status and status not in CONTACT_STATUSES:
+            return ApiResponse(
+                success=False,
+                error=f"Status must be one of: {', '.join(CONTACT_STATUSES)}"
+            )
+    if update.ids is None and update.fromStatus is None:
+        return ApiResponse(
+            success=False,
+            error="Provide message ids or fromStatus"
+        )
+    try:
+        ids = [ObjectId(message_id) for message_id in update.ids] if update.ids is not None else None
+    except InvalidId:
+        return ApiResponse(
+            success=False,
+            error="Invalid message id"
+        )
+    try:
+        moved = await db_manager.set_contact_status(update.status, ids, update.fromStatus, update.until)
+        return ApiResponse(
+            success=True,
+            data={
+                "updated": sum(moved.values()),
+                "fromStatus": moved,
+                "counts": await db_manager.get_contact_counts()
+            },
+            message="Contact message status updated successfully"
+        )
+    except Exception as e:
+        logging.error(f"Error updating contact message status: {str(e)}")
+        return ApiResponse(
+            success=False,
+            error="Failed to update contact message status"
+        )
+
+# Admin endpoint to stream contact messages as NDJSON or CSV
+@admin_router.get("/messages/export")
+async def export_contact_messages(
+    fmt: str = Query("ndjson", alias="format"),
+    status: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+):
+    if fmt not in ("ndjson", "csv"):
+        return ApiResponse(
+            success=False,
+            error="Export format must be 'ndjson' or 'csv'"
+        )
+    if status and status not in CONTACT_STATUSES:
+        return ApiResponse(
+            success=False,
+            error=f"Status must be one of: {', '.join(CONTACT_STATUSES)}"
+        )
+    
+    docs = db_manager.iter_contact_messages(status, since, until)
+    fields = list(ContactMessage.model_fields)
+    if fmt == "csv":
+        return StreamingResponse(
+            csv_chunks(docs, fields),
+            media_type="text/csv; charset=utf-8",
+            headers={"Content-Disposition": 'attachment; filename="contact_messages.csv"'}
+        )
+    return StreamingResponse(
+        ndjson_chunks(docs, fields),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="contact_messages.ndjson"'}
+    )
+
+# Admin endpoint to report index usage and flag collection scans
+@admin_router.get("/index-report", response_model=ApiResponse)
+async def get_index_report():
+    try:
+        report = await db_manager.index_report()
+        return ApiResponse(
+            success=True,
+            data=report,
+            message="Index report generated successfully"
+        )
+    except Exception as e:
+        logging.error(f"Error generating index report: {str(e)}")
+        return ApiResponse(
+            success=False,
+            error="Failed to generate index report"
+        )
+
+# Admin endpoint to inspect the content cache
+@admin_router.get("/cache-stats", response_model=ApiResponse)
+async def get_cache_stats():
+    if db_manager.cache is None:
+        return ApiResponse(
+            success=True,
+            data={"enabled": False, "responses": response_cache.stats()},
+            message="Content cache is disabled"
+        )
+    return ApiResponse(
+        success=True,
+        data={"enabled": True, **db_manager.cache.stats(), "responses": response_cache.stats()},
+        message="Cache stats retrieved successfully"
+    )
+
+# Admin endpoint to inspect the MongoDB connection pool
+@admin_router.get("/db-pool", response_model=ApiResponse)
+async def get_db_pool_stats():
+    return ApiResponse(
+        success=True,
+        data=db_manager.pool_stats(),
+        message="Connection pool stats retrieved successfully"
+    )
+
+# Admin endpoint to inspect the contact write-behind queue
+@admin_router.get("/contact-queue", response_model=ApiResponse)
+async def get_contact_queue_stats():
+    if contact_writes is None:
+        return ApiResponse(
+            success=True,
+            data={"enabled": False},
+            message="Contact write-behind is disabled"
+        )
+    return ApiResponse(
+        success=True,
+        data=contact_writes.stats(),
+        message="Contact queue stats retrieved successfully"
+    )
+
+# Admin endpoint to inspect contact deduplication
+@admin_router.get("/contact-dedup", response_model=ApiResponse)
+async def get_contact_dedup_stats():
+    if db_manager.contact_dedup is None:
+        return ApiResponse(
+            success=True,
+            data={"enabled": False},
+            message="Contact deduplication is disabled"
+        )
+    return ApiResponse(
+        success=True,
+        data=db_manager.contact_dedup.stats(),
+        message="Contact dedup stats retrieved successfully"
+    )
+
+# Admin endpoint to inspect request tracing
+@admin_router.get("/tracing", response_model=ApiResponse)
+async def get_tracing_stats():
+    if tracer is None:
+        return ApiResponse(
+            success=True,
+            data={"enabled": False},
+            message="Server-Timing and tracing are disabled"
+        )
+    return ApiResponse(
+        success=True,
+        data=tracer.stats(),
+        message="Tracing stats retrieved successfully"
+    )
+
+# Admin endpoint to inspect contact rate limiting
+@admin_router.get("/rate-limits", response_model=ApiResponse)
+async def get_rate_limit_stats():
+    if contact_limiter is None:
+        return ApiResponse(
+            success=True,
+            data={"enabled": False},
+            message="Contact rate limiting is disabled"
+        )
+    return ApiResponse(
+        success=True,
+        data=contact_limiter.stats(),
+        message="Rate limit stats retrieved successfully"
+    )
+
+# Include the routers in the main app
 app.include_router(api_router)
+app.include_router(admin_router)
+
+# Prometheus scrape endpoint, outside /api so it skips the envelope and the response cache
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    if metrics is None:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return Response(metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+# Fast 429s for contact floods; inside CORS so browsers can read them
+app.add_middleware(RateLimitMiddleware, limiter=contact_limiter, routes=[("POST", "/api/contact")])
 
 app.add_middleware(
     CORSMiddleware,
@@ -214,13 +675,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Strong ETags and 304 answers for If-None-Match on every GET route
+app.add_middleware(ETagMiddleware)
+
+# Server-Timing covers everything inside it, including ETag hashing
+app.add_middleware(ServerTimingMiddleware, tracer=tracer)
+
+# Outermost, so request metrics include 304s, 429s and the other middlewares' time
+app.add_middleware(MetricsMiddleware, metrics=metrics)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
-logger = logging.getLogger(__name__)
-
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    await db_manager.close()
\ No newline at end of file
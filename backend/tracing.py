@@ -0,0 +1,300 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import secrets
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from pymongo import monitoring
+
+from metrics import command_collection, route_template
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "portfolio-api"
+
+# Phases reported in Server-Timing, in header order; "app" is the whole request
+SERVER_TIMING_PHASES = ("mongo", "hydrate", "serialize")
+
+# Trace of the request being handled. Motor runs commands on its executor
+# with a copy of the caller's context, so command events see it too.
+_current: ContextVar[Optional["RequestTrace"]] = ContextVar("request_trace", default=None)
+
+
+class RequestTrace:
+    """Phase timings of one request, plus span data when it was sampled.
+
+    Phases are added on the event loop; Mongo commands are appended from
+    driver threads (list.append is atomic) and summed when the header is built.
+    """
+
+    __slots__ = ("start", "start_ns", "sampled", "trace_id", "span_id", "phases", "intervals",
+                 "commands", "pending")
+
+    def __init__(self, sampled: bool):
+        self.start = time.perf_counter()
+        self.start_ns = time.time_ns()
+        self.sampled = sampled
+        self.trace_id = secrets.token_hex(16) if sampled else None
+        self.span_id = secrets.token_hex(8) if sampled else None
+        self.phases: Dict[str, float] = {}
+        # (phase, start, end) perf_counter intervals, kept for sampled traces only
+        self.intervals: List[Tuple[str, float, float]] = []
+        # (collection, command, start, seconds, failed) per finished Mongo command
+        self.commands: List[Tuple[str, str, Optional[float], float, bool]] = []
+        self.pending: Dict[int, Tuple[str, float]] = {}
+
+    def add_phase(self, name: str, start: float, end: float):
+        self.phases[name] = self.phases.get(name, 0.0) + (end - start)
+        if self.sampled:
+            self.intervals.append((name, start, end))
+
+    def server_timing(self) -> str:
+        # Command durations overlap when reads are gathered, so mongo can exceed app
+        commands = list(self.commands)
+        entries = []
+        for name in SERVER_TIMING_PHASES:
+            if name == "mongo":
+                if commands:
+                    seconds = sum(command[3] for command in commands)
+                    noun = "command" if len(commands) == 1 else "commands"
+                    entries.append(f'mongo;dur={seconds * 1000:.3f};desc="{len(commands)} {noun}"')
+            elif name in self.phases:
+                entries.append(f"{name};dur={self.phases[name] * 1000:.3f}")
+        entries.append(f"app;dur={(time.perf_counter() - self.start) * 1000:.3f}")
+        if self.sampled:
+            entries.append(f'trace;desc="{self.trace_id}"')
+        return ", ".join(entries)
+
+    def _unix_ns(self, perf: float) -> int:
+        return self.start_ns + int((perf - self.start) * 1e9)
+
+    def _span(self, name: str, kind: str, start: float, end: float, attributes: Dict[str, Any],
+              error: bool = False, span_id: Optional[str] = None, parent: Optional[str] = None) -> Dict[str, Any]:
+        return {
+            "traceId": self.trace_id,
+            "spanId": span_id or secrets.token_hex(8),
+            "parentSpanId": parent,
+            "name": name,
+            "kind": kind,
+            "startTimeUnixNano": self._unix_ns(start),
+            "endTimeUnixNano": self._unix_ns(end),
+            "attributes": attributes,
+            "status": "ERROR" if error else "OK",
+        }
+
+    def spans(self, method: str, route: str, path: str, status: int) -> List[Dict[str, Any]]:
+        """The request as a SERVER span with one child per phase and per Mongo command"""
+        end = time.perf_counter()
+        spans = [self._span(f"{method} {route}", "SERVER", self.start, end, {
+            "service.name": SERVICE_NAME,
+            "http.request.method": method,
+            "http.route": route,
+            "url.path": path,
+            "http.response.status_code": status,
+        }, error=status >= 500, span_id=self.span_id)]
+        for name, start, finish in self.intervals:
+            spans.append(self._span(name, "INTERNAL", start, finish, {}, parent=self.span_id))
+        for collection, command, start, seconds, failed in list(self.commands):
+            start = start if start is not None else end - seconds
+            spans.append(self._span(f"{command} {collection}".strip(), "CLIENT", start, start + seconds, {
+                "db.system": "mongodb",
+                "db.operation.name": command,
+                "db.collection.name": collection,
+            }, error=failed, parent=self.span_id))
+        return spans
+
+
+@contextmanager
+def phase(name: str):
+    """Time the enclosed block as `name` in the current request's Server-Timing"""
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add_phase(name, start, time.perf_counter())
+
+
+class TraceCommandListener(monitoring.CommandListener):
+    """Attributes each Mongo command to the request whose context issued it"""
+
+    def started(self, event):
+        trace = _current.get()
+        if trace is not None:
+            trace.pending[event.request_id] = (command_collection(event), time.perf_counter())
+
+    def succeeded(self, event):
+        self._finish(event, False)
+
+    def failed(self, event):
+        self._finish(event, True)
+
+    def _finish(self, event, failed: bool):
+        trace = _current.get()
+        if trace is None:
+            return
+        collection, start = trace.pending.pop(event.request_id, ("", None))
+        trace.commands.append((collection, event.command_name, start, event.duration_micros / 1e6, failed))
+
+
+class SpanExporter:
+    """Buffers finished spans and writes them in batches from a background task.
+
+    `target` is a JSONL file (one span per line) or an http(s) URL of a
+    collector stand-in, which gets each batch POSTed as
+    {"resource": {...}, "spans": [...]}. When more than `max_pending` spans
+    are waiting, new ones are dropped rather than growing memory under load.
+    """
+
+    def __init__(self, target: str, flush_interval: float = 1.0, max_pending: int = 10000):
+        self.target = target
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: List[Dict[str, Any]] = []
+        self._task: Optional[asyncio.Task] = None
+        self._client = None
+        self.exported = 0
+        self.dropped = 0
+
+    @property
+    def is_http(self) -> bool:
+        return self.target.startswith(("http://", "https://"))
+
+    def export(self, spans: List[Dict[str, Any]]):
+        if len(self._pending) >= self.max_pending:
+            self.dropped += len(spans)
+            return
+        self._pending.extend(spans)
+
+    async def start(self):
+        if self.is_http:
+            self._client = httpx.AsyncClient(timeout=5.0)
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def _append(self, batch: List[Dict[str, Any]]):
+        with open(self.target, "a", encoding="utf-8") as fh:
+            fh.writelines(json.dumps(span, separators=(",", ":")) + "\n" for span in batch)
+
+    async def flush(self):
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        try:
+            if self._client is not None:
+                response = await self._client.post(self.target, json={
+                    "resource": {"service.name": SERVICE_NAME},
+                    "spans": batch,
+                })
+                response.raise_for_status()
+            else:
+                await asyncio.to_thread(self._append, batch)
+            self.exported += len(batch)
+        except Exception as e:
+            self.dropped += len(batch)
+            logger.error(f"Failed to export {len(batch)} spans to {self.target}: {str(e)}")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class Tracer:
+    """Server-Timing for every request and sampled span export"""
+
+    def __init__(self, sample_rate: float = 0.0, exporter: Optional[SpanExporter] = None):
+        self.sample_rate = sample_rate if exporter is not None else 0.0
+        self.exporter = exporter
+        self.listener = TraceCommandListener()
+        self.sampled = 0
+
+    @classmethod
+    def from_env(cls, default_file: Path) -> Optional["Tracer"]:
+        if os.environ.get("SERVER_TIMING_ENABLED", "true").lower() in ("0", "false", "no"):
+            return None
+        sample_rate = float(os.environ.get("TRACE_SAMPLE_RATE", 0))
+        exporter = None
+        if sample_rate > 0:
+            exporter = SpanExporter(
+                os.environ.get("TRACE_EXPORT") or str(default_file),
+                flush_interval=float(os.environ.get("TRACE_FLUSH_INTERVAL_MS", 1000)) / 1000,
+                max_pending=int(os.environ.get("TRACE_MAX_PENDING_SPANS", 10000)),
+            )
+        return cls(min(sample_rate, 1.0), exporter)
+
+    def begin(self) -> RequestTrace:
+        sampled = self.sample_rate > 0 and random.random() < self.sample_rate
+        if sampled:
+            self.sampled += 1
+        return RequestTrace(sampled)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": True,
+            "sampleRate": self.sample_rate,
+            "sampled": self.sampled,
+            "exported": self.exporter.exported if self.exporter else 0,
+            "dropped": self.exporter.dropped if self.exporter else 0,
+            "target": self.exporter.target if self.exporter else None,
+        }
+
+
+class ServerTimingMiddleware:
+    """Add a Server-Timing header to every HTTP response and export sampled traces.
+
+    The header is built when the response starts, so for streamed responses
+    it covers the time until the first byte.
+    """
+
+    def __init__(self, app, tracer: Optional[Tracer]):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope, receive, send):
+        if self.tracer is None or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = self.tracer.begin()
+        state = {"status": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", trace.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = _current.set(trace)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            if trace.sampled:
+                self.tracer.exporter.export(
+                    trace.spans(scope["method"], route_template(scope), scope["path"], state["status"])
+                )
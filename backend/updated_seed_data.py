@@ -1,27 +1,13 @@
 from database import DatabaseManager
 from models import *
+from cache import bump_content_versions
+from reseed import atomic_reseed, diff_seed, print_seed_report
+import argparse
 import asyncio
 import os
 
-async def update_database_with_real_data():
-    """Update the database with actual detailed resume data"""
-    
-    # Initialize database
-    mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
-    db_name = os.environ.get('DB_NAME', 'portfolio')
-    db = DatabaseManager(mongo_url, db_name)
-    
-    print("🔄 Updating database with real resume data...")
-    
-    # Clear existing data
-    await db.db.personal_info.delete_many({})
-    await db.db.about.delete_many({})
-    await db.db.skills.delete_many({})
-    await db.db.projects.delete_many({})
-    await db.db.experience.delete_many({})
-    await db.db.education.delete_many({})
-    await db.db.certifications.delete_many({})
-    print("🗑️ Cleared existing test data")
+def resume_content() -> Dict[str, List[BaseModel]]:
+    """The real resume data, keyed by collection"""
     
     # Personal Info - Real Data
     personal_info = PersonalInfoCreate(
@@ -38,8 +24,6 @@ async def update_database_with_real_data():
         ),
         resumeUrl="/resume.pdf"
     )
-    await db.create_or_update_personal_info(personal_info)
-    print("✅ Updated personal info")
     
     # About - Real Data
     about = AboutCreate(
@@ -58,8 +42,6 @@ async def update_database_with_real_data():
             "Continuous learning in cloud technologies and system architecture"
         ]
     )
-    await db.create_or_update_about(about)
-    print("✅ Updated about section")
     
     # Skills - Real Detailed Data
     skills_data = [
@@ -121,10 +103,6 @@ async def update_database_with_real_data():
         )
     ]
     
-    for skill in skills_data:
-        await db.create_skill(skill)
-    print("✅ Updated skills with real data")
-    
     # Projects - Real Data (same projects but keeping them)
     projects_data = [
         ProjectCreate(
@@ -167,10 +145,6 @@ async def update_database_with_real_data():
         )
     ]
     
-    for project in projects_data:
-        await db.create_project(project)
-    print("✅ Updated projects with detailed descriptions")
-    
     # Experience - Real Detailed Data
     experience_data = [
         ExperienceCreate(
@@ -280,10 +254,6 @@ async def update_database_with_real_data():
         )
     ]
     
-    for exp in experience_data:
-        await db.create_experience(exp)
-    print("✅ Updated experience with detailed real data")
-    
     # Education - Real Data
     education_data = [
         EducationCreate(
@@ -306,10 +276,6 @@ async def update_database_with_real_data():
         )
     ]
     
-    for edu in education_data:
-        await db.create_education(edu)
-    print("✅ Updated education")
-    
     # Certifications - Real Data
     certifications_data = [
         CertificationCreate(
@@ -332,9 +298,40 @@ async def update_database_with_real_data():
         )
     ]
     
-    for cert in certifications_data:
-        await db.create_certification(cert)
-    print("✅ Updated certifications")
+    return {
+        "personal_info": [personal_info],
+        "about": [about],
+        "skills": skills_data,
+        "projects": projects_data,
+        "experience": experience_data,
+        "education": education_data,
+        "certifications": certifications_data,
+    }
+
+async def update_database_with_real_data(mode: str = "diff"):
+    """Update the database with actual detailed resume data"""
+    
+    # Initialize database
+    mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+    db_name = os.environ.get('DB_NAME', 'portfolio')
+    db = DatabaseManager(mongo_url, db_name)
+    content = resume_content()
+    
+    print("🔄 Updating database with real resume data...")
+    
+    if mode == "diff":
+        # Only documents whose seed content changed are written
+        print_seed_report(await diff_seed(db.db, content))
+    elif mode == "atomic":
+        # Readers keep the old data until each fully loaded collection is swapped in
+        loaded = await atomic_reseed(db.db, content)
+        for collection, count in loaded.items():
+            print(f"✅ Swapped in {collection} ({count} documents)")
+    else:
+        await update_in_place(db, content)
+        # diff_seed and atomic_reseed do this themselves; running servers drop
+        # their cached copies within CACHE_VERSION_POLL_INTERVAL
+        await bump_content_versions(db.db, content)
     
     await db.close()
     print("🎉 Database updated successfully with real detailed resume data!")
@@ -347,5 +344,43 @@ async def update_database_with_real_data():
     print("✅ Education with enhanced descriptions")
     print("✅ Certifications with detailed descriptions")
 
+async def update_in_place(db: DatabaseManager, content: Dict[str, List[BaseModel]]):
+    """Clear each collection and insert one document at a time; readers see partial data meanwhile"""
+    await db.db.personal_info.delete_many({})
+    await db.db.about.delete_many({})
+    await db.db.skills.delete_many({})
+    await db.db.projects.delete_many({})
+    await db.db.experience.delete_many({})
+    await db.db.education.delete_many({})
+    await db.db.certifications.delete_many({})
+    print("🗑️ Cleared existing test data")
+    
+    for personal_info in content["personal_info"]:
+        await db.create_or_update_personal_info(personal_info)
+    print("✅ Updated personal info")
+    for about in content["about"]:
+        await db.create_or_update_about(about)
+    print("✅ Updated about section")
+    for skill in content["skills"]:
+        await db.create_skill(skill)
+    print("✅ Updated skills with real data")
+    for project in content["projects"]:
+        await db.create_project(project)
+    print("✅ Updated projects with detailed descriptions")
+    for exp in content["experience"]:
+        await db.create_experience(exp)
+    print("✅ Updated experience with detailed real data")
+    for edu in content["education"]:
+        await db.create_education(edu)
+    print("✅ Updated education")
+    for cert in content["certifications"]:
+        await db.create_certification(cert)
+    print("✅ Updated certifications")
+
 if __name__ == "__main__":
-    asyncio.run(update_database_with_real_data())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Replace the portfolio content with the real resume data")
+    parser.add_argument("--mode", choices=["diff", "atomic", "in-place"], default="diff",
+                        help="diff: write only changed documents; atomic: load staging copies and swap them in; "
+                             "in-place: delete and re-insert documents in the live collections")
+    args = parser.parse_args()
+    asyncio.run(update_database_with_real_data(args.mode))
\ No newline at end of file
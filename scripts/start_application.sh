@@ -6,6 +6,9 @@ if ! systemctl is-active --quiet mongod; then
     sleep 3
 fi
 
+# Contact write-behind spill file lives here, outside the deploy directory cleanup.sh empties
+mkdir -p /var/lib/portfolio
+
 # Start portfolio backend service
 systemctl start portfolio-backend
 
@@ -25,6 +28,21 @@ for i in {1..30}; do
     sleep 2
 done
 
+# Export read endpoints as static files so Nginx serves them without uvicorn
+# (the site config must include /etc/nginx/snippets/portfolio_api_snapshot.conf)
+cd /var/www/portfolio/backend
+if python3 export_snapshot.py --out /var/www/portfolio/snapshot --nginx-conf /etc/nginx/snippets/portfolio_api_snapshot.conf; then
+    if nginx -t > /dev/null 2>&1; then
+        systemctl reload nginx
+        echo "API snapshot published"
+    else
+        echo "Warning: Nginx config test failed, API snapshot not activated"
+    fi
+else
+    echo "Warning: API snapshot export failed, reads will be served by the backend"
+fi
+cd - > /dev/null
+
 # Check if Nginx is serving frontend
 if curl -f http://localhost/ > /dev/null 2>&1; then
     echo "Frontend is accessible"
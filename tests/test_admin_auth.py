@@ -0,0 +1,60 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import Depends, FastAPI
+
+from admin_auth import AdminAuth
+
+
+def _get(auth: AdminAuth, headers: dict = None) -> httpx.Response:
+    app = FastAPI()
+
+    @app.get("/export", dependencies=[Depends(auth)])
+    async def export():
+        return {"ok": True}
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.get("/export", headers=headers or {})
+    return asyncio.run(run())
+
+
+def test_admin_routes_are_hidden_without_a_configured_key():
+    assert _get(AdminAuth(None), {"X-Admin-Key": "anything"}).status_code == 404
+
+
+@pytest.mark.parametrize("headers", [{}, {"X-Admin-Key": "wrong"}, {"X-Admin-Key": ""}])
+def test_missing_or_wrong_key_is_rejected(headers):
+    assert _get(AdminAuth("s3cret"), headers).status_code == 401
+
+
+def test_matching_key_is_accepted():
+    response = _get(AdminAuth("s3cret"), {"X-Admin-Key": "s3cret"})
+    assert response.status_code == 200
+    assert response.json() == {"ok": True}
+
+
+def test_from_env_treats_empty_key_as_unset(monkeypatch):
+    monkeypatch.setenv("ADMIN_API_KEY", "")
+    assert not AdminAuth.from_env().enabled
+    monkeypatch.setenv("ADMIN_API_KEY", "s3cret")
+    assert AdminAuth.from_env().enabled
+
+
+def test_every_admin_route_requires_the_key(monkeypatch):
+    import server
+    monkeypatch.setattr(server.require_admin, "api_key", "s3cret")
+    routes = [route for route in server.app.routes if getattr(route, "path", "").startswith("/api/admin")]
+    assert routes
+
+    async def run():
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return [
+                (route.path, (await client.request(method, route.path)).status_code)
+                for route in routes for method in route.methods
+            ]
+
+    # No lifespan: rejected requests must not reach the handlers or the database
+    assert all(status == 401 for _, status in asyncio.run(run()))
@@ -0,0 +1,208 @@
+import asyncio
+
+import pytest
+
+import cache as cache_module
+from cache import ContentCache, cached, invalidates, served_generation
+from database import DatabaseManager
+from models import ApiResponse
+from response_cache import ResponseCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cache_module.time, "monotonic", fake)
+    return fake
+
+
+class Store:
+    """DatabaseManager-shaped owner of a cached getter and an invalidating write"""
+
+    def __init__(self, cache: ContentCache):
+        self.cache = cache
+        self.db = DatabaseManager("memory://", "cache_test").db
+        self.value = "v1"
+        self.loads = 0
+
+    @cached("projects")
+    async def get_projects(self, category=None):
+        self.loads += 1
+        await asyncio.sleep(0)
+        return f"{self.value}:{category}"
+
+    @invalidates("projects")
+    async def update(self, value):
+        self.value = value
+
+
+def test_entries_expire_after_the_collection_ttl(clock):
+    async def run():
+        store = Store(ContentCache({"projects": 10}))
+        assert await store.get_projects() == "v1:None"
+        store.value = "v2"
+        clock.now += 9.9
+        assert await store.get_projects() == "v1:None"
+        clock.now += 0.2
+        assert await store.get_projects() == "v2:None"
+        return store
+
+    store = asyncio.run(run())
+    assert store.loads == 2
+    assert store.cache.stats()["hits"] == 1
+
+
+def test_zero_ttl_is_never_cached(clock):
+    async def run():
+        store = Store(ContentCache({"projects": 0}))
+        await store.get_projects()
+        await store.get_projects()
+        return store
+
+    store = asyncio.run(run())
+    assert store.loads == 2
+    assert store.cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    async def run():
+        store = Store(ContentCache({"projects": 60}, max_entries=2))
+        await store.get_projects("a")
+        await store.get_projects("b")
+        await store.get_projects("a")  # "b" is now least recently used
+        await store.get_projects("c")
+        loads = store.loads
+        await store.get_projects("a")
+        await store.get_projects("c")
+        assert store.loads == loads
+        await store.get_projects("b")
+        return store, loads
+
+    store, loads = asyncio.run(run())
+    assert loads == 3
+    assert store.loads == 4
+    assert store.cache.stats()["evictions"] == 2
+
+
+def test_concurrent_misses_share_one_load(clock):
+    async def run():
+        store = Store(ContentCache({"projects": 60}))
+        results = await asyncio.gather(*(store.get_projects("a") for _ in range(5)))
+        return store, results
+
+    store, results = asyncio.run(run())
+    assert results == ["v1:a"] * 5
+    assert store.loads == 1
+    assert store.cache.stats()["coalesced"] == 4
+
+
+def test_invalidating_write_drops_entries_and_bumps_generation(clock):
+    async def run():
+        store = Store(ContentCache({"projects": 60}))
+        await store.get_projects()
+        first = served_generation.get()
+        await store.update("v2")
+        value = await store.get_projects()
+        second = served_generation.get()
+        versions = await store.db.counters.find_one({"_id": cache_module.CONTENT_VERSIONS_ID})
+        return value, first, second, versions
+
+    value, first, second, versions = asyncio.run(run())
+    assert value == "v2:None"
+    assert second > first
+    assert versions["projects"] == 1
+
+
+def test_load_overlapping_a_write_is_not_cached(clock):
+    async def run():
+        store = Store(ContentCache({"projects": 60}))
+        loading = asyncio.ensure_future(store.get_projects())
+        while store.loads == 0:
+            await asyncio.sleep(0)
+        # The loader is suspended mid-read when the write lands
+        store.cache.invalidate("projects")
+        assert await loading == "v1:None"
+        return store, served_generation.get()
+
+    store, generation = asyncio.run(run())
+    assert generation is None
+    assert store.cache.stats()["entries"] == 0
+
+
+# Response cache
+def _response_cache(cache: ContentCache, store: Store) -> ResponseCache:
+    responses = ResponseCache(cache)
+
+    @responses.endpoint("projects")
+    async def get_projects(category=None):
+        return ApiResponse(success=True, data=await store.get_projects(category))
+
+    responses.get_projects = get_projects
+    return responses
+
+
+def test_response_bodies_are_reused_until_the_content_generation_changes(clock):
+    async def run():
+        content = ContentCache({"projects": 60})
+        store = Store(content)
+        responses = _response_cache(content, store)
+        first = await responses.get_projects(category="a")
+        again = await responses.get_projects(category="a")
+        await store.update("v2")
+        refreshed = await responses.get_projects(category="a")
+        return responses, first, again, refreshed
+
+    responses, first, again, refreshed = asyncio.run(run())
+    assert first.body == again.body
+    assert first.headers["etag"] == again.headers["etag"]
+    assert b"v2:a" in refreshed.body
+    assert refreshed.headers["etag"] != first.headers["etag"]
+    assert responses.stats()["hits"] == 1
+
+
+def test_response_bodies_expire_with_their_content_entry(clock):
+    async def run():
+        content = ContentCache({"projects": 10})
+        store = Store(content)
+        responses = _response_cache(content, store)
+        await responses.get_projects(category="a")
+        # Changed out of band; only the TTL can notice
+        store.value = "v2"
+        clock.now += 11
+        return await responses.get_projects(category="a"), responses
+
+    response, responses = asyncio.run(run())
+    assert b"v2:a" in response.body
+    assert responses.stats()["hits"] == 0
+
+
+def test_response_cache_keys_variants_separately_and_skips_failures(clock):
+    async def run():
+        content = ContentCache({"projects": 60})
+        store = Store(content)
+        responses = ResponseCache(content)
+
+        @responses.endpoint("projects")
+        async def get_projects(category=None):
+            if category == "broken":
+                return ApiResponse(success=False, error="Failed")
+            return ApiResponse(success=True, data=await store.get_projects(category))
+
+        a = await get_projects(category="a")
+        b = await get_projects(category="b")
+        await get_projects(category="broken")
+        await get_projects(category="broken")
+        return a, b, responses
+
+    a, b, responses = asyncio.run(run())
+    assert a.body != b.body
+    assert responses.stats()["entries"] == 2
+    assert responses.stats()["hits"] == 0
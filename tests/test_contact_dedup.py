@@ -0,0 +1,219 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+
+import contact_dedup
+from contact_dedup import ContactDeduplicator, IdempotencyConflict, contact_content_hash
+from database import DatabaseManager
+from models import ContactMessageCreate
+
+CREATED = datetime(2024, 5, 1, 12, 0)
+
+
+def _create(message: str = "Hi there", **fields) -> ContactMessageCreate:
+    return ContactMessageCreate(**{"name": "Visitor", "email": "v@example.com", "subject": "Hello",
+                                   "message": message, **fields})
+
+
+def _doc(created: datetime, message: str = "Hi there") -> dict:
+    create = _create(message)
+    return {"_id": ObjectId(), **create.dict(), "status": "new", "createdAt": created,
+            "contentHash": contact_content_hash(create)}
+
+
+async def _manager(window: float = 600) -> DatabaseManager:
+    manager = DatabaseManager("memory://", "dedup_test")
+    await manager.ensure_indexes()
+    manager.contact_dedup = ContactDeduplicator(window=window)
+    return manager
+
+
+# Content hashes
+def test_content_hash_ignores_case_and_whitespace():
+    assert contact_content_hash(_create("Hi  there\n")) == contact_content_hash(_create(" hi there", email="V@Example.com "))
+    assert contact_content_hash(_create("Hi there")) != contact_content_hash(_create("Hi there!"))
+    assert contact_content_hash(_create(name="Someone else")) == contact_content_hash(_create())
+
+
+# In-process deduplication
+def test_repeats_and_replays_share_the_first_submission():
+    async def run():
+        manager = await _manager()
+        first = await manager.create_contact_message(_create(), "key-1")
+        replay = await manager.create_contact_message(_create(), "key-1")
+        repeat = await manager.create_contact_message(_create("hi   THERE"))
+        return manager.contact_dedup, [first, replay, repeat], await manager.db.contact_messages.count_documents({})
+
+    dedup, messages, count = asyncio.run(run())
+    assert len({message.id for message in messages}) == 1
+    assert count == 1
+    assert (dedup.submitted, dedup.replays, dedup.duplicates) == (1, 1, 1)
+
+
+def test_concurrent_submissions_await_a_single_insert():
+    async def run():
+        manager = await _manager()
+        messages = await asyncio.gather(*(manager.create_contact_message(_create()) for _ in range(5)))
+        return messages, await manager.db.contact_messages.count_documents({})
+
+    messages, count = asyncio.run(run())
+    assert len({message.id for message in messages}) == 1
+    assert count == 1
+
+
+def test_idempotency_key_reused_for_a_different_body_is_refused():
+    async def run():
+        manager = await _manager()
+        first = await manager.create_contact_message(_create(), "key-1")
+        with pytest.raises(IdempotencyConflict):
+            await manager.create_contact_message(_create("Something else"), "key-1")
+        # The conflict stores nothing and leaves the key bound to the first message
+        replay = await manager.create_contact_message(_create(), "key-1")
+        return manager.contact_dedup, first, replay, await manager.db.contact_messages.count_documents({})
+
+    dedup, first, replay, count = asyncio.run(run())
+    assert replay.id == first.id
+    assert count == 1
+    assert dedup.conflicts == 1
+
+
+def test_entries_expire_after_the_window(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(contact_dedup.time, "monotonic", lambda: now[0])
+
+    async def run():
+        dedup = ContactDeduplicator(window=60, key_ttl=120)
+        calls = []
+
+        async def create():
+            calls.append(now[0])
+            return len(calls)
+
+        results = [await dedup.submit("hash", "key", create)]
+        now[0] += 90
+        # The content hash has expired, but the key still replays
+        results.append(await dedup.submit("hash", "key", create))
+        results.append(await dedup.submit("hash", None, create))
+        return results, dedup
+
+    results, dedup = asyncio.run(run())
+    assert results == [1, 1, 2]
+    assert dedup.stats()["trackedHashes"] == 1
+
+
+def test_failed_submissions_can_be_retried():
+    async def run():
+        dedup = ContactDeduplicator()
+        attempts = []
+
+        async def create():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise RuntimeError("database unavailable")
+            return "stored"
+
+        with pytest.raises(RuntimeError):
+            await dedup.submit("hash", "key", create)
+        return await dedup.submit("hash", "key", create), len(attempts)
+
+    assert asyncio.run(run()) == ("stored", 2)
+
+
+# The contentHash unique index
+def test_repeat_within_the_window_returns_the_stored_message():
+    async def run():
+        manager = await _manager(window=600)
+        existing = _doc(CREATED)
+        await manager.db.contact_messages.insert_one(existing)
+        stored = await manager.insert_contact_doc(_doc(CREATED + timedelta(minutes=5)))
+        return existing, stored, await manager.db.contact_messages.count_documents({})
+
+    existing, stored, count = asyncio.run(run())
+    assert stored["_id"] == existing["_id"]
+    assert count == 1
+
+
+def test_repeat_after_the_window_takes_over_the_hash():
+    async def run():
+        manager = await _manager(window=600)
+        existing = _doc(CREATED)
+        await manager.db.contact_messages.insert_one(existing)
+        doc = _doc(CREATED + timedelta(minutes=11))
+        stored = await manager.insert_contact_doc(doc)
+        old = await manager.db.contact_messages.find_one({"_id": existing["_id"]})
+        owner = await manager.db.contact_messages.find_one({"contentHash": doc["contentHash"]})
+        return doc, stored, old, owner, await manager.get_contact_counts()
+
+    doc, stored, old, owner, counts = asyncio.run(run())
+    assert stored["_id"] == doc["_id"]
+    assert "contentHash" not in old
+    assert owner["_id"] == doc["_id"]
+    assert counts["new"] == 2
+
+
+def test_without_a_deduplicator_only_simultaneous_repeats_collapse():
+    async def run():
+        manager = await _manager()
+        manager.contact_dedup = None
+        existing = _doc(CREATED)
+        await manager.db.contact_messages.insert_one(existing)
+        same_instant = await manager.insert_contact_doc(_doc(CREATED))
+        later = await manager.insert_contact_doc(_doc(CREATED + timedelta(seconds=1)))
+        return existing, same_instant, later
+
+    existing, same_instant, later = asyncio.run(run())
+    assert same_instant["_id"] == existing["_id"]
+    assert later["_id"] != existing["_id"]
+
+
+def test_insert_race_between_processes_falls_back_to_the_stored_message():
+    async def run():
+        # Two processes with their own dedup tables and one database
+        first, second = await _manager(), await _manager()
+        second.db = first.db
+        messages = await asyncio.gather(first.create_contact_message(_create()),
+                                        second.create_contact_message(_create()))
+        return messages, await first.db.contact_messages.count_documents({})
+
+    messages, count = asyncio.run(run())
+    assert messages[0].id == messages[1].id
+    assert count == 1
+
+
+def test_clash_with_a_message_deleted_meanwhile_retries_the_insert(monkeypatch):
+    async def run():
+        manager = await _manager()
+        collection = manager.db.contact_messages
+        insert_one = collection.insert_one
+        clashes = []
+
+        async def clash_once(doc):
+            # The clashing message is gone by the time it is looked up
+            if not clashes:
+                clashes.append(doc["_id"])
+                raise DuplicateKeyError("E11000 duplicate key error collection: contact_messages")
+            return await insert_one(doc)
+
+        monkeypatch.setattr(collection, "insert_one", clash_once)
+        doc = _doc(CREATED)
+        stored = await manager.insert_contact_doc(doc)
+        return doc, stored, clashes, await collection.count_documents({})
+
+    doc, stored, clashes, count = asyncio.run(run())
+    assert stored["_id"] == doc["_id"] == clashes[0]
+    assert count == 1
+
+
+def test_documents_without_a_hash_reraise_duplicate_keys():
+    async def run():
+        manager = await _manager()
+        doc = _doc(CREATED)
+        del doc["contentHash"]
+        await manager.db.contact_messages.insert_one(dict(doc))
+        with pytest.raises(DuplicateKeyError):
+            await manager.insert_contact_doc(doc)
+
+    asyncio.run(run())
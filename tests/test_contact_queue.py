@@ -0,0 +1,125 @@
+import asyncio
+from datetime import datetime
+
+from bson import ObjectId, json_util
+
+from contact_dedup import ContactDeduplicator, contact_content_hash
+from contact_queue import DEFAULT_SPILL_PATH, ContactWriteQueue
+from database import DatabaseManager
+from memory_mongo import MemoryMongoClient
+from models import ContactMessageCreate
+
+
+def _message(i: int) -> dict:
+    return {"_id": ObjectId(), "name": f"Visitor {i}", "email": f"v{i}@example.com", "subject": "Hello",
+            "message": f"Message {i}", "status": "new", "createdAt": datetime(2024, 5, 1, 12, i)}
+
+
+def test_default_spill_file_is_outside_the_deploy_directory(monkeypatch):
+    monkeypatch.setenv("CONTACT_WRITE_BEHIND", "true")
+    monkeypatch.delenv("CONTACT_SPILL_FILE", raising=False)
+    assert ContactWriteQueue.from_env().spill_path == DEFAULT_SPILL_PATH
+    assert "/var/www/portfolio" not in str(DEFAULT_SPILL_PATH)
+    monkeypatch.setenv("CONTACT_SPILL_FILE", "/tmp/spill.ndjson")
+    assert str(ContactWriteQueue.from_env().spill_path) == "/tmp/spill.ndjson"
+
+
+def test_start_replays_the_spill_file_left_by_a_crash(tmp_path):
+    spill = tmp_path / "state" / "contact_spill.ndjson"
+    spill.parent.mkdir()
+    docs = [_message(i) for i in range(5)]
+    # The last write was cut short by the crash and was never acknowledged
+    spill.write_bytes(b"".join(json_util.dumps(doc).encode() + b"\n" for doc in docs) + b'{"_id": {"$oid"')
+
+    async def run():
+        collection = MemoryMongoClient()["portfolio"]["contact_messages"]
+        # One message reached Mongo before the crash; replaying it must not fail or duplicate it
+        await collection.insert_one(dict(docs[0]))
+        queue = ContactWriteQueue(spill, batch_size=2)
+        await queue.start(collection)
+        stored = await collection.find({}).sort([("createdAt", 1)]).to_list(None)
+        await queue.stop()
+        return queue, stored
+
+    queue, stored = asyncio.run(run())
+    assert [doc["_id"] for doc in stored] == [doc["_id"] for doc in docs]
+    assert stored[1]["createdAt"] == docs[1]["createdAt"]
+    assert queue.recovered == 5
+    assert spill.read_bytes() == b""
+
+
+def test_unflushed_submissions_survive_a_restart(tmp_path):
+    spill = tmp_path / "contact_spill.ndjson"
+    docs = [_message(i) for i in range(3)]
+
+    async def run():
+        collection = MemoryMongoClient()["portfolio"]["contact_messages"]
+        crashed = ContactWriteQueue(spill, flush_interval=60)
+        await crashed.start(collection)
+        assert all(crashed.submit(dict(doc)) for doc in docs)
+        # Simulate a crash: the flusher never runs again
+        crashed._flusher.cancel()
+        assert await collection.count_documents({}) == 0
+
+        restarted = ContactWriteQueue(spill)
+        await restarted.start(collection)
+        count = await collection.count_documents({})
+        await restarted.stop()
+        return count
+
+    assert asyncio.run(run()) == 3
+
+
+# Write-behind with deduplication
+def _create(i: int = 0):
+    return ContactMessageCreate(name="Visitor", email="v@example.com", subject="Hello", message=f"Hi there {i}")
+
+
+async def _manager_with_queue(spill):
+    manager = DatabaseManager("memory://", "portfolio")
+    await manager.ensure_indexes()
+    manager.contact_dedup = ContactDeduplicator()
+    queue = ContactWriteQueue(spill, flush_interval=60)
+    queue.on_duplicate = manager.insert_queued_contact_doc
+    queue.on_inserted = manager.count_new_contact_messages
+    await queue.start(manager.db.contact_messages)
+    manager.contact_writes = queue
+    return manager, queue
+
+
+def test_repeat_of_a_stored_message_returns_its_id_without_queueing(tmp_path):
+    async def run():
+        manager, queue = await _manager_with_queue(tmp_path / "spill.ndjson")
+        # Stored by another process, so this process's in-memory dedup table hasn't seen it
+        existing_id = ObjectId()
+        await manager.db.contact_messages.insert_one({
+            "_id": existing_id, **_create().dict(), "status": "new", "createdAt": datetime.utcnow(),
+            "contentHash": contact_content_hash(_create()),
+        })
+        message = await manager.create_contact_message(_create())
+        await queue.stop()
+        return existing_id, message, queue, await manager.db.contact_messages.count_documents({})
+
+    existing_id, message, queue, count = asyncio.run(run())
+    assert message.id == str(existing_id)
+    assert queue.enqueued == 0
+    assert count == 1
+
+
+def test_clash_found_at_flush_time_still_stores_the_returned_id(tmp_path):
+    async def run():
+        manager, queue = await _manager_with_queue(tmp_path / "spill.ndjson")
+        message = await manager.create_contact_message(_create())
+        assert queue.enqueued == 1
+        # Another process stores the same content before this batch is flushed
+        await manager.db.contact_messages.insert_one({
+            "_id": ObjectId(), **_create().dict(), "status": "new", "createdAt": datetime.utcnow(),
+            "contentHash": contact_content_hash(_create()),
+        })
+        await queue.stop()
+        return message, await manager.db.contact_messages.find_one({"_id": ObjectId(message.id)})
+
+    message, stored = asyncio.run(run())
+    assert stored is not None
+    assert stored["message"] == message.message
+    assert "contentHash" not in stored
@@ -0,0 +1,125 @@
+import json
+import textwrap
+
+import pytest
+
+import content_loader
+from content_loader import ContentError, iter_json_records, iter_yaml_records
+
+
+# YAML (PyYAML is optional, as it is for the loader)
+def _records(tmp_path, text: str) -> list:
+    pytest.importorskip("yaml")
+    path = tmp_path / "projects.yaml"
+    path.write_text(textwrap.dedent(text))
+    return list(iter_yaml_records(path))
+
+
+def test_top_level_list_yields_each_item_with_its_line(tmp_path):
+    records = _records(tmp_path, """\
+        # Projects
+        - title: One
+          featured: true
+        - title: Two
+          technologies: [Python, Go]
+        """)
+    assert records == [(2, {"title": "One", "featured": True}), (4, {"title": "Two", "technologies": ["Python", "Go"]})]
+
+
+def test_single_mapping_and_multiple_documents(tmp_path):
+    assert _records(tmp_path, "title: Only\n") == [(1, {"title": "Only"})]
+    assert _records(tmp_path, "---\ntitle: A\n---\ntitle: B\n...\n") == [(2, {"title": "A"}), (4, {"title": "B"})]
+    assert _records(tmp_path, "- a: 1\n---\n- a: 2\n- a: 3\n") == [(1, {"a": 1}), (3, {"a": 2}), (4, {"a": 3})]
+
+
+def test_empty_file_has_no_records(tmp_path):
+    assert _records(tmp_path, "") == []
+    assert _records(tmp_path, "# nothing here\n") == []
+
+
+def test_anchors_carry_across_items_within_a_document(tmp_path):
+    text = """\
+        - &base
+          category: Web
+          featured: false
+        - <<: *base
+          title: Two
+        - tags: &tags [a, b]
+        - tags: *tags
+        """
+    records = _records(tmp_path, text)
+    yaml = pytest.importorskip("yaml")
+    assert [record for _, record in records] == yaml.safe_load(textwrap.dedent(text))
+
+
+def test_items_are_yielded_before_the_rest_of_the_file_is_parsed(tmp_path):
+    pytest.importorskip("yaml")
+    path = tmp_path / "projects.yaml"
+    path.write_text("- title: First\n" + "- title: Filler\n" * 5000 + "- title: [unclosed\n")
+    records = iter_yaml_records(path)
+    assert next(records) == (1, {"title": "First"})
+    with pytest.raises(ContentError) as error:
+        list(records)
+    assert error.value.line == 5003
+
+
+def test_syntax_errors_report_their_line(tmp_path):
+    with pytest.raises(ContentError) as error:
+        _records(tmp_path, "- title: One\n- title: Two\n  bad: [\n")
+    assert error.value.line >= 3
+
+
+# JSON
+RECORDS = [
+    {"title": "Caf\u00e9 \"quoted\" \\ path", "emoji": "\U0001F600", "featured": True, "archived": False},
+    {"stars": 125, "ratio": 2.5e3, "delta": -0.75, "image": None, "tags": ["a", "b"]},
+    {"nested": {"deep": [1, {"x": "y"}]}, "empty": {}, "none": []},
+]
+
+
+def test_records_survive_every_chunk_boundary(tmp_path):
+    path = tmp_path / "projects.json"
+    path.write_text(json.dumps(RECORDS, indent=2, ensure_ascii=True))
+    for chunk_size in range(1, 48):
+        assert [record for _, record in iter_json_records(path, chunk_size)] == RECORDS
+
+
+def test_records_carry_their_line(tmp_path):
+    path = tmp_path / "projects.json"
+    path.write_text('[\n  {"title": "One"},\n\n  {"title": "Two"}\n]\n')
+    assert list(iter_json_records(path, chunk_size=4)) == [(2, {"title": "One"}), (4, {"title": "Two"})]
+
+
+@pytest.mark.parametrize("text, line", [
+    ('[\n  {"title": "One",, "x": 1}\n]', 2),
+    ('[\n  {"title": "One"},\n  {"title": tru}\n]', 3),
+    ('[\n  {"title": "One\n"}\n]', 2),
+    ('[\n  {"title": "\\uzzzz and more"}\n]', 2),
+    ('[\n  {"title": "One"}\n  {"title": "Two"}\n]', 3),
+    ('[\n  {"title": "One"', 2),
+])
+def test_syntax_errors_report_their_line_at_any_chunk_size(tmp_path, text, line):
+    path = tmp_path / "projects.json"
+    path.write_text(text)
+    for chunk_size in (1, 3, 64):
+        with pytest.raises(ContentError) as error:
+            list(iter_json_records(path, chunk_size))
+        assert error.value.line == line
+
+
+def test_syntax_errors_stop_reading_the_file(tmp_path, monkeypatch):
+    path = tmp_path / "projects.json"
+    path.write_text('[\n  {"title": "One", "oops" 1},\n' + '  {"title": "Filler"},\n' * 20000 + '  {}\n]\n')
+    reads = []
+
+    def counting_open(*args, **kwargs):
+        fh = open(*args, **kwargs)
+        read = fh.read
+        fh.read = lambda size: reads.append(size) or read(size)
+        return fh
+
+    monkeypatch.setattr(content_loader, "open", counting_open, raising=False)
+    with pytest.raises(ContentError) as error:
+        list(iter_json_records(path, chunk_size=1024))
+    assert error.value.line == 2
+    assert len(reads) == 1
@@ -0,0 +1,155 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+import models
+from database import DatabaseManager
+from migrate_dates import has_frozen_duration, missing_derived_values
+from models import (Certification, Education, Experience, ExperienceCreate, format_duration, is_current_date,
+                    parse_month_year, with_normalized_dates)
+from reseed import seed_document
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("August 2020", datetime(2020, 8, 1)),
+    ("Aug 2020", datetime(2020, 8, 1)),
+    ("aug. 2020", datetime(2020, 8, 1)),
+    ("Sept 2019", datetime(2019, 9, 1)),
+    ("September, 2019", datetime(2019, 9, 1)),
+    ("  March 2021  ", datetime(2021, 3, 1)),
+    ("2020-08", datetime(2020, 8, 1)),
+    ("2020-08-17", datetime(2020, 8, 1)),
+    ("08/2020", datetime(2020, 8, 1)),
+])
+def test_month_year_dates_parse_to_the_first_of_the_month(value, expected):
+    assert parse_month_year(value) == expected
+
+
+@pytest.mark.parametrize("value, expected", [("2016", datetime(2016, 1, 1)), (" 2024 ", datetime(2024, 1, 1))])
+def test_bare_years_parse_to_january(value, expected):
+    assert parse_month_year(value) == expected
+
+
+@pytest.mark.parametrize("value", ["Current", "present", " NOW ", "Ongoing"])
+def test_current_markers_are_current_and_unparsed(value):
+    assert is_current_date(value)
+    assert parse_month_year(value) is None
+
+
+@pytest.mark.parametrize("value", [None, "", "Smarch 2020", "2020-13", "13/2020", "20201", "Summer"])
+def test_unparseable_dates_are_none(value):
+    assert parse_month_year(value) is None
+    assert not is_current_date(value)
+
+
+def test_format_duration():
+    assert format_duration(datetime(2020, 8, 1), datetime(2022, 11, 1)) == "2 years 3 months"
+    assert format_duration(datetime(2020, 8, 1), datetime(2021, 8, 1)) == "1 year"
+    # Same month still counts as one
+    assert format_duration(datetime(2020, 8, 1), datetime(2020, 8, 1)) == "1 month"
+
+
+def _experience(**overrides) -> dict:
+    data = {"company": "Acme", "position": "Engineer", "location": "Pune", "startDate": "Aug 2020",
+            "endDate": "Current", "description": "Work", "achievements": [], "technologies": []}
+    data.update(overrides)
+    return data
+
+
+def test_validators_leave_the_callers_dict_untouched():
+    for model, data in [
+        (Experience, _experience()),
+        (Experience, _experience(startedAt=datetime(2020, 8, 1), endedAt=None)),
+        (Education, {"institution": "Uni", "degree": "BSc", "location": "Pune", "startDate": "2016",
+                     "endDate": "2020", "description": "d", "relevantCourses": []}),
+        (Certification, {"name": "Cert", "issuer": "Org", "issueDate": "Jan 2023", "expiryDate": "Jan 2026",
+                         "credentialId": "1", "description": "d", "badgeUrl": "x"}),
+    ]:
+        before = dict(data)
+        model(**data)
+        model.model_validate(data)
+        assert data == before
+
+
+def test_with_normalized_dates_returns_a_copy():
+    data = {"startDate": "2016", "endDate": "2020", "startedAt": None, "endedAt": None}
+    assert with_normalized_dates(data, "startDate", "endDate", "startedAt", "endedAt") is not data
+
+
+def test_experience_derives_current_and_duration():
+    current = Experience(**_experience())
+    assert current.current is True
+    assert current.startedAt == datetime(2020, 8, 1) and current.endedAt is None
+    finished = Experience(**_experience(endDate="November 2022"))
+    assert finished.current is False
+    assert finished.duration == "2 years 3 months"
+    assert Experience(**_experience(duration="About two years")).duration == "About two years"
+
+
+def test_migration_fills_every_missing_derived_field():
+    fields = ("startedAt", "endedAt", "current", "duration")
+    doc = {"_id": "x", **_experience(endDate="November 2022"), "duration": None}
+    assert missing_derived_values(Experience, fields, doc) == {
+        "startedAt": datetime(2020, 8, 1),
+        "endedAt": datetime(2022, 11, 1),
+        "current": False,
+        "duration": "2 years 3 months",
+    }
+    # Stored values are kept, only the gaps are filled
+    doc = {"_id": "x", **_experience(endDate="November 2022"), "startedAt": datetime(2020, 8, 1),
+           "endedAt": datetime(2022, 11, 1), "duration": "Two years"}
+    assert missing_derived_values(Experience, fields, doc) == {"current": False}
+
+
+def test_migration_leaves_a_current_roles_duration_to_reads():
+    fields = ("startedAt", "endedAt", "current", "duration")
+    assert missing_derived_values(Experience, fields, {"_id": "x", **_experience()}) == {
+        "startedAt": datetime(2020, 8, 1), "endedAt": None, "current": True,
+    }
+
+
+def test_frozen_durations_are_told_apart_from_entered_ones():
+    doc = {"current": True, "startedAt": datetime(2020, 8, 1), "createdAt": datetime(2022, 2, 10)}
+    assert has_frozen_duration({**doc, "duration": "1 year 6 months"})
+    assert not has_frozen_duration({**doc, "duration": "About two years"})
+    assert not has_frozen_duration({**doc, "duration": "1 year 6 months", "current": False})
+    assert not has_frozen_duration({**doc, "duration": None})
+
+
+class _Today(datetime):
+    """datetime whose utcnow() is settable, for the date derivation in models"""
+    now = datetime(2024, 1, 15)
+
+    @classmethod
+    def utcnow(cls):
+        return cls.now
+
+
+def test_current_role_duration_is_derived_on_every_read(monkeypatch):
+    monkeypatch.setattr(models, "datetime", _Today)
+    payload = ExperienceCreate(**_experience())
+
+    async def run():
+        manager = DatabaseManager("memory://", "dates_test")
+        _Today.now = datetime(2021, 8, 20)
+        created = await manager.create_experience(payload)
+        stored = await manager.db.experience.find_one({})
+        # Read back much later: the duration has kept growing
+        _Today.now = datetime(2024, 2, 3)
+        read = (await manager.get_experience())[0]
+        return created, stored, read
+
+    created, stored, read = asyncio.run(run())
+    assert created.duration == "1 year"
+    assert stored["duration"] is None and stored["current"] is True
+    assert read.duration == "3 years 6 months"
+
+
+def test_seeded_current_roles_store_no_duration():
+    current = seed_document("experience", ExperienceCreate(**_experience()))
+    assert current["current"] is True and current["duration"] is None
+    given = seed_document("experience", ExperienceCreate(**_experience(duration="About four years")))
+    assert given["duration"] == "About four years"
+    finished = seed_document("experience", ExperienceCreate(**_experience(endDate="November 2022")))
+    assert finished["duration"] == "2 years 3 months"
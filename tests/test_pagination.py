@@ -0,0 +1,270 @@
+import asyncio
+import base64
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+import database
+from database import DatabaseManager
+from models import CONTACT_STATUSES, ContactMessage, ContactMessageCreate, Experience
+from pagination import (InvalidCursor, decode_cursor, decode_offset_cursor, encode_cursor,
+                        encode_offset_cursor, keyset_filter, keyset_sort)
+
+SORT = [("startedAt", -1), ("_id", -1)]
+
+
+def _b64(raw: str) -> str:
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+# Cursor encoding
+def test_cursor_round_trips_datetimes_and_object_ids():
+    doc = {"_id": ObjectId(), "startedAt": datetime(2021, 3, 1, 12, 30)}
+    cursor = encode_cursor("experience", SORT, doc)
+    assert "=" not in cursor
+    assert decode_cursor("experience", SORT, cursor) == [doc["startedAt"], doc["_id"]]
+
+
+def test_cursor_keeps_missing_sort_keys_as_none():
+    doc = {"_id": ObjectId()}
+    assert decode_cursor("experience", SORT, encode_cursor("experience", SORT, doc)) == [None, doc["_id"]]
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    "%%%",
+    _b64("not json"),
+    _b64("[1, 2]"),
+    _b64('{"c": "experience"}'),
+    _b64('{"c": "experience", "k": [1]}'),
+    _b64('{"c": "experience", "k": [1, 2, 3]}'),
+    _b64('{"c": "projects", "k": [1, 2]}'),
+    base64.urlsafe_b64encode(b"\xff\xfe").decode("ascii"),
+])
+def test_invalid_cursors_are_rejected(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor("experience", SORT, cursor)
+
+
+def test_tampered_cursor_is_rejected():
+    cursor = encode_cursor("experience", SORT, {"_id": ObjectId(), "startedAt": datetime(2021, 3, 1)})
+    raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+    with pytest.raises(InvalidCursor):
+        decode_cursor("experience", SORT, _b64(raw.replace('"experience"', '"certifications"')))
+    with pytest.raises(InvalidCursor):
+        decode_cursor("experience", SORT, cursor[:-6])
+
+
+def test_offset_cursor_round_trips():
+    assert decode_offset_cursor("contact_messages:search", encode_offset_cursor("contact_messages:search", 40)) == 40
+
+
+@pytest.mark.parametrize("payload", [
+    {"c": "contact_messages:search", "o": -1},
+    {"c": "contact_messages:search", "o": True},
+    {"c": "contact_messages:search", "o": "10"},
+    {"c": "contact_messages", "o": 10},
+])
+def test_invalid_offset_cursors_are_rejected(payload):
+    with pytest.raises(InvalidCursor):
+        decode_offset_cursor("contact_messages:search", _b64(json.dumps(payload)))
+
+
+# Keyset filters
+def test_keyset_sort_appends_id_in_last_direction():
+    assert keyset_sort([("startedAt", -1)]) == SORT
+    assert keyset_sort([]) == [("_id", 1)]
+
+
+def test_keyset_filter_breaks_ties_on_id():
+    started, _id = datetime(2021, 3, 1), ObjectId()
+    assert keyset_filter(SORT, [started, _id]) == {"$or": [
+        {"startedAt": {"$lt": started}},
+        {"startedAt": started, "_id": {"$lt": _id}},
+    ]}
+    assert keyset_filter([("_id", 1)], [_id]) == {"_id": {"$gt": _id}}
+
+
+# Paging through the database
+def _experience(company: str, start: str) -> dict:
+    return Experience(
+        company=company, position="Engineer", location="Pune", startDate=start, endDate="Present",
+        description="Work", achievements=[], technologies=[]
+    ).dict()
+
+
+async def _all_pages(manager: DatabaseManager, collection: str, limit: int) -> list:
+    items, cursor = await manager.get_page(collection, limit=limit)
+    pages = [items]
+    while cursor:
+        items, cursor = await manager.get_page(collection, limit=limit, cursor=cursor)
+        pages.append(items)
+    return pages
+
+
+def test_pages_with_tied_start_dates_return_every_document_once():
+    async def run():
+        manager = DatabaseManager("memory://", "pagination_test")
+        # Five entries share a start month, so only _id orders them
+        docs = [_experience(f"Company {i}", "March 2021") for i in range(5)]
+        docs += [_experience("Earlier", "January 2019"), _experience("Later", "June 2023")]
+        await manager.db.experience.insert_many(docs)
+        pages = await _all_pages(manager, "experience", limit=2)
+        stored = await manager.db.experience.find({}).sort(SORT).to_list(None)
+        return pages, stored
+
+    pages, stored = asyncio.run(run())
+    assert [len(page) for page in pages] == [2, 2, 2, 1]
+    assert [item.id for page in pages for item in page] == [str(doc["_id"]) for doc in stored]
+    assert [item.company for item in pages[0]][0] == "Later"
+    assert pages[-1][0].company == "Earlier"
+
+
+def test_admin_messages_order_matches_with_and_without_limit():
+    async def run():
+        manager = DatabaseManager("memory://", "pagination_test")
+        created = datetime(2024, 5, 1)
+        await manager.db.contact_messages.insert_many([
+            {**ContactMessage(name=f"V{i}", email="v@example.com", subject="Hi", message="Hello there").dict(),
+             "createdAt": created}
+            for i in range(6)
+        ])
+        unpaged, _ = await manager.get_contact_messages()
+        paged = [item for page in await _all_pages(manager, "contact_messages", limit=4) for item in page]
+        return unpaged, paged
+
+    unpaged, paged = asyncio.run(run())
+    assert [item.id for item in unpaged] == [item.id for item in paged]
+
+
+def test_unpaginated_projects_follow_the_keyset_order():
+    async def run():
+        manager = DatabaseManager("memory://", "pagination_test")
+        ids = [ObjectId() for _ in range(4)]
+        await manager.db.projects.insert_many([
+            {"_id": _id, "title": f"P{i}", "description": "d", "longDescription": "d", "technologies": [],
+             "category": "Web", "featured": False, "imageUrl": "x", "keyFeatures": []}
+            for i, _id in zip(range(4), reversed(ids))
+        ])
+        unpaged = await manager.get_projects("Web")
+        paged = [item for page in await _all_pages(manager, "projects", limit=3) for item in page]
+        return unpaged, paged
+
+    unpaged, paged = asyncio.run(run())
+    assert [item.id for item in unpaged] == [item.id for item in paged]
+
+
+def test_unpaginated_reads_are_capped(monkeypatch):
+    monkeypatch.setattr(database, "UNPAGINATED_READ_LIMIT", 3)
+
+    async def run():
+        manager = DatabaseManager("memory://", "pagination_test")
+        await manager.db.experience.insert_many([_experience(f"Company {i}", f"March 20{10 + i}") for i in range(5)])
+        unpaged = await manager.get_experience()
+        paged = [item for page in await _all_pages(manager, "experience", limit=2) for item in page]
+        return unpaged, paged
+
+    unpaged, paged = asyncio.run(run())
+    assert [item.company for item in unpaged] == ["Company 4", "Company 3", "Company 2"]
+    assert len(paged) == 5
+
+
+# Contact search and status counters
+def _contact(name: str, subject: str, message: str, minute: int) -> dict:
+    return {**ContactMessage(name=name, email=f"{name.lower()}@example.com", subject=subject, message=message).dict(),
+            "createdAt": datetime(2024, 5, 1, 12, minute)}
+
+
+def _statuses(counts: dict) -> dict:
+    return {status: counts[status] for status in CONTACT_STATUSES}
+
+
+def test_search_pages_follow_relevance_then_recency():
+    async def run():
+        manager = DatabaseManager("memory://", "pagination_test")
+        await manager.ensure_indexes()
+        await manager.db.contact_messages.insert_many([
+            _contact("Ana", "Hello", "A project idea", 1),
+            _contact("Ben", "Project", "Let's talk", 2),
+            _contact("Cy", "Hello", "Project after project", 3),
+            _contact("Dee", "Hello", "Nothing relevant", 4),
+            _contact("Eve", "Hello", "Another project", 5),
+            _contact("Fay", "Hello", "One more project", 6),
+        ])
+        unpaged, cursor = await manager.get_contact_messages(limit=100, search="project")
+        assert cursor is None
+        pages = []
+        while True:
+            items, cursor = await manager.get_contact_messages(limit=2, cursor=cursor, search="project")
+            pages.append([item.name for item in items])
+            if cursor is None:
+                return [item.name for item in unpaged], pages
+
+    unpaged, pages = asyncio.run(run())
+    # Subject matches weigh most; equal scores fall back to newest first
+    assert unpaged == ["Ben", "Cy", "Fay", "Eve", "Ana"]
+    assert pages == [["Ben", "Cy"], ["Fay", "Eve"], ["Ana"]]
+
+
+def test_search_combines_with_status_filters():
+    async def run():
+        manager = DatabaseManager("memory://", "pagination_test")
+        await manager.ensure_indexes()
+        await manager.db.contact_messages.insert_many([
+            {**_contact("Ana", "Project", "Hi", 1), "status": "read"},
+            _contact("Ben", "Project", "Hi", 2),
+        ])
+        items, _ = await manager.get_contact_messages(search="project", status="read")
+        return [item.name for item in items]
+
+    assert asyncio.run(run()) == ["Ana"]
+
+
+def test_status_counters_follow_every_transition():
+    async def run():
+        manager = DatabaseManager("memory://", "pagination_test")
+        await manager.get_contact_counts()
+        for i in range(5):
+            await manager.create_contact_message(ContactMessageCreate(
+                name=f"V{i}", email="v@example.com", subject="Hi", message=f"Hello {i}"))
+        ids = [doc["_id"] for doc in await manager.db.contact_messages.find({}).sort([("name", 1)]).to_list(None)]
+
+        steps = [
+            (("read", ids[:2]), {}, {"new": 2, "replied": 0}),
+            (("replied", ids[:1]), {"from_status": "read"}, {"read": 1}),
+            # Only ids[2] is still new; ids[0] has moved on
+            (("read", [ids[0], ids[2]]), {"from_status": "new"}, {"new": 1}),
+            # Already read: nothing moves and the counters stay put
+            (("read", ids[1:2]), {}, {"new": 0, "replied": 0}),
+            (("replied", None), {"until": datetime.utcnow() + timedelta(minutes=1)}, {"new": 2, "read": 2}),
+            (("new", ids[3:]), {}, {"read": 0, "replied": 2}),
+        ]
+        history = []
+        for (status, selected), options, expected in steps:
+            moved = await manager.set_contact_status(status, selected, **options)
+            counts = await manager.get_contact_counts()
+            recounted = await manager.get_contact_counts(rebuild=True)
+            history.append((moved, expected, _statuses(counts), _statuses(recounted)))
+        return history
+
+    history = asyncio.run(run())
+    for moved, expected, counts, recounted in history:
+        assert moved == expected
+        assert counts == recounted
+    assert history[-1][2] == {"new": 2, "read": 0, "replied": 3}
+
+
+def test_concurrent_status_changes_count_each_message_once():
+    async def run():
+        manager = DatabaseManager("memory://", "pagination_test")
+        await manager.db.contact_messages.insert_many([_contact(f"V{i}", "Hi", "Hello", i) for i in range(3)])
+        await manager.get_contact_counts()
+        ids = [doc["_id"] for doc in await manager.db.contact_messages.find({}).to_list(None)]
+        moves = await asyncio.gather(*(manager.set_contact_status("read", ids) for _ in range(3)))
+        return moves, _statuses(await manager.get_contact_counts())
+
+    moves, counts = asyncio.run(run())
+    assert sum(move["new"] for move in moves) == 3
+    assert counts == {"new": 0, "read": 3, "replied": 0}
@@ -0,0 +1,148 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+import rate_limit
+from rate_limit import RateLimitMiddleware, TokenBucketLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", fake)
+    return fake
+
+
+def _limiter(client_per_min: float = 6, client_burst: float = 2,
+             global_per_min: float = 600, global_burst: float = 100, **kwargs) -> TokenBucketLimiter:
+    return TokenBucketLimiter(client_per_min / 60, client_burst, global_per_min / 60, global_burst, **kwargs)
+
+
+def _post(limiter: TokenBucketLimiter, *clients: str, path: str = "/contact") -> list:
+    """POST once per entry in `clients`, each from that peer address"""
+    app = FastAPI()
+
+    @app.post("/contact")
+    async def contact():
+        return {"ok": True}
+
+    @app.post("/other")
+    async def other():
+        return {"ok": True}
+
+    app.add_middleware(RateLimitMiddleware, limiter=limiter, routes=[("POST", "/contact")])
+
+    async def run():
+        responses = []
+        for host in clients:
+            transport = httpx.ASGITransport(app=app, client=(host, 4000))
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                responses.append(await client.post(path))
+        return responses
+    return asyncio.run(run())
+
+
+# Token buckets
+def test_burst_is_exhausted_then_refused(clock):
+    limiter = _limiter(client_burst=3)
+    assert [limiter.acquire("a") for _ in range(3)] == [None, None, None]
+    assert limiter.acquire("a") == pytest.approx(10.0)
+    assert (limiter.allowed, limiter.rejected_client) == (3, 1)
+
+
+def test_tokens_refill_over_time(clock):
+    limiter = _limiter()
+    limiter.acquire("a"), limiter.acquire("a")
+    clock.now += 4
+    assert limiter.acquire("a") == pytest.approx(6.0)
+    clock.now += 6
+    assert limiter.acquire("a") is None
+    assert limiter.acquire("a") == pytest.approx(10.0)
+
+
+def test_refill_stops_at_the_burst_size(clock):
+    limiter = _limiter()
+    limiter.acquire("a")
+    clock.now += 3600
+    assert [limiter.acquire("a") for _ in range(3)][-1] == pytest.approx(10.0)
+
+
+def test_clients_have_separate_buckets(clock):
+    limiter = _limiter()
+    limiter.acquire("a"), limiter.acquire("a")
+    assert limiter.acquire("a") is not None
+    assert [limiter.acquire("b"), limiter.acquire("b")] == [None, None]
+    assert limiter.acquire("b") is not None
+
+
+def test_global_bucket_limits_all_clients_together(clock):
+    limiter = _limiter(global_per_min=60, global_burst=3)
+    assert [limiter.acquire(client) for client in "abc"] == [None, None, None]
+    assert limiter.acquire("d") == pytest.approx(1.0)
+    assert (limiter.rejected_client, limiter.rejected_global) == (0, 1)
+
+
+def test_sweep_drops_full_buckets_and_least_recent_clients(clock):
+    limiter = _limiter(max_clients=2)
+    limiter.acquire("a")
+    clock.now += 30
+    limiter.acquire("b"), limiter.acquire("c")
+    limiter.sweep()
+    assert list(limiter._clients) == ["b", "c"]
+    clock.now += 20
+    limiter.sweep()
+    assert list(limiter._clients) == []
+    assert limiter.stats()["expiredClients"] == 3
+
+
+# Middleware
+def test_middleware_answers_429_once_the_burst_is_spent(clock):
+    responses = _post(_limiter(), "10.0.0.1", "10.0.0.1", "10.0.0.1")
+    assert [response.status_code for response in responses] == [200, 200, 429]
+    assert responses[2].json() == {"success": False, "data": None, "message": None,
+                                   "error": "Too many messages. Please try again later."}
+    assert "retry-after" not in responses[0].headers
+
+
+def test_retry_after_is_rounded_up_to_whole_seconds(clock):
+    limiter = _limiter()
+    _post(limiter, "10.0.0.1", "10.0.0.1")
+    clock.now += 2.5
+    response, = _post(limiter, "10.0.0.1")
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "8"
+
+
+def test_retry_after_is_at_least_one_second(clock):
+    limiter = _limiter()
+    _post(limiter, "10.0.0.1", "10.0.0.1")
+    clock.now += 9.9
+    assert _post(limiter, "10.0.0.1")[0].headers["retry-after"] == "1"
+
+
+def test_middleware_limits_each_peer_address_separately(clock):
+    responses = _post(_limiter(client_burst=1), "10.0.0.1", "10.0.0.2", "10.0.0.1", "10.0.0.2", "10.0.0.3")
+    assert [response.status_code for response in responses] == [200, 200, 429, 429, 200]
+
+
+def test_other_routes_are_not_limited(clock):
+    responses = _post(_limiter(client_burst=1), "10.0.0.1", "10.0.0.1", path="/other")
+    assert [response.status_code for response in responses] == [200, 200]
+
+
+def test_from_env_can_disable_the_limiter(monkeypatch):
+    monkeypatch.setenv("CONTACT_RATE_LIMIT_ENABLED", "false")
+    assert TokenBucketLimiter.from_env() is None
+    monkeypatch.setenv("CONTACT_RATE_LIMIT_ENABLED", "true")
+    monkeypatch.setenv("CONTACT_RATE_PER_IP_PER_MIN", "30")
+    assert TokenBucketLimiter.from_env().stats()["limits"]["perClientPerMinute"] == 30
@@ -0,0 +1,71 @@
+import asyncio
+
+from cache import CONTENT_VERSIONS_ID, ContentCache, ContentVersionWatcher
+from content_loader import load_content
+from database import DatabaseManager
+from models import *
+from reseed import atomic_reseed, diff_seed
+
+
+def _skills(*categories: str) -> list:
+    return [SkillsCreate(category=category, items=[SkillItem(name=category, proficiency=80, years=2)])
+            for category in categories]
+
+
+async def _versions(db) -> dict:
+    return await db.counters.find_one({"_id": CONTENT_VERSIONS_ID}) or {}
+
+
+def _seeded_server():
+    """A server-side manager with a content cache and version watcher over the same database"""
+    manager = DatabaseManager("memory://", "reseed_test", cache=ContentCache())
+    watcher = ContentVersionWatcher(manager.cache, interval=60)
+    return manager, watcher
+
+
+def test_atomic_reseed_invalidates_running_servers():
+    async def run():
+        manager, watcher = _seeded_server()
+        await manager.db.skills.insert_many([skill.dict() for skill in _skills("Python")])
+        await watcher.check(manager.db)
+        before = [skill.category for skill in await manager.get_skills()]
+        await atomic_reseed(manager.db, {"skills": _skills("Go", "Rust")})
+        await watcher.check(manager.db)
+        after = [skill.category for skill in await manager.get_skills()]
+        return before, after, await _versions(manager.db)
+
+    before, after, versions = asyncio.run(run())
+    assert before == ["Python"]
+    assert sorted(after) == ["Go", "Rust"]
+    assert versions["skills"] == 1
+
+
+def test_diff_seed_bumps_only_changed_collections():
+    async def run():
+        manager, watcher = _seeded_server()
+        await diff_seed(manager.db, {"skills": _skills("Python")})
+        first = await _versions(manager.db)
+        await watcher.check(manager.db)
+        assert [skill.category for skill in await manager.get_skills()] == ["Python"]
+        # Unchanged content writes nothing and leaves the version alone
+        await diff_seed(manager.db, {"skills": _skills("Python")})
+        unchanged = await _versions(manager.db)
+        await diff_seed(manager.db, {"skills": _skills("Python", "Go")})
+        await watcher.check(manager.db)
+        return first, unchanged, [skill.category for skill in await manager.get_skills()], await _versions(manager.db)
+
+    first, unchanged, names, versions = asyncio.run(run())
+    assert first["skills"] == unchanged["skills"] == 1
+    assert versions["skills"] == 2
+    assert sorted(names) == ["Go", "Python"]
+
+
+def test_content_loader_bumps_versions(tmp_path):
+    (tmp_path / "skills.json").write_text('[{"category": "Backend", "items": [{"name": "Python", "proficiency": 90, "years": 5}]}]')
+
+    async def run():
+        manager, _ = _seeded_server()
+        await load_content(manager.db, [tmp_path])
+        return await _versions(manager.db)
+
+    assert asyncio.run(run())["skills"] == 1
@@ -0,0 +1,174 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+import server
+from bench_hydration import synthetic_projects
+from models import ApiResponse, Project
+from responses import ApiJSONResponse, dumps
+
+FLOATS = [0.1, 1.5, -2.25, 0.0, -0.0, 1e16, 1.5e16, 1e-05, 0.00001234, 0.0001, 123456789.123,
+          1e300, -1e-300, 5e-324, 2.5e-7, 1e22, 9007199254740993.0]
+INTS = [0, -1, 2 ** 31, 2 ** 53 + 1, 2 ** 63 - 1, -2 ** 63, 2 ** 64 - 1, 2 ** 64, 10 ** 30, -10 ** 30]
+DATETIMES = [
+    datetime(2024, 5, 1),
+    datetime(2024, 5, 1, 12, 30, 45, 123456),
+    datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc),
+    datetime(2024, 5, 1, 12, 30, 0, 5, tzinfo=timezone(timedelta(hours=5, minutes=30))),
+    datetime(1969, 12, 31, 23, 59, 59),
+]
+STRINGS = ["1e16", "0.00001", ":1e5,", "[0.00001]", 'quote " and \\ backslash', "unicode ✅ café", " "]
+KEY_MAPS = [{1: "a", 2: "b"}, {1.5: "x", 1e16: "y"}, {True: "t", None: "n"}, {"k": {2: [1e-05]}}]
+
+
+def _reference(payload: ApiResponse) -> bytes:
+    # What FastAPI sends for `response_model=ApiResponse` with its stock JSONResponse
+    return JSONResponse(jsonable_encoder(payload)).body
+
+
+def _envelope(data) -> ApiResponse:
+    return ApiResponse(success=True, data=data, message="ok")
+
+
+@pytest.mark.parametrize("value", FLOATS + INTS + DATETIMES + STRINGS, ids=repr)
+def test_scalars_encode_like_fastapi(value):
+    payload = _envelope({"value": value, "list": [value, {"nested": value}]})
+    assert ApiJSONResponse(payload).body == _reference(payload)
+
+
+@pytest.mark.parametrize("value", KEY_MAPS, ids=repr)
+def test_non_string_keys_encode_like_fastapi(value):
+    payload = _envelope(value)
+    assert ApiJSONResponse(payload).body == _reference(payload)
+
+
+def test_mixed_document_encodes_like_fastapi():
+    payload = _envelope({
+        "items": [{"score": score, "at": at, "count": count} for score, at, count in zip(FLOATS, DATETIMES, INTS)],
+        "next": None,
+        "empty": [],
+    })
+    assert ApiJSONResponse(payload).body == _reference(payload)
+
+
+def test_models_in_data_encode_like_fastapi():
+    project = Project(title="P", description="d", longDescription="d", technologies=["Python"], category="Web",
+                      featured=True, imageUrl="x", keyFeatures=[])
+    payload = _envelope([project, {"project": project}])
+    assert ApiJSONResponse(payload).body == _reference(payload)
+
+
+def test_object_ids_fail_the_same_way():
+    # Handlers convert _id to str before returning; a raw ObjectId is an error either way
+    payload = _envelope({"_id": ObjectId()})
+    with pytest.raises(Exception) as reference:
+        _reference(payload)
+    with pytest.raises(type(reference.value)):
+        ApiJSONResponse(payload)
+
+
+def test_object_id_strings_encode_like_fastapi():
+    payload = _envelope({"id": str(ObjectId()), "ids": [str(ObjectId()) for _ in range(3)]})
+    assert ApiJSONResponse(payload).body == _reference(payload)
+
+
+def test_plain_content_matches_jsonresponse():
+    content = jsonable_encoder({"floats": FLOATS, "ints": INTS, "when": DATETIMES, 3: "three"})
+    assert ApiJSONResponse(content).body == JSONResponse(content).body
+    assert dumps(content) == JSONResponse(content).body
+
+
+@pytest.mark.parametrize("value", [float("nan"), float("inf"), float("-inf")])
+def test_non_finite_floats_encode_like_fastapi(value):
+    # Pydantic's JSON mode turns them into null before either encoder sees them
+    payload = _envelope({"value": value, "list": [value]})
+    assert ApiJSONResponse(payload).body == _reference(payload)
+
+
+# Conditional GETs through the app (ETagMiddleware)
+async def _with_app(requests):
+    async with server.app.router.lifespan_context(server.app):
+        await server.db_manager.db.projects.insert_many(synthetic_projects(3))
+        server.db_manager.cache.clear()
+        server.response_cache.clear()
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await requests(client)
+
+
+def _run(requests):
+    return asyncio.run(_with_app(requests))
+
+
+@pytest.mark.parametrize("path", ["/api/projects", "/api/portfolio"])
+def test_get_responses_carry_an_etag_and_revalidate_to_304(path):
+    async def requests(client):
+        first = await client.get(path)
+        again = await client.get(path, headers={"If-None-Match": first.headers["etag"]})
+        return first, again
+
+    first, again = _run(requests)
+    assert first.status_code == 200
+    assert first.headers["etag"].startswith('"') and first.headers["cache-control"] == "no-cache"
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == first.headers["etag"]
+    assert "content-type" not in again.headers and "content-length" not in again.headers
+
+
+@pytest.mark.parametrize("if_none_match", ['W/{etag}', '"stale", {etag}', '"a",W/{etag} , "b"', "*"])
+def test_weak_and_list_if_none_match_values_match(if_none_match):
+    async def requests(client):
+        etag = (await client.get("/api/projects")).headers["etag"]
+        return await client.get("/api/projects", headers={"If-None-Match": if_none_match.format(etag=etag)})
+
+    assert _run(requests).status_code == 304
+
+
+@pytest.mark.parametrize("if_none_match", ['"stale"', "", 'W/"other", "another"'])
+def test_non_matching_if_none_match_gets_the_body(if_none_match):
+    async def requests(client):
+        return await client.get("/api/projects", headers={"If-None-Match": if_none_match})
+
+    response = _run(requests)
+    assert response.status_code == 200
+    assert response.json()["success"] is True
+
+
+def test_failure_envelopes_get_no_etag():
+    async def requests(client):
+        return await client.get("/api/projects?limit=5&cursor=garbage", headers={"If-None-Match": "*"})
+
+    response = _run(requests)
+    assert response.status_code == 200
+    assert response.json()["success"] is False
+    assert "etag" not in response.headers
+    assert "cache-control" not in response.headers
+
+
+def test_etag_changes_with_the_content():
+    async def requests(client):
+        before = (await client.get("/api/projects")).headers["etag"]
+        await server.db_manager.db.projects.insert_many(synthetic_projects(1))
+        server.db_manager.cache.invalidate("projects")
+        after = await client.get("/api/projects", headers={"If-None-Match": before})
+        return before, after
+
+    before, after = _run(requests)
+    assert after.status_code == 200
+    assert after.headers["etag"] != before
+
+
+def test_non_get_requests_are_untouched():
+    async def requests(client):
+        return await client.post("/api/contact", json={"name": "A", "email": "a@example.com", "subject": "Hi",
+                                                        "message": "Hello there"}, headers={"If-None-Match": "*"})
+
+    response = _run(requests)
+    assert response.status_code == 200
+    assert "etag" not in response.headers